@@ -84,6 +84,16 @@ class Settings(BaseSettings):
         description="Tiempo de vida del access token en minutos"
     )
     
+    # Variación aleatoria (±%) de la expiración del access token
+    # Evita que los tokens emitidos a la vez venzan todos juntos
+    # (pico de refresh, p.ej. cuando todos inician sesión a las 9 AM)
+    JWT_EXPIRATION_JITTER_PCT: float = Field(
+        default=0.1,
+        ge=0,
+        lt=1,
+        description="Jitter de expiración del access token (0.1 = ±10%)"
+    )
+    
     # Tiempo de expiración del refresh token (en días)
     # Recomendación: 7-30 días
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(
@@ -91,6 +101,29 @@ class Settings(BaseSettings):
         description="Tiempo de vida del refresh token en días"
     )
     
+    # Cache en memoria de access tokens ya verificados
+    # Evita repetir la verificación de firma del mismo token en cada request
+    ACCESS_TOKEN_CACHE_SIZE: int = Field(
+        default=10000,
+        description="Cantidad máxima de access tokens cacheados por proceso"
+    )
+    
+    ACCESS_TOKEN_CACHE_TTL_SECONDS: int = Field(
+        default=300,
+        description="Tiempo máximo (segundos) que un token verificado queda en cache"
+    )
+    
+    # Revocación de access tokens (bitmap en Redis, copia local por worker)
+    TOKEN_REVOCATION_BITMAP_BITS: int = Field(
+        default=8 * 1024 * 1024,
+        description="Posiciones por época del bitmap de revocación (8M bits = 1 MB)"
+    )
+    
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = Field(
+        default=30,
+        description="Cada cuántos segundos se descarga el bitmap desde Redis"
+    )
+    
     # =========================================================================
     # CONFIGURACIÓN DE OAUTH2 (Google)
     # =========================================================================
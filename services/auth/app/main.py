@@ -6,13 +6,17 @@ configura CORS, middleware y eventos de inicio/cierre.
 """
 
 from contextlib import asynccontextmanager
+
+import redis.asyncio as redis
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.config import settings
+from app.services.revocation_service import revocation_bitmap
+
 # TODO: Descomentar cuando implementes los routers
 # from app.routers import auth_router
 # from app.database import engine, Base
-# from app.config import settings
 
 # ==============================================================================
 # CONFIGURACIÓN DE LIFESPAN (EVENTOS DE INICIO/CIERRE)
@@ -43,8 +47,14 @@ async def lifespan(app: FastAPI):
     # async with engine.begin() as conn:
     #     await conn.run_sync(Base.metadata.create_all)
     
-    # TODO: Implementar conexión a Redis
-    # app.state.redis = await aioredis.from_url(settings.REDIS_URL)
+    # Redis binario (decode_responses=False): el bitmap de revocación se
+    # lee como bytes
+    app.state.redis = redis.Redis.from_url(settings.REDIS_URL)
+    
+    # Bitmap de revocación de access tokens: primera carga antes de
+    # atender requests y luego refresco periódico en background
+    await revocation_bitmap.refresh(app.state.redis)
+    revocation_bitmap.start(app.state.redis)
     
     print("✅ Servicio de autenticación iniciado correctamente")
     
@@ -53,8 +63,8 @@ async def lifespan(app: FastAPI):
     # ==================== CIERRE ====================
     print("🛑 Cerrando servicio de autenticación...")
     
-    # TODO: Cerrar conexiones
-    # await app.state.redis.close()
+    await revocation_bitmap.stop()
+    await app.state.redis.aclose()
     
     print("✅ Servicio cerrado correctamente")
 
@@ -64,6 +64,7 @@ class User(Base):
     - is_active: Si el usuario puede hacer login
     - is_verified: Si el email fue verificado
     - role: Rol del usuario en el sistema
+    - token_version: Versión de tokens (revocación masiva de access tokens)
     - created_at: Fecha de creación
     - updated_at: Fecha de última actualización
     
@@ -156,6 +157,16 @@ class User(Base):
         comment="Si no es null, el usuario está bloqueado hasta esta fecha"
     )
     
+    # Versión de tokens del usuario (se incluye como claim "ver" en el JWT)
+    # Incrementarla invalida todos los access tokens emitidos hasta ahora
+    token_version = Column(
+        Integer, 
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="Versión de tokens; incrementar para revocar todos los access tokens"
+    )
+    
     # =========================================================================
     # Relaciones
     # =========================================================================
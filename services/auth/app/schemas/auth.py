@@ -180,6 +180,11 @@ class TokenData(BaseModel):
         description="Rol del usuario"
     )
     
+    ver: Optional[int] = Field(
+        default=None,
+        description="Versión de tokens del usuario al emitir el token"
+    )
+    
     exp: Optional[datetime] = Field(
         default=None,
         description="Fecha de expiración"
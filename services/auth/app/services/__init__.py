@@ -10,6 +10,7 @@ Esto permite:
 
 from app.services.auth_service import AuthService
 from app.services.token_service import TokenService
+from app.services.revocation_service import TokenRevocationBitmap, revocation_bitmap
 
-__all__ = ["AuthService", "TokenService"]
+__all__ = ["AuthService", "TokenService", "TokenRevocationBitmap", "revocation_bitmap"]
 
@@ -0,0 +1,202 @@
+"""
+Revocación de access tokens mediante bitmap compartido en Redis.
+
+Cada access token recibe al emitirse una posición (bitpos) dentro del
+bitmap de su época de emisión. Revocar un token es un SETBIT en Redis;
+verificarlo es un test de bit sobre una copia local del bitmap que cada
+worker refresca periódicamente (no hay llamada a Redis por request).
+"""
+
+import asyncio
+import logging
+import secrets
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationBitmap:
+    """
+    Bitmap de tokens revocados, por época de emisión.
+
+    FUNCIONAMIENTO:
+    - Época: ventana de tiempo de duración >= vida del access token.
+      Un token emitido en la época E vence antes de terminar E+1, por lo
+      que solo hace falta mantener los bitmaps de la época actual y la
+      anterior (las keys viejas expiran solas en Redis).
+    - bitpos: posición aleatoria dentro del bitmap. Dos tokens pueden
+      compartir posición; con un bitmap grande y mayormente en cero la
+      probabilidad es despreciable y el costo es solo pedir re-login.
+
+    ALMACENAMIENTO:
+    - Key: auth:revocation:bitmap:{epoch}
+    - Tipo: String de Redis usado como bitmap (SETBIT/GET)
+
+    NOTA: Redis numera los bits desde el bit más significativo de cada
+    byte (bit 0 = 0x80 del byte 0); is_revoked respeta ese orden.
+
+    USO:
+        epoch, bitpos = revocation_bitmap.allocate()
+        ...
+        if revocation_bitmap.is_revoked(epoch, bitpos):
+            # Token revocado
+    """
+
+    # Prefijo para keys de bitmap
+    KEY_PREFIX = "auth:revocation:bitmap:"
+
+    def __init__(
+        self,
+        size_bits: int = None,
+        epoch_seconds: int = None,
+        refresh_seconds: int = None
+    ):
+        """
+        Inicializa el bitmap.
+
+        Si no se proporcionan valores, se leen de settings.
+
+        Args:
+            size_bits: Cantidad de posiciones por época
+            epoch_seconds: Duración de cada época (>= vida del access token)
+            refresh_seconds: Cada cuánto se descarga el bitmap desde Redis
+        """
+        self.size_bits = size_bits or settings.TOKEN_REVOCATION_BITMAP_BITS
+        # La época cubre la vida máxima del token, incluido el jitter de expiración
+        self.epoch_seconds = epoch_seconds or int(
+            settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            * (1 + settings.JWT_EXPIRATION_JITTER_PCT)
+        )
+        self.refresh_seconds = refresh_seconds or settings.TOKEN_REVOCATION_REFRESH_SECONDS
+
+        # Copia local de los bitmaps vigentes: {epoch: bytearray}
+        self._bitmaps: dict[int, bytearray] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _get_key(self, epoch: int) -> str:
+        """Genera la key de Redis del bitmap de una época."""
+        return f"{self.KEY_PREFIX}{epoch}"
+
+    def current_epoch(self) -> int:
+        """Retorna la época actual."""
+        return int(time.time()) // self.epoch_seconds
+
+    # =========================================================================
+    # EMISIÓN Y VERIFICACIÓN
+    # =========================================================================
+
+    def allocate(self) -> tuple[int, int]:
+        """
+        Asigna época y posición para un token nuevo.
+
+        Returns:
+            Tupla (epoch, bitpos) a incluir como claims del token
+        """
+        return self.current_epoch(), secrets.randbelow(self.size_bits)
+
+    def is_revoked(self, epoch: int, bitpos: int) -> bool:
+        """
+        Verifica si la posición de un token está marcada como revocada.
+
+        Operación en memoria, sin acceso a Redis.
+        """
+        bitmap = self._bitmaps.get(epoch)
+        byte_index = bitpos >> 3
+        if bitmap is None or byte_index >= len(bitmap):
+            return False
+        return bool((bitmap[byte_index] >> (7 - (bitpos & 7))) & 1)
+
+    def _set_local(self, epoch: int, bitpos: int) -> None:
+        """Marca una posición en la copia local (efecto inmediato en este worker)."""
+        bitmap = self._bitmaps.setdefault(epoch, bytearray())
+        byte_index = bitpos >> 3
+        if byte_index >= len(bitmap):
+            bitmap.extend(bytes(byte_index + 1 - len(bitmap)))
+        bitmap[byte_index] |= 0x80 >> (bitpos & 7)
+
+    # =========================================================================
+    # OPERACIONES CONTRA REDIS
+    # =========================================================================
+
+    async def revoke(self, redis_client: redis.Redis, epoch: int, bitpos: int) -> None:
+        """
+        Revoca la posición de un token en Redis.
+
+        SETBIT es O(1) en el servidor. La key expira cuando ningún
+        token de esa época puede seguir vigente.
+
+        Args:
+            redis_client: Cliente Redis conectado
+            epoch: Época de emisión del token
+            bitpos: Posición del token en el bitmap
+        """
+        key = self._get_key(epoch)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.setbit(key, bitpos, 1)
+            pipe.expire(key, self.epoch_seconds * 2)
+            await pipe.execute()
+
+        self._set_local(epoch, bitpos)
+
+    async def refresh(self, redis_client: redis.Redis) -> None:
+        """
+        Descarga los bitmaps de la época actual y la anterior.
+
+        IMPORTANTE: El cliente debe crearse con decode_responses=False
+        (el bitmap es binario).
+        """
+        epoch = self.current_epoch()
+        epochs = (epoch - 1, epoch)
+        values = await redis_client.mget([self._get_key(e) for e in epochs])
+
+        self._bitmaps = {
+            e: bytearray(value)
+            for e, value in zip(epochs, values)
+            if value
+        }
+
+    # =========================================================================
+    # REFRESCO EN BACKGROUND
+    # =========================================================================
+
+    async def _refresh_loop(self, redis_client: redis.Redis) -> None:
+        """Refresca el bitmap cada refresh_seconds hasta ser cancelado."""
+        while True:
+            try:
+                await self.refresh(redis_client)
+            except Exception:
+                # Se mantiene la última copia válida; se reintenta en el próximo ciclo
+                logger.exception("Error refrescando bitmap de revocación")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self, redis_client: redis.Redis) -> None:
+        """
+        Inicia el refresco periódico en background.
+
+        Llamar desde el lifespan de la aplicación (inicio).
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop(redis_client))
+
+    async def stop(self) -> None:
+        """
+        Detiene el refresco periódico.
+
+        Llamar desde el lifespan de la aplicación (cierre).
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instancia global (una por worker)
+revocation_bitmap = TokenRevocationBitmap()
@@ -8,11 +8,17 @@ Maneja la creación, validación y revocación de:
 """
 
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from uuid import UUID
+import random
 import secrets
+import time
 
-from jose import jwt, JWTError
+from cachetools import TTLCache
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
+import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 
@@ -20,6 +26,24 @@ from sqlalchemy import select, update
 # from app.models.user import User, RefreshToken
 from app.config import settings
 from app.schemas.auth import TokenData
+from app.services.revocation_service import revocation_bitmap
+
+
+# ==============================================================================
+# CACHE DE ACCESS TOKENS
+# ==============================================================================
+# El mismo access token llega en cada request del usuario durante toda su vida
+# útil. Se cachea el resultado de la verificación por proceso (LRU + TTL) para
+# no repetir el trabajo criptográfico.
+#
+# Cada entrada guarda (exp, epoch, bitpos, TokenData): en un hit se vuelve a
+# comprobar la expiración del propio token y su bit en el bitmap de revocación
+# (ver revocation_service), que cada worker mantiene en memoria.
+
+_access_token_cache: TTLCache = TTLCache(
+    maxsize=settings.ACCESS_TOKEN_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_CACHE_TTL_SECONDS
+)
 
 
 class TokenService:
@@ -36,14 +60,37 @@ class TokenService:
         service = TokenService()
         access_token = service.create_access_token(user)
         token_data = service.decode_token(access_token)
+    
+    RENDIMIENTO:
+    La clave de firma se construye una sola vez (ver get_signing_key)
+    y se pasa ya parseada a jose, evitando que jwt.encode/jwt.decode
+    la reconstruyan en cada llamada.
     """
     
-    def __init__(self):
-        """Inicializa el servicio con configuración."""
+    def __init__(self, signing_key: Optional[Key] = None):
+        """
+        Inicializa el servicio con configuración.
+        
+        Args:
+            signing_key: Clave de firma ya construida (opcional).
+                         Si no se proporciona, se usa la clave cacheada
+                         a partir de settings.
+        """
         self.secret_key = settings.SECRET_KEY
         self.algorithm = settings.JWT_ALGORITHM
         self.access_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+        self.expiration_jitter_pct = settings.JWT_EXPIRATION_JITTER_PCT
         self.refresh_expire_days = settings.REFRESH_TOKEN_EXPIRE_DAYS
+        self._signing_key = signing_key or get_signing_key(
+            self.secret_key,
+            self.algorithm
+        )
+        # Opciones de verificación (fijas, se arman una vez)
+        self._decode_options = {
+            "verify_signature": True,
+            "require_exp": True,
+            "require_sub": True,
+        }
     
     # =========================================================================
     # ACCESS TOKENS
@@ -61,8 +108,12 @@ class TokenService:
         - sub: ID del usuario
         - email: Email del usuario
         - role: Rol del usuario
-        - exp: Fecha de expiración
+        - exp: Fecha de expiración (con jitter de ±JWT_EXPIRATION_JITTER_PCT
+          para que los tokens emitidos a la vez no venzan todos juntos)
         - iat: Fecha de emisión
+        - jti: ID único del token
+        - epoch / bitpos: Posición en el bitmap de revocación
+        - ver: Versión de tokens del usuario (user.token_version)
         
         Args:
             user: Objeto usuario con id, email, role
@@ -70,62 +121,145 @@ class TokenService:
             
         Returns:
             Token JWT codificado
-            
-        EJEMPLO DE IMPLEMENTACIÓN:
-        ```python
+        """
+        now = datetime.utcnow()
+        ttl_seconds = self.access_expire_minutes * 60
+        jitter = ttl_seconds * self.expiration_jitter_pct
+        expires_in = ttl_seconds + random.uniform(-jitter, jitter)
+        epoch, bitpos = revocation_bitmap.allocate()
         payload = {
             "sub": str(user.id),
             "email": user.email,
             "role": user.role.value,
-            "exp": datetime.utcnow() + timedelta(minutes=self.access_expire_minutes),
-            "iat": datetime.utcnow(),
+            "exp": now + timedelta(seconds=expires_in),
+            "iat": now,
+            "jti": secrets.token_urlsafe(16),
+            "epoch": epoch,
+            "bitpos": bitpos,
+            "ver": user.token_version,
             "type": "access"
         }
         
         if additional_claims:
             payload.update(additional_claims)
         
-        return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
-        ```
-        """
-        # TODO: Implementar
-        raise NotImplementedError("Método pendiente de implementar")
+        return jwt.encode(payload, self._signing_key, algorithm=self.algorithm)
     
-    def decode_access_token(self, token: str) -> Optional[TokenData]:
+    def decode_access_token(
+        self, 
+        token: str, 
+        user=None  # User model (opcional)
+    ) -> Optional[TokenData]:
         """
         Decodifica y valida un access token.
         
+        Si se pasa el usuario (ya cargado para autorizar el request),
+        además se compara el claim "ver" con user.token_version: al
+        incrementar token_version se invalidan de una vez todos los
+        access tokens emitidos al usuario, sin consultas extra.
+        
         Args:
             token: Token JWT a decodificar
+            user: Usuario dueño del token (opcional)
             
         Returns:
             TokenData con los datos del token, o None si es inválido
-            
-        EJEMPLO DE IMPLEMENTACIÓN:
-        ```python
+        """
+        token_data = self._verify_access_token(token)
+        if token_data is None:
+            return None
+        
+        if user is not None and token_data.ver != user.token_version:
+            return None
+        
+        return token_data
+    
+    def _verify_access_token(self, token: str) -> Optional[TokenData]:
+        """
+        Verifica firma, claims y revocación de un access token.
+        
+        NOTA: Se decodifica una sola vez, verificando firma y claims
+        obligatorios en la misma llamada. No decodificar antes el header
+        sin verificar para "elegir" el algoritmo: el algoritmo es fijo
+        (self.algorithm) y eso duplicaría el trabajo en cada request.
+        
+        Los tokens ya verificados se sirven desde _access_token_cache.
+        """
+        cached = _access_token_cache.get(token)
+        if cached is not None:
+            exp, epoch, bitpos, token_data = cached
+            if exp > time.time() and not revocation_bitmap.is_revoked(epoch, bitpos):
+                return token_data
+            _access_token_cache.pop(token, None)
+            return None
+        
         try:
             payload = jwt.decode(
-                token, 
-                self.secret_key, 
-                algorithms=[self.algorithm]
-            )
-            
-            # Verificar que es un access token
-            if payload.get("type") != "access":
-                return None
-            
-            return TokenData(
-                sub=payload.get("sub"),
-                email=payload.get("email"),
-                role=payload.get("role"),
-                exp=datetime.fromtimestamp(payload.get("exp"))
+                token,
+                self._signing_key,
+                algorithms=[self.algorithm],
+                options=self._decode_options
             )
         except JWTError:
             return None
-        ```
+        
+        # Verificar que es un access token con los claims esperados
+        if payload.get("type") != "access" or not payload.get("email"):
+            return None
+        
+        epoch, bitpos = payload.get("epoch"), payload.get("bitpos")
+        if epoch is None or bitpos is None:
+            return None
+        if revocation_bitmap.is_revoked(epoch, bitpos):
+            return None
+        
+        token_data = TokenData(
+            sub=payload.get("sub"),
+            email=payload.get("email"),
+            role=payload.get("role"),
+            ver=payload.get("ver"),
+            exp=datetime.fromtimestamp(payload.get("exp"))
+        )
+        _access_token_cache[token] = (payload["exp"], epoch, bitpos, token_data)
+        
+        return token_data
+    
+    async def revoke_access_token(
+        self, 
+        token: str, 
+        redis_client: redis.Redis
+    ) -> bool:
         """
-        # TODO: Implementar
-        raise NotImplementedError("Método pendiente de implementar")
+        Revoca un access token antes de su expiración (logout).
+        
+        Marca el bit del token en el bitmap de revocación de Redis
+        (visible para todos los workers en el próximo refresco) y lo
+        elimina de la cache local de tokens verificados.
+        
+        Args:
+            token: Access token a revocar
+            redis_client: Cliente Redis conectado
+            
+        Returns:
+            True si se revocó, False si el token era inválido
+        """
+        try:
+            payload = jwt.decode(
+                token,
+                self._signing_key,
+                algorithms=[self.algorithm],
+                options=self._decode_options
+            )
+        except JWTError:
+            return False
+        
+        epoch, bitpos = payload.get("epoch"), payload.get("bitpos")
+        if epoch is None or bitpos is None:
+            return False
+        
+        await revocation_bitmap.revoke(redis_client, epoch, bitpos)
+        _access_token_cache.pop(token, None)
+        return True
     
     # =========================================================================
     # REFRESH TOKENS
@@ -269,6 +403,9 @@ class TokenService:
         - Compromiso de cuenta
         - "Cerrar sesión en todos los dispositivos"
         
+        Para invalidar también los access tokens ya emitidos, incrementar
+        user.token_version en la misma transacción (ver ejemplo).
+        
         Args:
             user_id: ID del usuario
             db: Sesión de BD
@@ -284,6 +421,13 @@ class TokenService:
         ).values(revoked=True)
         
         result = await db.execute(query)
+        
+        # Invalida todos los access tokens vigentes del usuario
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(token_version=User.token_version + 1)
+        )
         await db.commit()
         
         return result.rowcount
@@ -382,6 +526,25 @@ class TokenService:
 # FUNCIONES AUXILIARES
 # ==============================================================================
 
+@lru_cache()
+def get_signing_key(secret_key: str, algorithm: str) -> Key:
+    """
+    Construye la clave de firma JWT una única vez por proceso.
+    
+    jose acepta tanto el secreto en crudo como un objeto Key; con el
+    secreto en crudo vuelve a construir (y validar) la clave en cada
+    encode/decode. Cacheando el objeto Key ese trabajo se hace una vez.
+    
+    Args:
+        secret_key: Secreto (HS*) o clave PEM (RS*/ES*)
+        algorithm: Algoritmo JWT (ej: "HS256")
+        
+    Returns:
+        Clave lista para pasar a jwt.encode / jwt.decode
+    """
+    return jwk.construct(secret_key, algorithm)
+
+
 def hash_token(token: str) -> str:
     """
     Hashea un token para almacenamiento seguro.
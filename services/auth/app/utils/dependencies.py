@@ -98,6 +98,10 @@ async def get_current_user(
     # if user is None:
     #     raise credentials_exception
     # 
+    # # 3. Verificar versión de tokens (revocación masiva)
+    # if token_data.ver != user.token_version:
+    #     raise credentials_exception
+    # 
     # return user
     
     raise HTTPException(
@@ -116,7 +116,7 @@ class TestSecurityUtils:
 class TestTokenService:
     """Tests para el servicio de tokens"""
     
-    def test_create_access_token(self, test_user):
+    def test_create_access_token(self, test_user, signing_key):
         """
         Test: Creación de access token.
         
@@ -124,20 +124,31 @@ class TestTokenService:
         1. Crear access token para usuario
         2. Verificar que es un string JWT válido
         3. Verificar que se puede decodificar
+        4. Verificar que exp queda dentro del jitter configurado
         """
         # TODO: Implementar
+        # import time
+        # from jose import jwt
+        # from app.config import settings
         # from app.services.token_service import TokenService
         # 
-        # service = TokenService()
+        # service = TokenService(signing_key=signing_key)
+        # now = time.time()
         # token = service.create_access_token(test_user)
         # 
         # assert isinstance(token, str)
         # assert len(token) > 0
         # # JWT tiene 3 partes separadas por .
         # assert len(token.split(".")) == 3
+        # 
+        # decoded = jwt.get_unverified_claims(token)
+        # ttl = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        # max_jitter = ttl * settings.JWT_EXPIRATION_JITTER_PCT
+        # # +1 s de tolerancia: exp se trunca a segundos enteros
+        # assert abs(decoded["exp"] - now - ttl) <= max_jitter + 1
         pass
     
-    def test_decode_access_token_valid(self, test_user):
+    def test_decode_access_token_valid(self, test_user, signing_key):
         """
         Test: Decodificación de access token válido.
         
@@ -149,7 +160,7 @@ class TestTokenService:
         # TODO: Implementar
         # from app.services.token_service import TokenService
         # 
-        # service = TokenService()
+        # service = TokenService(signing_key=signing_key)
         # token = service.create_access_token(test_user)
         # token_data = service.decode_access_token(token)
         # 
@@ -158,7 +169,7 @@ class TestTokenService:
         # assert token_data.email == test_user.email
         pass
     
-    def test_decode_access_token_invalid(self):
+    def test_decode_access_token_invalid(self, signing_key):
         """
         Test: Decodificación de access token inválido.
         
@@ -169,7 +180,7 @@ class TestTokenService:
         # TODO: Implementar
         # from app.services.token_service import TokenService
         # 
-        # service = TokenService()
+        # service = TokenService(signing_key=signing_key)
         # token_data = service.decode_access_token("invalid.token.here")
         # 
         # assert token_data is None
@@ -222,8 +233,18 @@ class TestTokenService:
         1. Crear refresh token
         2. Revocar el token
         3. Verificar que la validación falla
+        4. Incrementar test_user.token_version y verificar que
+           decode_access_token(token, test_user) retorna None
         """
         # TODO: Implementar
+        # from app.services.token_service import TokenService
+        # 
+        # service = TokenService()
+        # access_token = service.create_access_token(test_user)
+        # 
+        # test_user.token_version += 1
+        # 
+        # assert service.decode_access_token(access_token, test_user) is None
         pass
 
 
@@ -0,0 +1,6 @@
+"""
+Tests del servicio de carrito.
+
+Estructura:
+- conftest.py: Fixtures compartidos (event loop, cliente Redis, CartService)
+"""
@@ -0,0 +1,68 @@
+"""
+Fixtures compartidos para tests del carrito.
+
+Los fixtures se cargan automáticamente en todos los tests.
+Proveen configuración común como:
+- Event loop de sesión
+- Cliente Redis reutilizado
+- CartService listo para usar
+"""
+
+import asyncio
+from typing import AsyncGenerator, Generator
+
+import pytest
+import pytest_asyncio
+import redis.asyncio as redis
+
+from app.services.cart_service import CartService
+
+
+# ==============================================================================
+# CONFIGURACIÓN DE PYTEST-ASYNCIO
+# ==============================================================================
+
+@pytest.fixture(scope="session")
+def event_loop() -> Generator:
+    """
+    Crea un event loop para toda la sesión de tests.
+    
+    Necesario para compartir el cliente Redis (fixture de sesión)
+    entre tests asíncronos: un loop por test obligaría a reconectar.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+# ==============================================================================
+# FIXTURES DE REDIS
+# ==============================================================================
+
+# URL de Redis de prueba (usar una BD separada, se vacía después de cada test)
+TEST_REDIS_URL = "redis://localhost:6379/15"
+
+
+@pytest_asyncio.fixture(scope="session")
+async def redis_client() -> AsyncGenerator[redis.Redis, None]:
+    """
+    Cliente Redis compartido por toda la sesión de tests.
+    
+    La conexión (TCP + AUTH) se establece una sola vez y se
+    reutiliza en todos los tests.
+    """
+    client = redis.Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+@pytest_asyncio.fixture
+async def cart_service(redis_client) -> AsyncGenerator[CartService, None]:
+    """
+    Provee un CartService para cada test.
+    
+    Reutiliza el cliente de sesión y vacía la BD de Redis
+    después de cada test para mantenerlos aislados.
+    """
+    yield CartService(redis_client)
+    await redis_client.flushdb()
@@ -37,6 +37,10 @@
 ║  - Push: Firebase Cloud Messaging (opcional)                                 ║
 ║  - SMS: Twilio (opcional)                                                    ║
 ║                                                                               ║
+║  DEPENDENCIAS (además de FastAPI/SQLAlchemy):                                 ║
+║  - httpx[http2]: el cliente de SendGrid usa HTTP/2 (paquete h2)               ║
+║  - aiosmtplib, asyncpg, jinja2                                                ║
+║                                                                               ║
 ║  TEMPLATES:                                                                  ║
 ║  - HTML con variables dinámicas                                              ║
 ║  - Versión texto plano como fallback                                         ║
@@ -0,0 +1,138 @@
+"""
+Modelo de outbox de emails.
+
+Los emails no se envían dentro del request HTTP: se guardan en esta tabla
+(en la misma transacción que el cambio que los origina) y un worker los
+envía en batches (ver app/worker.py).
+"""
+
+import uuid
+
+from sqlalchemy import Column, String, Text, Integer, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID
+
+# TODO: Importar Base desde database.py
+# from app.database import Base
+from sqlalchemy.orm import declarative_base
+Base = declarative_base()
+
+
+# ==============================================================================
+# MODELO: EmailOutbox
+# ==============================================================================
+
+class EmailOutbox(Base):
+    """
+    Email pendiente de envío.
+    
+    CICLO DE VIDA:
+    - Se inserta con sent_at NULL y next_attempt_at = now()
+    - El worker lo toma con SELECT ... FOR UPDATE SKIP LOCKED (dos workers
+      nunca toman la misma fila, y si uno cae la fila se libera)
+    - Si se envía: sent_at = now()
+    - Si falla: attempts + 1 y next_attempt_at con backoff
+    """
+    __tablename__ = "email_outbox"
+    
+    # =========================================================================
+    # Identificación
+    # =========================================================================
+    
+    id = Column(
+        UUID(as_uuid=True), 
+        primary_key=True, 
+        default=uuid.uuid4
+    )
+    
+    # =========================================================================
+    # Mensaje
+    # =========================================================================
+    
+    to_email = Column(
+        String(255), 
+        nullable=False,
+        comment="Destinatario"
+    )
+    
+    from_email = Column(
+        String(255), 
+        nullable=True,
+        comment="Remitente (usa EMAIL_FROM si es null)"
+    )
+    
+    reply_to = Column(
+        String(255), 
+        nullable=True,
+        comment="Email de respuesta"
+    )
+    
+    subject = Column(
+        String(500), 
+        nullable=False,
+        comment="Asunto"
+    )
+    
+    html_content = Column(
+        Text, 
+        nullable=False,
+        comment="Contenido HTML ya renderizado"
+    )
+    
+    text_content = Column(
+        Text, 
+        nullable=True,
+        comment="Contenido texto ya renderizado"
+    )
+    
+    # =========================================================================
+    # Estado de envío
+    # =========================================================================
+    
+    attempts = Column(
+        Integer, 
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="Intentos de envío fallidos"
+    )
+    
+    next_attempt_at = Column(
+        DateTime(timezone=True), 
+        server_default=func.now(),
+        nullable=False,
+        comment="No enviar antes de esta fecha (backoff)"
+    )
+    
+    last_error = Column(
+        Text, 
+        nullable=True,
+        comment="Error del último intento"
+    )
+    
+    sent_at = Column(
+        DateTime(timezone=True), 
+        nullable=True,
+        comment="Fecha de envío (null = pendiente)"
+    )
+    
+    created_at = Column(
+        DateTime(timezone=True), 
+        server_default=func.now(),
+        nullable=False
+    )
+    
+    # =========================================================================
+    # Índices
+    # =========================================================================
+    
+    __table_args__ = (
+        # Solo los pendientes: el índice no crece con el historial enviado
+        Index(
+            "ix_email_outbox_pending",
+            next_attempt_at,
+            postgresql_where=text("sent_at IS NULL")
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<EmailOutbox {self.to_email} {self.subject!r}>"
@@ -4,13 +4,32 @@ Servicio de envío de emails.
 Gestiona el envío de emails transaccionales usando diferentes proveedores.
 """
 
+import asyncio
+import logging
+import os
+import quopri
+import ssl
+import threading
+import uuid
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from email.header import Header
+from email.utils import formataddr, formatdate, make_msgid, parseaddr
 from enum import Enum
+from functools import lru_cache
 from typing import Optional, List
 
+import aiosmtplib
+import httpx
+from jinja2 import (
+    BaseLoader, Environment, FileSystemBytecodeCache, FileSystemLoader,
+    ModuleLoader, select_autoescape
+)
+
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 # ==============================================================================
 # ENUMS Y DATACLASSES
@@ -29,12 +48,16 @@ class NotificationType(str, Enum):
     DOWNLOAD_READY = "download_ready"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EmailMessage:
     """
     Mensaje de email.
     
     Contiene toda la información necesaria para enviar un email.
+    
+    Inmutable y sin __dict__ (slots): se crea uno por destinatario,
+    por lo que en envíos masivos el ahorro de memoria es notable.
+    Usar EmailMessage.build() para completar los valores por defecto.
     """
     to: str                         # Destinatario
     subject: str                    # Asunto
@@ -46,9 +69,47 @@ class EmailMessage:
     cc: Optional[List[str]]         # Copia
     bcc: Optional[List[str]]        # Copia oculta
     attachments: Optional[List[dict]]  # Archivos adjuntos
+    template_id: Optional[str] = None     # Template del proveedor (envío masivo)
+    template_data: Optional[dict] = None  # Variables del template por destinatario
+    
+    @classmethod
+    def build(
+        cls,
+        to: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        from_email: Optional[str] = None,
+        from_name: Optional[str] = None,
+        reply_to: Optional[str] = None,
+        cc: Optional[List[str]] = None,
+        bcc: Optional[List[str]] = None,
+        attachments: Optional[List[dict]] = None,
+        template_id: Optional[str] = None,
+        template_data: Optional[dict] = None
+    ) -> "EmailMessage":
+        """
+        Crea un mensaje completando los valores por defecto.
+        
+        El remitente se toma de settings.EMAIL_FROM si no se especifica.
+        """
+        return cls(
+            to=to,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content,
+            from_email=from_email or settings.EMAIL_FROM,
+            from_name=from_name,
+            reply_to=reply_to,
+            cc=cc,
+            bcc=bcc,
+            attachments=attachments,
+            template_id=template_id,
+            template_data=template_data
+        )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EmailResult:
     """Resultado del envío de email."""
     success: bool
@@ -56,6 +117,37 @@ class EmailResult:
     error: Optional[str]
 
 
+# ==============================================================================
+# CORTE DE ENVÍOS MASIVOS
+# ==============================================================================
+# Si el servidor está rechazando (credenciales inválidas, rate limit, caída),
+# seguir enviando solo desperdicia trabajo. Un envío masivo se aborta cuando
+# ya se intentaron al menos 30 mensajes y fallaron 1/3 o más.
+
+BATCH_ABORT_MIN_TOTAL = 30
+BATCH_ABORT_ERROR = "batch aborted: failure threshold"
+
+
+def should_abort_batch(total: int, failed: int) -> bool:
+    """Indica si un envío masivo superó el umbral de fallos."""
+    return total >= BATCH_ABORT_MIN_TOTAL and failed * 3 >= total
+
+
+def _aborted_results(count: int) -> List[EmailResult]:
+    """Resultados para los mensajes no enviados por abortar el batch."""
+    return [
+        EmailResult(success=False, message_id=None, error=BATCH_ABORT_ERROR)
+    ] * count
+
+
+def _log_batch_abort(total: int, failed: int, skipped: int) -> None:
+    """Registra el corte de un envío masivo."""
+    logger.warning(
+        "Envío masivo abortado por umbral de fallos",
+        extra={"total": total, "failed": failed, "skipped": skipped}
+    )
+
+
 # ==============================================================================
 # INTERFAZ ABSTRACTA
 # ==============================================================================
@@ -79,17 +171,67 @@ class EmailProvider(ABC):
             Resultado del envío
         """
         pass
+    
+    # Máximo de mensajes por llamada a send_batch
+    MAX_BATCH_SIZE = 1000
+    
+    async def send_batch(self, messages: List[EmailMessage]) -> List[EmailResult]:
+        """
+        Envía varios emails.
+        
+        Implementación por defecto: un send() por mensaje.
+        Los proveedores con API de envío masivo la sobrescriben.
+        
+        Args:
+            messages: Mensajes a enviar (máximo MAX_BATCH_SIZE)
+            
+        Returns:
+            Resultados en el mismo orden que messages
+        """
+        return [await self.send(message) for message in messages]
 
 
 # ==============================================================================
 # IMPLEMENTACIÓN: SMTP
 # ==============================================================================
 
+@lru_cache()
+def get_smtp_tls_context() -> ssl.SSLContext:
+    """
+    SSLContext compartido por todas las conexiones SMTP.
+    
+    Construir un contexto carga el almacén de certificados de CA; se hace
+    una sola vez por proceso. Un único contexto también es requisito para
+    la reanudación de sesiones TLS (tickets), que el servidor puede
+    ofrecer al reconectar el pool.
+    """
+    ctx = ssl.create_default_context()
+    ctx.minimum_version = ssl.TLSVersion.TLSv1_2
+    return ctx
+
+
+class _SMTPConnection:
+    """Conexión del pool de SMTPProvider y cantidad de mensajes enviados por ella."""
+    
+    __slots__ = ("client", "sent")
+    
+    def __init__(self):
+        self.client: Optional[aiosmtplib.SMTP] = None
+        self.sent = 0
+
+
 class SMTPProvider(EmailProvider):
     """
     Proveedor de email usando SMTP directo.
     
     Útil para desarrollo o servidores SMTP propios.
+    
+    POOL DE CONEXIONES:
+    SMTP es secuencial (un mensaje a la vez por conexión), así que se
+    mantiene un pool de pool_size conexiones persistentes: los envíos
+    concurrentes (asyncio.gather) se reparten entre ellas. Cada conexión
+    se abre en su primer uso y se recicla (QUIT + reconexión) al llegar a
+    max_messages_per_connection mensajes.
     """
     
     def __init__(
@@ -97,55 +239,492 @@ class SMTPProvider(EmailProvider):
         host: str = None,
         port: int = None,
         username: str = None,
-        password: str = None
+        password: str = None,
+        pool_size: int = 5,
+        max_messages_per_connection: int = 100,
+        tls_context: ssl.SSLContext = None
     ):
         """
         Inicializa el proveedor SMTP.
         
         Si no se proporcionan credenciales, se leen de settings.
+        
+        Args:
+            pool_size: Cantidad máxima de conexiones simultáneas
+            max_messages_per_connection: Mensajes por conexión antes de reciclarla
+            tls_context: SSLContext para todas las conexiones del pool
+                         (por defecto el compartido del proceso)
         """
-        # TODO: Implementar
-        # self.host = host or settings.SMTP_HOST
-        # self.port = port or settings.SMTP_PORT
-        # self.username = username or settings.SMTP_USER
-        # self.password = password or settings.SMTP_PASSWORD
-        pass
+        self.host = host or settings.SMTP_HOST
+        self.port = port or settings.SMTP_PORT
+        self.username = username or settings.SMTP_USER
+        self.password = password or settings.SMTP_PASSWORD
+        self.pool_size = pool_size
+        self.max_messages_per_connection = max_messages_per_connection
+        
+        # Un solo SSLContext para todo el pool: CA cargadas una vez y tickets
+        # de sesión TLS compartidos entre conexiones.
+        # IMPORTANTE: No modificar el contexto después de la primera conexión
+        # (el módulo ssl no es thread-safe para mutaciones).
+        self._ssl_ctx = tls_context or get_smtp_tls_context()
+        
+        # Headers que no cambian entre mensajes, ya codificados
+        self._default_from = settings.EMAIL_FROM
+        self._static_headers = (
+            b"MIME-Version: 1.0\r\n"
+            + b"From: " + self._format_address(self._default_from)[1] + b"\r\n"
+        )
+        self._msgid_domain = parseaddr(self._default_from)[1].rpartition("@")[2] or None
+        
+        # Pool de conexiones (se conectan en su primer uso)
+        self._pool: asyncio.Queue[_SMTPConnection] = asyncio.Queue()
+        for _ in range(pool_size):
+            self._pool.put_nowait(_SMTPConnection())
+    
+    async def _connect(self) -> aiosmtplib.SMTP:
+        """Abre una conexión nueva (TCP + TLS + AUTH)."""
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            use_tls=True,
+            tls_context=self._ssl_ctx
+        )
+        await client.connect()
+        if self.username:
+            try:
+                await client.login(self.username, self.password)
+            except BaseException:
+                # Sin esto la conexión TLS ya abierta queda huérfana
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+                raise
+        return client
+    
+    async def _disconnect(self, conn: _SMTPConnection) -> None:
+        """Cierra la conexión (QUIT) y deja el slot libre para reconectar."""
+        if conn.client is not None and conn.client.is_connected:
+            try:
+                await conn.client.quit()
+            except aiosmtplib.SMTPException:
+                conn.client.close()
+        conn.client = None
+        conn.sent = 0
+    
+    async def _ensure_connected(self, conn: _SMTPConnection) -> aiosmtplib.SMTP:
+        """Retorna el cliente de la conexión, reconectando si hace falta."""
+        if conn.sent >= self.max_messages_per_connection:
+            await self._disconnect(conn)
+        if conn.client is None or not conn.client.is_connected:
+            conn.client = await self._connect()
+            conn.sent = 0
+        return conn.client
+    
+    @staticmethod
+    def _check_header(value: str) -> None:
+        """Rechaza CR/LF: permitirían inyectar headers (ej: un Bcc extra)."""
+        if "\r" in value or "\n" in value:
+            raise ValueError(f"Header con salto de línea: {value!r}")
+    
+    @classmethod
+    def _encode_header(cls, value: str) -> bytes:
+        """Codifica un header (RFC 2047 solo si no es ASCII)."""
+        cls._check_header(value)
+        if value.isascii():
+            return value.encode()
+        return Header(value, "utf-8").encode().encode()
+    
+    @classmethod
+    def _format_address(cls, value: str) -> tuple[str, bytes]:
+        """
+        Valida y formatea una dirección ("Nombre <a@b.com>" o "a@b.com").
+        
+        Returns:
+            Tupla (dirección para el sobre SMTP, valor del header)
+        
+        Raises:
+            ValueError: Si tiene CR/LF o no es una dirección válida
+        """
+        cls._check_header(value)
+        name, addr = parseaddr(value)
+        if "@" not in addr or not addr.isascii():
+            raise ValueError(f"Dirección de email inválida: {value!r}")
+        if name and not name.isascii():
+            # Nombre visible en RFC 2047 (formataddr no lo acepta en bytes)
+            return addr, cls._encode_header(name) + b" <" + addr.encode() + b">"
+        return addr, formataddr((name, addr)).encode()
+    
+    @staticmethod
+    def _encode_part(content: str, subtype: str) -> bytes:
+        """Codifica una parte de texto en quoted-printable (UTF-8)."""
+        body = quopri.encodestring(content.replace("\r\n", "\n").encode("utf-8"))
+        return (
+            b'Content-Type: text/' + subtype.encode() + b'; charset="utf-8"\r\n'
+            b"Content-Transfer-Encoding: quoted-printable\r\n\r\n"
+            + body.replace(b"\n", b"\r\n")
+            + b"\r\n"
+        )
+    
+    def _build_raw(self, message: EmailMessage) -> tuple[str, list[str], bytes]:
+        """
+        Arma el mensaje listo para DATA.
+        
+        Se evita MIMEMultipart/MIMEText + Generator: los headers fijos
+        (MIME-Version, From por defecto) se codifican una sola vez en
+        __init__ y por mensaje solo se codifican Subject/To/Message-ID y
+        las dos partes del cuerpo.
+        
+        Las direcciones pasan por _format_address (sin CR/LF, nombre
+        visible en RFC 2047) y el sobre SMTP usa solo la dirección.
+        
+        Returns:
+            Tupla (remitente, destinatarios, mensaje en bytes)
+        
+        Raises:
+            ValueError: Si alguna dirección o el asunto no son válidos
+        """
+        boundary = uuid.uuid4().hex.encode()
+        
+        if not message.from_email or message.from_email == self._default_from:
+            from_addr = parseaddr(self._default_from)[1]
+            headers = [self._static_headers]
+        else:
+            from_addr, from_header = self._format_address(message.from_email)
+            headers = [
+                b"MIME-Version: 1.0\r\n",
+                b"From: " + from_header + b"\r\n"
+            ]
+        
+        to_addr, to_header = self._format_address(message.to)
+        cc = [self._format_address(value) for value in message.cc or []]
+        bcc = [self._format_address(value)[0] for value in message.bcc or []]
+        recipients = [to_addr, *(addr for addr, _ in cc), *bcc]
+        
+        headers.append(b"To: " + to_header + b"\r\n")
+        if cc:
+            headers.append(b"Cc: " + b", ".join(header for _, header in cc) + b"\r\n")
+        if message.reply_to:
+            headers.append(
+                b"Reply-To: " + self._format_address(message.reply_to)[1] + b"\r\n"
+            )
+        headers.append(b"Subject: " + self._encode_header(message.subject) + b"\r\n")
+        headers.append(b"Date: " + formatdate().encode() + b"\r\n")
+        headers.append(
+            b"Message-ID: " + make_msgid(domain=self._msgid_domain).encode() + b"\r\n"
+        )
+        headers.append(
+            b'Content-Type: multipart/alternative; boundary="' + boundary + b'"\r\n\r\n'
+        )
+        
+        parts = []
+        if message.text_content:
+            parts.append(self._encode_part(message.text_content, "plain"))
+        parts.append(self._encode_part(message.html_content, "html"))
+        
+        delimiter = b"--" + boundary + b"\r\n"
+        body = b"".join(delimiter + part for part in parts) + b"--" + boundary + b"--\r\n"
+        
+        return from_addr, recipients, b"".join(headers) + body
     
     async def send(self, message: EmailMessage) -> EmailResult:
         """
         Envía email usando SMTP.
         
-        IMPLEMENTACIÓN:
-        ```python
-        import aiosmtplib
-        from email.mime.text import MIMEText
-        from email.mime.multipart import MIMEMultipart
+        Toma una conexión del pool (espera si están todas ocupadas) y la
+        devuelve al terminar: por mensaje solo se paga el intercambio de
+        DATA, no el handshake TCP/TLS ni el login.
+        """
+        conn = await self._pool.get()
+        try:
+            return await self._send_on(conn, message)
+        finally:
+            self._pool.put_nowait(conn)
+    
+    async def send_batch(self, messages: List[EmailMessage]) -> List[EmailResult]:
+        """
+        Envía varios emails por una sola conexión del pool.
         
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = message.subject
-        msg["From"] = message.from_email or settings.EMAIL_FROM
-        msg["To"] = message.to
+        La conexión se toma una vez para todo el batch (un solo EHLO/login)
+        y los mensajes se envían uno tras otro sin volver al pool.
         
-        if message.text_content:
-            msg.attach(MIMEText(message.text_content, "plain"))
-        msg.attach(MIMEText(message.html_content, "html"))
+        NOTA: aiosmtplib no expone PIPELINING (cada comando espera su
+        respuesta), por lo que no se encadenan MAIL/RCPT/DATA.
         
+        Se aborta el resto del batch si se supera el umbral de fallos
+        (ver should_abort_batch).
+        
+        Args:
+            messages: Mensajes a enviar (máximo MAX_BATCH_SIZE)
+            
+        Returns:
+            Resultados en el mismo orden que messages
+        """
+        results: List[EmailResult] = []
+        failed = 0
+        
+        conn = await self._pool.get()
         try:
-            await aiosmtplib.send(
-                msg,
-                hostname=self.host,
-                port=self.port,
-                username=self.username,
-                password=self.password,
-                use_tls=True
-            )
+            for message in messages:
+                result = await self._send_on(conn, message)
+                results.append(result)
+                if not result.success:
+                    failed += 1
+                    if should_abort_batch(len(results), failed):
+                        break
+        finally:
+            self._pool.put_nowait(conn)
+        
+        skipped = len(messages) - len(results)
+        if skipped:
+            _log_batch_abort(len(results), failed, skipped)
+            results.extend(_aborted_results(skipped))
+        return results
+    
+    async def _send_on(self, conn: _SMTPConnection, message: EmailMessage) -> EmailResult:
+        """
+        Envía un mensaje por una conexión ya tomada del pool.
+        
+        Si el envío falla por la conexión, se descarta para que el
+        próximo uso reconecte.
+        """
+        try:
+            from_addr, recipients, raw = self._build_raw(message)
+        except ValueError as e:
+            return EmailResult(success=False, message_id=None, error=str(e))
+        try:
+            client = await self._ensure_connected(conn)
+            await client.sendmail(from_addr, recipients, raw)
+            conn.sent += 1
             return EmailResult(success=True, message_id=None, error=None)
-        except Exception as e:
+        except aiosmtplib.SMTPServerDisconnected as e:
+            conn.client = None
+            return EmailResult(success=False, message_id=None, error=str(e))
+        except aiosmtplib.SMTPException as e:
             return EmailResult(success=False, message_id=None, error=str(e))
-        ```
+    
+    async def close(self) -> None:
         """
-        # TODO: Implementar
-        raise NotImplementedError("Método pendiente de implementar")
+        Cierra todas las conexiones del pool (QUIT).
+        
+        Llamar al apagar el servicio (evento shutdown / lifespan de FastAPI).
+        Espera a que terminen los envíos en curso.
+        """
+        conns = [await self._pool.get() for _ in range(self.pool_size)]
+        for conn in conns:
+            await self._disconnect(conn)
+            self._pool.put_nowait(conn)
+
+
+# ==============================================================================
+# IMPLEMENTACIÓN: SENDGRID
+# ==============================================================================
+
+class SendGridProvider(EmailProvider):
+    """
+    Proveedor de email usando la API HTTP de SendGrid.
+    
+    send_batch agrupa los mensajes en una sola llamada a /v3/mail/send
+    con un elemento de "personalizations" por destinatario: un request
+    (sobre una conexión HTTP/2 reutilizada) para hasta 1000 emails en
+    lugar de un request por email.
+    
+    Se agrupan en la misma llamada los mensajes que comparten remitente
+    y template del proveedor (template_id) o, sin template, el mismo
+    contenido ya renderizado.
+    """
+    
+    API_URL = "https://api.sendgrid.com/v3/mail/send"
+    
+    def __init__(self, api_key: str = None):
+        """
+        Inicializa el proveedor SendGrid.
+        
+        Si no se proporciona la API key, se lee de settings.
+        """
+        self.api_key = api_key or settings.SENDGRID_API_KEY
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Cliente HTTP compartido (se crea en el primer uso)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,  # requiere httpx[http2] (paquete h2)
+                limits=httpx.Limits(max_connections=20),
+                timeout=30.0,
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Cierra el cliente HTTP (llamar al apagar el servicio)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def send(self, message: EmailMessage) -> EmailResult:
+        """Envía un email (batch de un solo mensaje)."""
+        results = await self.send_batch([message])
+        return results[0]
+    
+    @staticmethod
+    def _group_key(message: EmailMessage) -> tuple:
+        """Mensajes con la misma key pueden ir en la misma llamada."""
+        sender = (
+            message.from_email or settings.EMAIL_FROM,
+            message.from_name,
+            message.reply_to
+        )
+        if message.template_id:
+            return sender + (message.template_id,)
+        return sender + (message.subject, message.html_content, message.text_content)
+    
+    @staticmethod
+    def _personalization(message: EmailMessage) -> dict:
+        """Arma el bloque de personalization de un destinatario."""
+        personalization = {"to": [{"email": message.to}]}
+        if message.cc:
+            personalization["cc"] = [{"email": email} for email in message.cc]
+        if message.bcc:
+            personalization["bcc"] = [{"email": email} for email in message.bcc]
+        if message.template_id:
+            personalization["subject"] = message.subject
+            personalization["dynamic_template_data"] = message.template_data or {}
+        return personalization
+    
+    def _build_payload(self, messages: List[EmailMessage]) -> dict:
+        """Arma el payload de /v3/mail/send para un grupo de mensajes."""
+        first = messages[0]
+        payload = {
+            "personalizations": [self._personalization(m) for m in messages],
+            "from": {"email": first.from_email or settings.EMAIL_FROM},
+        }
+        if first.from_name:
+            payload["from"]["name"] = first.from_name
+        if first.reply_to:
+            payload["reply_to"] = {"email": first.reply_to}
+        
+        if first.template_id:
+            payload["template_id"] = first.template_id
+        else:
+            payload["subject"] = first.subject
+            payload["content"] = []
+            if first.text_content:
+                payload["content"].append({"type": "text/plain", "value": first.text_content})
+            payload["content"].append({"type": "text/html", "value": first.html_content})
+        return payload
+    
+    async def send_batch(self, messages: List[EmailMessage]) -> List[EmailResult]:
+        """
+        Envía varios emails usando personalizations de SendGrid.
+        
+        Args:
+            messages: Mensajes a enviar (máximo MAX_BATCH_SIZE)
+            
+        Returns:
+            Resultados en el mismo orden que messages
+        """
+        if len(messages) > self.MAX_BATCH_SIZE:
+            raise ValueError(
+                f"send_batch acepta hasta {self.MAX_BATCH_SIZE} mensajes"
+            )
+        
+        # Agrupar preservando la posición original de cada mensaje
+        groups: dict[tuple, list[int]] = {}
+        for index, message in enumerate(messages):
+            groups.setdefault(self._group_key(message), []).append(index)
+        
+        client = self._get_client()
+        results: List[Optional[EmailResult]] = [None] * len(messages)
+        
+        for indexes in groups.values():
+            group = [messages[i] for i in indexes]
+            try:
+                response = await client.post(
+                    self.API_URL,
+                    json=self._build_payload(group)
+                )
+                response.raise_for_status()
+                result = EmailResult(
+                    success=True,
+                    message_id=response.headers.get("X-Message-Id"),
+                    error=None
+                )
+            except httpx.HTTPError as e:
+                result = EmailResult(success=False, message_id=None, error=str(e))
+            
+            for i in indexes:
+                results[i] = result
+        
+        return results
+
+
+# ==============================================================================
+# TEMPLATES (JINJA2)
+# ==============================================================================
+# Un único Environment por proceso: cada template se parsea y compila una sola
+# vez y queda en el cache interno de Jinja (cache_size=400 por defecto).
+# Crear un Environment por email obligaría a recompilar el template cada vez.
+
+TEMPLATES_DIR = "templates/emails"
+
+# Templates precompilados a módulos Python (ver scripts/compile_email_templates.py).
+# Si el directorio existe (imagen Docker / CI) se cargan desde ahí: sin stat,
+# lectura ni parseo de archivos de template en tiempo de ejecución.
+COMPILED_TEMPLATES_DIR = "app/email_templates_compiled"
+
+# Bytecode compilado de los templates, persistido entre reinicios del proceso.
+# Solo se usa cuando no hay templates precompilados (desarrollo).
+# El directorio debe ser escribible por el usuario del servicio.
+JINJA_BYTECODE_CACHE_DIR = os.getenv(
+    "JINJA_BYTECODE_CACHE_DIR",
+    "/var/cache/notifications/jinja"
+)
+
+_JINJA_ENV: Optional[Environment] = None
+_JINJA_ENV_LOCK = threading.Lock()
+
+
+def create_jinja_env(loader: BaseLoader, **options) -> Environment:
+    """
+    Crea un Environment con las opciones usadas para los emails.
+    
+    Compartido con el script de precompilación: el código compilado
+    depende de estas opciones (autoescape, modo async).
+    
+    - auto_reload=False: no se revisa la fecha de los archivos en cada render
+    - enable_async=True: permite render_async() sin bloquear el event loop
+    """
+    return Environment(
+        loader=loader,
+        auto_reload=False,
+        autoescape=select_autoescape(["html"]),
+        enable_async=True,
+        **options
+    )
+
+
+def get_jinja_env() -> Environment:
+    """
+    Retorna el Environment de Jinja2 compartido (se crea en el primer uso).
+    
+    - Con templates precompilados: ModuleLoader (solo import de módulos)
+    - Sin ellos: FileSystemLoader + bytecode_cache, para que en un arranque
+      en frío el template se cargue desde el bytecode ya compilado
+    """
+    global _JINJA_ENV
+    if _JINJA_ENV is None:
+        with _JINJA_ENV_LOCK:
+            if _JINJA_ENV is None:
+                if os.path.isdir(COMPILED_TEMPLATES_DIR):
+                    _JINJA_ENV = create_jinja_env(ModuleLoader(COMPILED_TEMPLATES_DIR))
+                else:
+                    os.makedirs(JINJA_BYTECODE_CACHE_DIR, exist_ok=True)
+                    _JINJA_ENV = create_jinja_env(
+                        FileSystemLoader(TEMPLATES_DIR),
+                        bytecode_cache=FileSystemBytecodeCache(JINJA_BYTECODE_CACHE_DIR)
+                    )
+    return _JINJA_ENV
 
 
 # ==============================================================================
@@ -161,6 +740,10 @@ class EmailService:
     USO:
         service = EmailService()
         await service.send_order_confirmation(order)
+    
+    IMPORTANTE: Desde un request HTTP no enviar directamente (bloquea la
+    respuesta hasta terminar el intercambio SMTP): renderizar el mensaje
+    y encolarlo con OutboxService; el worker (app/worker.py) lo envía.
     """
     
     def __init__(self, provider: EmailProvider = None):
@@ -176,7 +759,7 @@ class EmailService:
     # TEMPLATES DE EMAIL
     # =========================================================================
     
-    def _render_template(
+    async def _render_template(
         self, 
         template_name: str, 
         context: dict
@@ -184,30 +767,68 @@ class EmailService:
         """
         Renderiza un template de email.
         
+        Usa el Environment compartido (ver get_jinja_env): los templates
+        se compilan una sola vez por proceso.
+        
         Args:
             template_name: Nombre del template
             context: Variables para el template
             
         Returns:
             Tupla (html_content, text_content)
+        """
+        env = get_jinja_env()
+        
+        html_template = env.get_template(f"{template_name}.html")
+        text_template = env.get_template(f"{template_name}.txt")
+        
+        # Ambas versiones se renderizan en paralelo
+        html, text = await asyncio.gather(
+            html_template.render_async(**context),
+            text_template.render_async(**context)
+        )
+        return html, text
+    
+    # =========================================================================
+    # ENVÍO MASIVO
+    # =========================================================================
+    
+    async def send_many(self, messages: List[EmailMessage]) -> List[EmailResult]:
+        """
+        Envía muchos emails ya armados (newsletters, avisos masivos).
+        
+        Divide los mensajes en batches de provider.MAX_BATCH_SIZE y usa
+        send_batch del proveedor (una conexión SMTP por batch, o una
+        llamada a la API masiva en proveedores HTTP).
+        
+        Si se supera el umbral de fallos (ver should_abort_batch) no se
+        envían los batches restantes; sus mensajes quedan con
+        error=BATCH_ABORT_ERROR.
+        
+        Args:
+            messages: Mensajes a enviar
             
-        TODO: Implementar con Jinja2 o similar
+        Returns:
+            Resultados en el mismo orden que messages
         """
-        # TODO: Implementar renderizado de templates
-        # 
-        # from jinja2 import Environment, FileSystemLoader
-        # 
-        # env = Environment(loader=FileSystemLoader("templates/emails"))
-        # 
-        # html_template = env.get_template(f"{template_name}.html")
-        # text_template = env.get_template(f"{template_name}.txt")
-        # 
-        # return (
-        #     html_template.render(**context),
-        #     text_template.render(**context)
-        # )
+        batch_size = self.provider.MAX_BATCH_SIZE
+        results: List[EmailResult] = []
+        failed = 0
         
-        raise NotImplementedError("Método pendiente de implementar")
+        for start in range(0, len(messages), batch_size):
+            batch_results = await self.provider.send_batch(
+                messages[start:start + batch_size]
+            )
+            results.extend(batch_results)
+            failed += sum(1 for result in batch_results if not result.success)
+            if should_abort_batch(len(results), failed):
+                break
+        
+        skipped = len(messages) - len(results)
+        if skipped:
+            _log_batch_abort(len(results), failed, skipped)
+            results.extend(_aborted_results(skipped))
+        return results
     
     # =========================================================================
     # EMAILS DE ORDEN
@@ -239,9 +860,9 @@ class EmailService:
         #     "shipping_address": order["shipping_address"]
         # }
         # 
-        # html, text = self._render_template("order_confirmation", context)
+        # html, text = await self._render_template("order_confirmation", context)
         # 
-        # message = EmailMessage(
+        # message = EmailMessage.build(
         #     to=order["customer_email"],
         #     subject=f"Confirmación de orden #{order['order_number']}",
         #     html_content=html,
@@ -0,0 +1,73 @@
+"""
+Servicio de outbox de emails.
+
+Encola emails en la tabla email_outbox para que el worker los envíe
+fuera del request HTTP.
+"""
+
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.outbox import EmailOutbox
+from app.services.email_service import EmailMessage
+
+# Canal de LISTEN/NOTIFY que despierta al worker
+OUTBOX_CHANNEL = "email_outbox"
+
+
+class OutboxService:
+    """
+    Servicio para encolar emails.
+    
+    USO (dentro del handler, con la misma sesión de la orden):
+        outbox = OutboxService(db)
+        await outbox.enqueue(message)
+        await db.commit()
+    
+    El INSERT y el NOTIFY forman parte de la transacción del llamador:
+    si la orden no se confirma, el email tampoco se envía. El NOTIFY se
+    entrega recién al hacer commit.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        """
+        Inicializa el servicio con una sesión de BD.
+        
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+        """
+        self.db = db
+    
+    async def enqueue(self, message: EmailMessage) -> None:
+        """
+        Encola un email.
+        
+        Args:
+            message: Mensaje ya renderizado
+        """
+        await self.enqueue_many([message])
+    
+    async def enqueue_many(self, messages: List[EmailMessage]) -> None:
+        """
+        Encola varios emails y notifica al worker una sola vez.
+        
+        Args:
+            messages: Mensajes ya renderizados
+        """
+        if not messages:
+            return
+        
+        self.db.add_all([
+            EmailOutbox(
+                to_email=message.to,
+                from_email=message.from_email,
+                reply_to=message.reply_to,
+                subject=message.subject,
+                html_content=message.html_content,
+                text_content=message.text_content
+            )
+            for message in messages
+        ])
+        await self.db.execute(text(f"NOTIFY {OUTBOX_CHANNEL}"))
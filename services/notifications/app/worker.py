@@ -0,0 +1,164 @@
+"""
+Worker de envío de emails.
+
+Vacía la tabla email_outbox en batches usando una sola conexión SMTP por
+batch (SMTPProvider.send_batch). Se despierta con LISTEN email_outbox y,
+como respaldo, revisa la tabla cada POLL_INTERVAL_SECONDS.
+
+Ejecutar:
+    python -m app.worker
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.models.outbox import EmailOutbox
+from app.services.email_service import EmailMessage, EmailProvider, SMTPProvider
+from app.services.outbox_service import OUTBOX_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Emails por batch (filas bloqueadas por transacción)
+BATCH_SIZE = 100
+
+# Intentos antes de dejar un email como fallido definitivamente
+MAX_ATTEMPTS = 5
+
+# Revisión periódica por si se pierde un NOTIFY
+POLL_INTERVAL_SECONDS = 30
+
+# Espera tras un error al vaciar la outbox (segundos, se duplica hasta el máximo)
+ERROR_BACKOFF_SECONDS = 1.0
+MAX_ERROR_BACKOFF_SECONDS = 60.0
+
+
+def _backoff(attempts: int) -> timedelta:
+    """Espera antes del próximo intento (exponencial: 1, 2, 4, 8... minutos)."""
+    return timedelta(minutes=2 ** (attempts - 1))
+
+
+async def drain_batch(
+    session_factory: async_sessionmaker[AsyncSession],
+    provider: EmailProvider
+) -> int:
+    """
+    Envía un batch de emails pendientes.
+    
+    Las filas se bloquean con FOR UPDATE SKIP LOCKED durante el envío:
+    otros workers las saltean y, si este worker cae, la transacción se
+    deshace y las filas vuelven a quedar disponibles.
+    
+    Returns:
+        Cantidad de emails procesados (0 si no había pendientes)
+    """
+    async with session_factory() as db, db.begin():
+        query = (
+            select(EmailOutbox)
+            .where(
+                EmailOutbox.sent_at.is_(None),
+                EmailOutbox.attempts < MAX_ATTEMPTS,
+                EmailOutbox.next_attempt_at <= func.now()
+            )
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        rows = (await db.execute(query)).scalars().all()
+        if not rows:
+            return 0
+        
+        messages = [
+            EmailMessage.build(
+                to=row.to_email,
+                subject=row.subject,
+                html_content=row.html_content,
+                text_content=row.text_content,
+                from_email=row.from_email,
+                reply_to=row.reply_to
+            )
+            for row in rows
+        ]
+        results = await provider.send_batch(messages)
+        
+        for row, result in zip(rows, results):
+            if result.success:
+                row.sent_at = func.now()
+            else:
+                row.attempts += 1
+                row.last_error = result.error
+                row.next_attempt_at = func.now() + _backoff(row.attempts)
+        
+        return len(rows)
+
+
+async def _listen(wakeup: asyncio.Event) -> asyncpg.Connection:
+    """Conexión dedicada para LISTEN (asyncpg directo)."""
+    conn = await asyncpg.connect(
+        settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+    )
+    await conn.add_listener(OUTBOX_CHANNEL, lambda *args: wakeup.set())
+    # Si la conexión se corta, despertar el loop para reconectar
+    conn.add_termination_listener(lambda *args: wakeup.set())
+    return conn
+
+
+async def run_worker() -> None:
+    """
+    Loop principal: vacía la outbox y espera nuevos NOTIFY.
+    
+    Un error al vaciar (BD caída, SMTP caído) no termina el worker: se
+    loguea y se reintenta con espera exponencial (hasta
+    MAX_ERROR_BACKOFF_SECONDS). Si la conexión de LISTEN se cae se vuelve
+    a abrir; mientras no se pueda, el worker sigue por polling.
+    """
+    engine = create_async_engine(settings.DATABASE_URL)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    provider = SMTPProvider()
+    
+    wakeup = asyncio.Event()
+    listen_conn: Optional[asyncpg.Connection] = None
+    backoff = ERROR_BACKOFF_SECONDS
+    
+    try:
+        while True:
+            if listen_conn is None or listen_conn.is_closed():
+                try:
+                    listen_conn = await _listen(wakeup)
+                except (OSError, asyncpg.PostgresError):
+                    listen_conn = None
+                    logger.exception("No se pudo abrir la conexión de LISTEN")
+            
+            wakeup.clear()
+            try:
+                while await drain_batch(session_factory, provider):
+                    pass
+            except Exception:
+                logger.exception(
+                    "Error vaciando la outbox, reintento en %.0fs", backoff
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_ERROR_BACKOFF_SECONDS)
+                continue
+            backoff = ERROR_BACKOFF_SECONDS
+            
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        if listen_conn is not None:
+            await listen_conn.close()
+        await provider.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
@@ -0,0 +1,39 @@
+"""
+Precompila los templates de email a módulos Python.
+
+Ejecutar durante el build de la imagen / CI, desde la raíz del servicio:
+
+    python scripts/compile_email_templates.py
+
+Genera COMPILED_TEMPLATES_DIR, que EmailService carga con ModuleLoader
+(ver app/services/email_service.py).
+"""
+
+import sys
+from pathlib import Path
+
+# Permite importar `app` al ejecutar el script desde la raíz del servicio
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jinja2 import FileSystemLoader
+
+from app.services.email_service import (
+    COMPILED_TEMPLATES_DIR,
+    TEMPLATES_DIR,
+    create_jinja_env,
+)
+
+
+def main() -> None:
+    """Compila todos los templates de TEMPLATES_DIR."""
+    env = create_jinja_env(FileSystemLoader(TEMPLATES_DIR))
+    env.compile_templates(
+        COMPILED_TEMPLATES_DIR,
+        zip=None,
+        ignore_errors=False
+    )
+    print(f"Templates compilados en {COMPILED_TEMPLATES_DIR}")
+
+
+if __name__ == "__main__":
+    main()
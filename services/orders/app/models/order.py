@@ -5,15 +5,16 @@ Las órdenes representan compras completadas o en proceso.
 """
 
 import uuid
-from datetime import datetime
 from decimal import Decimal
 from enum import Enum as PyEnum
 
 from sqlalchemy import (
     Column, String, Boolean, DateTime, 
-    ForeignKey, Enum, Text, Integer, Numeric
+    ForeignKey, Enum, Text, Integer, BigInteger, Numeric,
+    DDL, FetchedValue, Index, Sequence, cast, event, func, text
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
 # TODO: Importar Base desde database.py
@@ -21,6 +22,49 @@ from sqlalchemy.orm import declarative_base
 Base = declarative_base()
 
 
+# ==============================================================================
+# SECUENCIAS
+# ==============================================================================
+
+# Numeración de órdenes: la genera PostgreSQL en el INSERT (DEFAULT), sin
+# SELECT MAX previo ni carreras entre escrituras concurrentes.
+# Se asocia a la metadata para que create_all la cree antes que la tabla.
+order_number_seq = Sequence("orders_number_seq", metadata=Base.metadata)
+
+
+# ==============================================================================
+# MONTOS
+# ==============================================================================
+
+def money_display(cents_attr: str) -> hybrid_property:
+    """
+    Expone una columna de centavos como Decimal con 2 decimales.
+    
+    - En Python: Decimal(cents).scaleb(-2) (para serializers de la API)
+    - En SQL: NUMERIC con 2 decimales, para usar en consultas si hace falta
+    
+    Uso:
+        total_cents = Column(BigInteger, ...)
+        total_display = money_display("total_cents")
+    """
+    def fget(self):
+        cents = getattr(self, cents_attr)
+        # scaleb(-2) corre el exponente: exacto y siempre con 2 decimales
+        # (Decimal(cents) / 100 pierde los ceros: da "12.5" o "100")
+        return None if cents is None else Decimal(cents).scaleb(-2)
+    
+    def expr(cls):
+        # NUMERIC sin precisión: NUMERIC(12, 2) desbordaría desde 10^10
+        # centavos. La división de NUMERIC devuelve escala alta
+        # (12.5000000000000000): round(..., 2) la deja en 2 decimales,
+        # exacto (sin pasar por float)
+        return func.round(
+            cast(getattr(cls, cents_attr), Numeric) / 100, 2, type_=Numeric
+        )
+    
+    return hybrid_property(fget, expr=expr)
+
+
 # ==============================================================================
 # ENUMS
 # ==============================================================================
@@ -55,6 +99,13 @@ class PaymentMethod(str, PyEnum):
     CASH_ON_DELIVERY = "cash_on_delivery"
 
 
+# Tipos ENUM nativos de PostgreSQL (se guardan como valor de 4 bytes, no texto).
+# Se comparte una sola instancia por tipo para que create_all emita un único
+# CREATE TYPE aunque varias columnas lo usen.
+order_status_enum = Enum(OrderStatus, name="order_status", native_enum=True)
+payment_method_enum = Enum(PaymentMethod, name="payment_method", native_enum=True)
+
+
 # ==============================================================================
 # MODELO: Order
 # ==============================================================================
@@ -81,9 +132,15 @@ class Order(Base):
     )
     
     # Número de orden legible (ej: ORD-2024-0001)
-    # TODO: Generar automáticamente con secuencia
+    # Generado por la BD con orders_number_seq (mínimo 4 dígitos, sin truncar).
+    # Se lee de vuelta con RETURNING al hacer flush.
+    # NOTA: La secuencia es global, no se reinicia cada año.
     order_number = Column(
         String(20), 
+        server_default=text(
+            "'ORD-' || to_char(now(), 'YYYY') || '-' || "
+            "to_char(nextval('orders_number_seq'), 'FM99999990000')"
+        ),
         unique=True, 
         index=True,
         nullable=False,
@@ -91,9 +148,9 @@ class Order(Base):
     )
     
     # Usuario que hizo la compra
+    # Indexado por ix_orders_user_created (ver __table_args__)
     user_id = Column(
         UUID(as_uuid=True), 
-        index=True,
         nullable=False,
         comment="ID del usuario que realizó la orden"
     )
@@ -102,10 +159,10 @@ class Order(Base):
     # Estado
     # =========================================================================
     
+    # Indexado por ix_orders_status_created (ver __table_args__)
     status = Column(
-        Enum(OrderStatus), 
+        order_status_enum, 
         default=OrderStatus.PENDING,
-        index=True,
         nullable=False,
         comment="Estado actual de la orden"
     )
@@ -113,20 +170,23 @@ class Order(Base):
     # =========================================================================
     # Montos
     # =========================================================================
-    # IMPORTANTE: Usar Numeric para evitar errores de precisión
+    # IMPORTANTE: Montos en centavos (enteros) para evitar errores de precisión.
+    # BIGINT es más chico y rápido que NUMERIC (aritmética nativa en SUM/ORDER
+    # BY, sin parseo a Decimal al cargar cada fila). Convertir a Decimal solo
+    # al serializar (ver *_display).
     
     # Subtotal (suma de items)
-    subtotal = Column(
-        Numeric(10, 2), 
+    subtotal_cents = Column(
+        BigInteger, 
         nullable=False,
-        comment="Subtotal (suma de items sin descuentos)"
+        comment="Subtotal en centavos (suma de items sin descuentos)"
     )
     
     # Descuento aplicado
-    discount_amount = Column(
-        Numeric(10, 2), 
+    discount_amount_cents = Column(
+        BigInteger, 
         default=0,
-        comment="Monto de descuento aplicado"
+        comment="Monto de descuento aplicado en centavos"
     )
     
     # Código de cupón usado (referencia)
@@ -137,26 +197,33 @@ class Order(Base):
     )
     
     # Costo de envío
-    shipping_cost = Column(
-        Numeric(10, 2), 
+    shipping_cost_cents = Column(
+        BigInteger, 
         default=0,
-        comment="Costo de envío"
+        comment="Costo de envío en centavos"
     )
     
     # Impuestos
-    tax_amount = Column(
-        Numeric(10, 2), 
+    tax_amount_cents = Column(
+        BigInteger, 
         default=0,
-        comment="Monto de impuestos"
+        comment="Monto de impuestos en centavos"
     )
     
     # Total final
-    total = Column(
-        Numeric(10, 2), 
+    total_cents = Column(
+        BigInteger, 
         nullable=False,
-        comment="Total a pagar (subtotal - descuento + envío + impuestos)"
+        comment="Total a pagar en centavos (subtotal - descuento + envío + impuestos)"
     )
     
+    # Montos como Decimal (para la API)
+    subtotal_display = money_display("subtotal_cents")
+    discount_amount_display = money_display("discount_amount_cents")
+    shipping_cost_display = money_display("shipping_cost_cents")
+    tax_amount_display = money_display("tax_amount_cents")
+    total_display = money_display("total_cents")
+    
     # Moneda
     currency = Column(
         String(3), 
@@ -170,7 +237,7 @@ class Order(Base):
     
     # Método de pago
     payment_method = Column(
-        Enum(PaymentMethod), 
+        payment_method_enum, 
         nullable=True,
         comment="Método de pago utilizado"
     )
@@ -184,7 +251,7 @@ class Order(Base):
     
     # Fecha de pago
     paid_at = Column(
-        DateTime, 
+        DateTime(timezone=True), 
         nullable=True,
         comment="Fecha en que se confirmó el pago"
     )
@@ -200,24 +267,31 @@ class Order(Base):
         comment="ID de la dirección (referencia)"
     )
     
-    # Snapshot de la dirección
-    shipping_recipient = Column(String(200), nullable=True)
-    shipping_street = Column(String(200), nullable=True)
-    shipping_number = Column(String(20), nullable=True)
-    shipping_apartment = Column(String(50), nullable=True)
-    shipping_city = Column(String(100), nullable=True)
-    shipping_state = Column(String(100), nullable=True)
-    shipping_postal_code = Column(String(20), nullable=True)
-    shipping_country = Column(String(100), nullable=True)
-    shipping_phone = Column(String(20), nullable=True)
+    # Snapshot de la dirección (una sola columna JSONB)
+    # No se filtra por estos datos: en JSONB no ensanchan la fila ni se leen
+    # en los listados; solo se usan en el detalle de la orden.
+    # Claves: recipient, street, number, apartment, city, state,
+    #         postal_code, country, phone
+    # Si alguna clave pasa a usarse como filtro, agregar un índice parcial
+    # sobre esa expresión (ej: shipping_snapshot->>'postal_code').
+    shipping_snapshot = Column(
+        JSONB, 
+        nullable=True,
+        comment="Snapshot de la dirección de envío"
+    )
     
     # =========================================================================
     # Dirección de facturación (snapshot)
     # =========================================================================
     
     billing_address_id = Column(UUID(as_uuid=True), nullable=True)
-    billing_name = Column(String(200), nullable=True)
-    billing_tax_id = Column(String(20), nullable=True, comment="CUIT/CUIL")
+    
+    # Claves: name, tax_id (CUIT/CUIL)
+    billing_snapshot = Column(
+        JSONB, 
+        nullable=True,
+        comment="Snapshot de los datos de facturación"
+    )
     
     # =========================================================================
     # Envío
@@ -246,16 +320,16 @@ class Order(Base):
     
     # Fecha estimada de entrega
     estimated_delivery = Column(
-        DateTime, 
+        DateTime(timezone=True), 
         nullable=True,
         comment="Fecha estimada de entrega"
     )
     
     # Fecha real de envío
-    shipped_at = Column(DateTime, nullable=True)
+    shipped_at = Column(DateTime(timezone=True), nullable=True)
     
     # Fecha real de entrega
-    delivered_at = Column(DateTime, nullable=True)
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
     
     # =========================================================================
     # Notas
@@ -306,9 +380,20 @@ class Order(Base):
     # Timestamps
     # =========================================================================
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    cancelled_at = Column(DateTime, nullable=True)
+    # Generados por PostgreSQL (now()); updated_at lo mantiene el trigger
+    # orders_touch_updated_at (ver al final del módulo)
+    created_at = Column(
+        DateTime(timezone=True), 
+        server_default=func.now(), 
+        nullable=False
+    )
+    updated_at = Column(
+        DateTime(timezone=True), 
+        server_default=func.now(), 
+        server_onupdate=FetchedValue(),
+        nullable=False
+    )
+    cancelled_at = Column(DateTime(timezone=True), nullable=True)
     
     # =========================================================================
     # Relaciones
@@ -326,6 +411,27 @@ class Order(Base):
         cascade="all, delete-orphan"
     )
     
+    # =========================================================================
+    # Índices
+    # =========================================================================
+    # Compuestos según las consultas más frecuentes: filtran y ordenan con el
+    # mismo índice (sin nodo Sort). La primera columna de cada uno cubre
+    # también los filtros solo por user_id / status.
+    
+    __table_args__ = (
+        # "Mis órdenes": WHERE user_id = ? AND (created_at, id) < (?, ?)
+        # ORDER BY created_at DESC, id DESC (cursor de OrderService)
+        Index("ix_orders_user_created", user_id, created_at.desc(), id.desc()),
+        # Admin por estado: WHERE status = ? ORDER BY created_at DESC
+        Index("ix_orders_status_created", status, created_at.desc()),
+        # Reportes de pagos: parcial, la mayoría de las filas tiene paid_at NULL
+        Index(
+            "ix_orders_paid_at",
+            paid_at,
+            postgresql_where=text("paid_at IS NOT NULL")
+        ),
+    )
+    
     def __repr__(self):
         return f"<Order {self.order_number}>"
 
@@ -410,26 +516,32 @@ class OrderItem(Base):
         comment="Cantidad comprada"
     )
     
-    unit_price = Column(
-        Numeric(10, 2), 
+    # Montos en centavos (ver Order)
+    unit_price_cents = Column(
+        BigInteger, 
         nullable=False,
-        comment="Precio unitario al momento de compra"
+        comment="Precio unitario al momento de compra, en centavos"
     )
     
     # Descuento por item (si aplica)
-    discount = Column(
-        Numeric(10, 2), 
+    discount_cents = Column(
+        BigInteger, 
         default=0,
-        comment="Descuento aplicado al item"
+        comment="Descuento aplicado al item, en centavos"
     )
     
     # Total del item
-    total = Column(
-        Numeric(10, 2), 
+    total_cents = Column(
+        BigInteger, 
         nullable=False,
-        comment="Total (quantity * unit_price - discount)"
+        comment="Total en centavos (quantity * unit_price - discount)"
     )
     
+    # Montos como Decimal (para la API)
+    unit_price_display = money_display("unit_price_cents")
+    discount_display = money_display("discount_cents")
+    total_display = money_display("total_cents")
+    
     # =========================================================================
     # Información adicional
     # =========================================================================
@@ -457,13 +569,17 @@ class OrderItem(Base):
     )
     
     # Peso del item (para cálculo de envío)
-    weight = Column(
-        Numeric(8, 2), 
+    weight_grams = Column(
+        Integer, 
         nullable=True,
-        comment="Peso del item"
+        comment="Peso del item en gramos"
     )
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(
+        DateTime(timezone=True), 
+        server_default=func.now(), 
+        nullable=False
+    )
     
     # Relación
     order = relationship("Order", back_populates="items")
@@ -481,28 +597,33 @@ class OrderStatusHistory(Base):
     Historial de cambios de estado de una orden.
     
     Guarda cada cambio de estado para trazabilidad.
+    
+    Tabla append-only. La lectura habitual es el historial (o el último
+    cambio) de una orden: ix_osh_order_created la resuelve con un
+    recorrido del índice, ya ordenado (ORDER BY created_at DESC LIMIT 1
+    para el último).
     """
     __tablename__ = "order_status_history"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
+    # Indexado por ix_osh_order_created (ver __table_args__)
     order_id = Column(
         UUID(as_uuid=True), 
         ForeignKey("orders.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     # Estado anterior
     previous_status = Column(
-        Enum(OrderStatus), 
+        order_status_enum, 
         nullable=True,
         comment="Estado anterior (null si es el primero)"
     )
     
     # Nuevo estado
     new_status = Column(
-        Enum(OrderStatus), 
+        order_status_enum, 
         nullable=False,
         comment="Nuevo estado"
     )
@@ -528,11 +649,49 @@ class OrderStatusHistory(Base):
         comment="Notas adicionales"
     )
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(
+        DateTime(timezone=True), 
+        server_default=func.now(), 
+        nullable=False
+    )
     
     # Relación
     order = relationship("Order", back_populates="status_history")
     
+    __table_args__ = (
+        # Historial de una orden: WHERE order_id = ? ORDER BY created_at DESC
+        Index("ix_osh_order_created", order_id, created_at.desc()),
+    )
+    
     def __repr__(self):
         return f"<OrderStatusHistory {self.previous_status} → {self.new_status}>"
 
+
+# ==============================================================================
+# TRIGGERS
+# ==============================================================================
+# updated_at se actualiza en la BD (BEFORE UPDATE), sin parámetro extra en
+# cada UPDATE. SQLAlchemy lo trata como valor generado (server_onupdate).
+
+# Dos sentencias separadas: asyncpg no admite varias en un mismo execute.
+orders_touch_updated_at_function = DDL("""
+CREATE OR REPLACE FUNCTION orders_touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+""")
+
+orders_touch_updated_at_trigger = DDL("""
+CREATE TRIGGER orders_touch_updated_at
+    BEFORE UPDATE ON orders
+    FOR EACH ROW EXECUTE FUNCTION orders_touch_updated_at()
+""")
+
+for ddl in (orders_touch_updated_at_function, orders_touch_updated_at_trigger):
+    event.listen(
+        Order.__table__,
+        "after_create",
+        ddl.execute_if(dialect="postgresql")
+    )
@@ -0,0 +1,187 @@
+"""
+Servicio de gestión de órdenes.
+
+Creación de órdenes a partir del carrito, cambios de estado
+e historial.
+"""
+
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order import Order, OrderItem, OrderStatus
+
+
+# Filas por lote al recorrer listados grandes con cursor del servidor
+STREAM_BATCH_SIZE = 500
+
+# Columnas que muestran los listados de órdenes.
+# Los listados devuelven Row (tuplas livianas) en lugar de instancias de
+# Order: una instancia ORM carga todas las columnas en su __dict__ más su
+# InstanceState, lo que en páginas de 100+ órdenes son MBs de objetos que
+# solo se usan para serializar.
+ORDER_LIST_COLUMNS = (
+    Order.id,
+    Order.order_number,
+    Order.status,
+    Order.total_cents,
+    Order.currency,
+    Order.created_at,
+)
+
+
+class OrderService:
+    """
+    Servicio para gestión de órdenes.
+    
+    USO:
+        service = OrderService(db)
+        await service.add_items(order.id, lines)
+        orders = await service.list_user_orders(user_id)
+    """
+    
+    def __init__(self, db: AsyncSession):
+        """
+        Inicializa el servicio con una sesión de BD.
+        
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+        """
+        self.db = db
+    
+    # =========================================================================
+    # ITEMS DE LA ORDEN
+    # =========================================================================
+    
+    async def add_items(self, order_id: UUID, lines: list[dict]) -> int:
+        """
+        Inserta los items de una orden en un solo INSERT masivo.
+        
+        En lugar de un session.add(OrderItem(...)) por línea (un INSERT y
+        un objeto ORM por item), se ejecuta insert(OrderItem) con la lista
+        de filas: SQLAlchemy lo envía como INSERT ... VALUES multi-fila
+        (insertmanyvalues), en un solo round-trip.
+        
+        NOTA: Los items no quedan cargados en order.items; la relación
+        se lee de la BD en el próximo acceso. El cascade delete-orphan
+        de la relación sigue aplicando al borrar la orden.
+        
+        Args:
+            order_id: ID de la orden
+            lines: Snapshot de cada producto. Claves: product_id,
+                   product_name, product_sku, quantity, unit_price_cents
+                   y opcionales variant_id, variant_name, product_image,
+                   discount_cents, is_digital, weight_grams
+            
+        Returns:
+            Cantidad de items insertados
+        """
+        if not lines:
+            return 0
+        
+        rows = [
+            {
+                "order_id": order_id,
+                "product_id": line["product_id"],
+                "variant_id": line.get("variant_id"),
+                "product_name": line["product_name"],
+                "product_sku": line["product_sku"],
+                "variant_name": line.get("variant_name"),
+                "product_image": line.get("product_image"),
+                "quantity": line["quantity"],
+                "unit_price_cents": line["unit_price_cents"],
+                "discount_cents": line.get("discount_cents", 0),
+                "total_cents": (
+                    line["quantity"] * line["unit_price_cents"]
+                    - line.get("discount_cents", 0)
+                ),
+                "is_digital": line.get("is_digital", False),
+                "weight_grams": line.get("weight_grams"),
+            }
+            for line in lines
+        ]
+        
+        await self.db.execute(insert(OrderItem), rows)
+        return len(rows)
+    
+    # =========================================================================
+    # LISTADOS
+    # =========================================================================
+    
+    async def list_user_orders(
+        self, 
+        user_id: UUID, 
+        limit: int = 20,
+        before: Optional[tuple[datetime, UUID]] = None
+    ) -> Sequence[Row]:
+        """
+        Lista las órdenes de un usuario, más recientes primero.
+        
+        Usa ix_orders_user_created (filtro y orden en el mismo índice) y
+        paginación por cursor: para la página siguiente, pasar en before
+        (created_at, id) de la última fila recibida. El id desempata las
+        órdenes creadas en el mismo instante: con solo created_at, las que
+        comparten timestamp con el borde de la página se saltearían.
+        
+        Args:
+            user_id: ID del usuario
+            limit: Cantidad máxima de órdenes
+            before: Cursor de paginación ((created_at, id) de la última fila)
+            
+        Returns:
+            Filas con las columnas de ORDER_LIST_COLUMNS
+        """
+        query = (
+            select(*ORDER_LIST_COLUMNS)
+            .where(Order.user_id == user_id)
+            .order_by(Order.created_at.desc(), Order.id.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*before))
+        
+        result = await self.db.execute(query)
+        return result.all()
+    
+    async def stream_orders(
+        self, 
+        created_from: datetime, 
+        created_to: datetime,
+        status: Optional[OrderStatus] = None
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Recorre las órdenes de un rango de fechas (listado admin / exportes).
+        
+        Usa un cursor del servidor (session.stream + yield_per): las filas
+        llegan de a STREAM_BATCH_SIZE, por lo que la memoria es constante
+        sin importar el tamaño del resultado y el primer lote se puede
+        enviar al cliente de inmediato.
+        
+        USO (con StreamingResponse, ver app/utils/responses.py):
+            batches = service.stream_orders(desde, hasta)
+            return StreamingResponse(
+                stream_json_array(batches),
+                media_type="application/json"
+            )
+        
+        Yields:
+            Lotes de filas con las columnas de ORDER_LIST_COLUMNS
+        """
+        query = (
+            select(*ORDER_LIST_COLUMNS)
+            .where(
+                Order.created_at >= created_from,
+                Order.created_at < created_to
+            )
+            .order_by(Order.created_at.desc())
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        if status is not None:
+            query = query.where(Order.status == status)
+        
+        result = await self.db.stream(query)
+        async for partition in result.partitions():
+            yield partition
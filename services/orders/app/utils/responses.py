@@ -0,0 +1,62 @@
+"""
+Respuestas JSON del servicio de órdenes.
+
+Las respuestas de órdenes incluyen muchos UUID, fechas y montos; orjson
+los serializa de forma nativa y mucho más rápido que json.dumps, sin
+pasar por jsonable_encoder.
+"""
+
+from decimal import Decimal
+from typing import Any, AsyncIterator, Sequence
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+def _default(value: Any) -> Any:
+    """Tipos que orjson no serializa de forma nativa."""
+    if isinstance(value, Decimal):
+        # Montos *_display (Decimal con 2 decimales)
+        return float(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+class OrderJSONResponse(ORJSONResponse):
+    """
+    Respuesta JSON con orjson y soporte de Decimal.
+    
+    USO:
+        app = FastAPI(default_response_class=OrderJSONResponse)
+        
+        # Serializar schemas de pydantic v2 con model_dump(mode="json")
+        # o devolver directamente dicts con UUID/datetime/Decimal.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS
+        )
+
+
+async def stream_json_array(
+    batches: AsyncIterator[Sequence[Any]]
+) -> AsyncIterator[bytes]:
+    """
+    Serializa lotes de filas como un único array JSON, de a un lote.
+    
+    Pensado para StreamingResponse: cada lote se convierte y se envía
+    apenas llega de la BD, sin armar la lista completa en memoria.
+    
+    Args:
+        batches: Lotes de Row (ej: OrderService.stream_orders)
+    """
+    yield b"["
+    first = True
+    async for batch in batches:
+        for row in batch:
+            item = orjson.dumps(row._asdict(), default=_default)
+            yield item if first else b"," + item
+            first = False
+    yield b"]"
@@ -26,7 +26,16 @@
 ║  INTEGRACIÓN MERCADOPAGO:                                                    ║
 ║  - Checkout Pro: Redirige a página de MercadoPago                            ║
 ║  - Webhooks: Recibe notificaciones de pagos                                  ║
-║  - SDK: mercadopago>=2.2.0                                                   ║
+║  - API REST vía httpx.AsyncClient (sin SDK bloqueante)                       ║
+║                                                                               ║
+║  EVENT LOOP:                                                                 ║
+║  API y worker corren sobre uvloop:                                           ║
+║  - API: uvicorn app.main:app --loop uvloop                                   ║
+║  - Worker: python -m app.worker (usa uvloop.run)                             ║
+║                                                                               ║
+║  DEPENDENCIAS (además de FastAPI/SQLAlchemy):                                 ║
+║  - httpx[http2]: el cliente de MercadoPago usa HTTP/2 (paquete h2)            ║
+║  - redis, orjson, uvloop                                                      ║
 ║                                                                               ║
 ║  PATRÓN ADAPTADOR:                                                           ║
 ║  Se usa patrón adaptador para abstraer la pasarela de pago.                  ║
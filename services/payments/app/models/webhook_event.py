@@ -0,0 +1,85 @@
+"""
+Modelo de eventos de webhook recibidos.
+
+Registro durable de idempotencia: cada evento de la pasarela se inserta
+una sola vez (PK event_id). El gate de Redis de process_webhook expira a
+las 24 horas; esta tabla cubre entregas repetidas posteriores y sobrevive
+a un flush de Redis.
+"""
+
+from sqlalchemy import Column, String, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+# TODO: Importar Base desde database.py
+# from app.database import Base
+from sqlalchemy.orm import declarative_base
+Base = declarative_base()
+
+
+# ==============================================================================
+# MODELO: WebhookEvent
+# ==============================================================================
+
+class WebhookEvent(Base):
+    """
+    Evento de webhook de una pasarela de pago.
+
+    CICLO DE VIDA:
+    - El worker lo reclama con INSERT ... ON CONFLICT (event_id): un solo
+      round-trip atómico, sin SELECT previo (dos entregas concurrentes del
+      mismo evento no pueden pasar ambas)
+    - status = 'processing' mientras se procesa
+    - status = 'completed' al terminar
+    - Si el procesamiento falla la fila se borra y el reintento lo reclama
+    """
+    __tablename__ = "webhook_events"
+
+    # =========================================================================
+    # Identificación
+    # =========================================================================
+
+    event_id = Column(
+        String(100),
+        primary_key=True,
+        comment="ID del evento en la pasarela (o tipo:id del recurso)"
+    )
+
+    event_type = Column(
+        String(50),
+        nullable=True,
+        comment="Tipo de notificación (payment, merchant_order)"
+    )
+
+    payload = Column(
+        JSONB,
+        nullable=False,
+        comment="Webhook tal como se recibió"
+    )
+
+    # =========================================================================
+    # Estado
+    # =========================================================================
+
+    status = Column(
+        String(20),
+        nullable=False,
+        default="processing",
+        server_default="processing",
+        comment="processing, completed"
+    )
+
+    claimed_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        comment="Fecha en que un worker tomó el evento"
+    )
+
+    completed_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Fecha de fin del procesamiento"
+    )
+
+    def __repr__(self):
+        return f"<WebhookEvent {self.event_id} {self.status}>"
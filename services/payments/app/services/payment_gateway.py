@@ -4,20 +4,87 @@ Interfaz y adaptadores para pasarelas de pago.
 Usa el patrón Adaptador para abstraer diferentes pasarelas de pago.
 """
 
-from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from decimal import Decimal
-from enum import Enum
-from typing import Optional
+import asyncio
+import hashlib
+import hmac
+import logging
+from dataclasses import asdict, dataclass, field
+from enum import StrEnum
+from functools import lru_cache
+from typing import Optional, Protocol
 from uuid import UUID
 
+import httpx
+import orjson
+import redis.asyncio as redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================================================================
+# EXCEPCIONES
+# ==============================================================================
+
+class PaymentError(Exception):
+    """Error al operar con la pasarela de pago."""
+    pass
+
+
+# ==============================================================================
+# MONTOS
+# ==============================================================================
+
+# Unidades menores por unidad de moneda (centavos). Los montos se manejan
+# como enteros en la unidad menor: comparar contra el total de la orden
+# (Order.total_cents) es una comparación de enteros, sin contexto Decimal.
+MONEY_SCALE = {
+    "ARS": 100,
+    "BRL": 100,
+    "COP": 100,
+    "MXN": 100,
+    "PEN": 100,
+    "USD": 100,
+    "UYU": 100,
+    "CLP": 1,   # El peso chileno no tiene decimales
+}
+
+
+def money_scale(currency: str) -> int:
+    """
+    Unidades menores por unidad de la moneda.
+    
+    Raises:
+        PaymentError: Si la moneda no está en MONEY_SCALE
+    """
+    scale = MONEY_SCALE.get(currency)
+    if scale is None:
+        raise PaymentError(f"Moneda no soportada: {currency}")
+    return scale
+
+
+def to_cents(value: float, currency: str) -> int:
+    """Convierte un monto de la pasarela (unidades de moneda) a unidades menores."""
+    return round(value * money_scale(currency))
+
+
+def from_cents(amount_cents: int, currency: str) -> float:
+    """Convierte unidades menores al monto que espera la API de la pasarela."""
+    return amount_cents / money_scale(currency)
+
 
 # ==============================================================================
 # ENUMS Y DATACLASSES
 # ==============================================================================
 
-class PaymentStatus(str, Enum):
-    """Estado del pago."""
+class PaymentStatus(StrEnum):
+    """
+    Estado del pago.
+    
+    StrEnum (Python 3.11): los miembros son str; str(status) y la
+    serialización devuelven el valor ("approved").
+    """
     PENDING = "pending"           # Esperando
     PROCESSING = "processing"     # Procesando
     APPROVED = "approved"         # Aprobado
@@ -27,7 +94,20 @@ class PaymentStatus(str, Enum):
     CHARGED_BACK = "charged_back" # Contracargo
 
 
-@dataclass
+# Estado de MercadoPago -> PaymentStatus (se construye una vez, al importar)
+_MP_STATUS_MAP: dict[str, PaymentStatus] = {
+    "approved": PaymentStatus.APPROVED,
+    "pending": PaymentStatus.PENDING,
+    "in_process": PaymentStatus.PROCESSING,
+    "rejected": PaymentStatus.REJECTED,
+    "cancelled": PaymentStatus.CANCELLED,
+    "refunded": PaymentStatus.REFUNDED,
+    "charged_back": PaymentStatus.CHARGED_BACK
+}
+_MP_STATUS_DEFAULT = PaymentStatus.PENDING
+
+
+@dataclass(slots=True, frozen=True)
 class PaymentIntent:
     """
     Intención de pago (resultado de crear pago).
@@ -43,22 +123,37 @@ class PaymentIntent:
     expires_at: Optional[str]       # Fecha de expiración
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PaymentResult:
     """
     Resultado de verificación de pago.
+    
+    Inmutable y hashable: raw_data queda fuera de __eq__/__hash__, por lo
+    que dos resultados del mismo pago con el mismo estado son iguales
+    aunque la pasarela devuelva metadatos distintos.
     """
     id: str
     external_id: str
     status: PaymentStatus
-    amount: Decimal
+    amount_cents: int               # Monto en unidades menores (ver MONEY_SCALE)
     currency: str
     payment_method: Optional[str]
     paid_at: Optional[str]
-    raw_data: dict                  # Datos originales de la pasarela
+    raw_data: dict = field(compare=False)  # Datos originales de la pasarela
+    
+    def to_json(self) -> bytes:
+        """Serializa el resultado (para cachearlo en Redis)."""
+        return orjson.dumps(asdict(self))
+    
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "PaymentResult":
+        """Reconstruye un resultado serializado con to_json."""
+        data = orjson.loads(raw)
+        data["status"] = PaymentStatus(data["status"])
+        return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RefundResult:
     """
     Resultado de un reembolso.
@@ -66,32 +161,35 @@ class RefundResult:
     id: str
     payment_id: str
     status: PaymentStatus
-    amount: Decimal
+    amount_cents: int               # Monto reembolsado en unidades menores
     reason: Optional[str]
 
 
 # ==============================================================================
-# INTERFAZ ABSTRACTA
+# INTERFAZ
 # ==============================================================================
 
-class PaymentGateway(ABC):
+class PaymentGateway(Protocol):
     """
-    Interfaz abstracta para pasarelas de pago.
+    Interfaz (Protocol) para pasarelas de pago.
     
     Todas las pasarelas deben implementar estos métodos.
     Esto permite cambiar de pasarela sin modificar el resto del código.
     
+    Es un Protocol (tipado estructural) en lugar de una ABC: el type checker
+    verifica la interfaz y no hay metaclase ABCMeta en la instanciación.
+    Los métodos base lanzan NotImplementedError como red de seguridad.
+    
     USO:
         gateway = MercadoPagoGateway()
         intent = await gateway.create_payment(order)
         # Redirigir usuario a intent.checkout_url
     """
     
-    @abstractmethod
     async def create_payment(
         self,
         order_id: str,
-        amount: Decimal,
+        amount_cents: int,
         currency: str,
         description: str,
         customer_email: str,
@@ -105,21 +203,21 @@ class PaymentGateway(ABC):
         
         Args:
             order_id: ID de la orden
-            amount: Monto total
+            amount_cents: Monto total en unidades menores (ver MONEY_SCALE)
             currency: Código de moneda (ARS, USD, etc.)
             description: Descripción del pago
             customer_email: Email del cliente
             success_url: URL de redirección si el pago es exitoso
             failure_url: URL de redirección si el pago falla
             pending_url: URL de redirección si el pago queda pendiente
-            items: Lista de items (para mostrar en checkout)
+            items: Lista de items (para mostrar en checkout), con
+                   id, name, quantity y price_cents
             
         Returns:
             PaymentIntent con URL de checkout
         """
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     async def get_payment(self, payment_id: str) -> PaymentResult:
         """
         Obtiene el estado actual de un pago.
@@ -130,23 +228,27 @@ class PaymentGateway(ABC):
         Returns:
             PaymentResult con estado actual
         """
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
-    async def verify_webhook(self, payload: dict, signature: str) -> bool:
+    async def verify_webhook(
+        self, 
+        payload: dict, 
+        signature: str, 
+        request_id: str = ""
+    ) -> bool:
         """
         Verifica la firma de un webhook.
         
         Args:
             payload: Datos del webhook
             signature: Firma a verificar
+            request_id: ID del request (si la pasarela lo incluye en la firma)
             
         Returns:
             True si la firma es válida
         """
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     async def process_webhook(self, payload: dict) -> PaymentResult:
         """
         Procesa un webhook de la pasarela.
@@ -157,27 +259,28 @@ class PaymentGateway(ABC):
         Returns:
             PaymentResult con estado actualizado
         """
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     async def refund(
         self,
         payment_id: str,
-        amount: Optional[Decimal] = None,
-        reason: Optional[str] = None
+        amount_cents: Optional[int] = None,
+        reason: Optional[str] = None,
+        currency: str = "ARS"
     ) -> RefundResult:
         """
         Procesa un reembolso.
         
         Args:
             payment_id: ID del pago a reembolsar
-            amount: Monto a reembolsar (None = total)
+            amount_cents: Monto a reembolsar en unidades menores (None = total)
             reason: Razón del reembolso
+            currency: Moneda del pago (para convertir amount_cents)
             
         Returns:
             RefundResult con estado del reembolso
         """
-        pass
+        raise NotImplementedError
 
 
 # ==============================================================================
@@ -196,31 +299,131 @@ class MercadoPagoGateway(PaymentGateway):
     
     DOCUMENTACIÓN:
     https://www.mercadopago.com.ar/developers/es/docs/checkout-pro/landing
+    
+    CONEXIONES:
+    Todas las llamadas a la API usan un único httpx.AsyncClient con pool
+    de conexiones (keep-alive, HTTP/2): solo la primera llamada paga el
+    handshake TCP + TLS. El cliente se crea en el primer uso y se cierra
+    con close() en el shutdown de la aplicación (lifespan).
     """
     
-    def __init__(self, access_token: str = None):
+    API_BASE_URL = "https://api.mercadopago.com"
+    
+    # Idempotencia de webhooks (MercadoPago reintenta: entrega al menos una vez)
+    WEBHOOK_KEY_PREFIX = "mp:wh:"
+    WEBHOOK_TTL = 24 * 60 * 60  # 24 horas
+    
+    # Cola de webhooks recibidos (Redis Stream), consumida por app/worker.py
+    WEBHOOK_STREAM = "mp:webhooks"
+    WEBHOOK_STREAM_MAXLEN = 100_000
+    
+    # Cache de get_payment (polling del checkout): TTL corto mientras el
+    # pago puede cambiar, más largo en estados finales. Los webhooks
+    # reescriben la entrada con el estado recién consultado.
+    PAYMENT_CACHE_PREFIX = "mp:pay:"
+    PAYMENT_CACHE_TTL = 3
+    PAYMENT_CACHE_TTL_FINAL = 300
+    PAYMENT_FINAL_STATUSES = frozenset({PaymentStatus.APPROVED, PaymentStatus.REFUNDED})
+    
+    def __init__(
+        self, 
+        access_token: str = None,
+        redis_client: Optional[redis.Redis] = None,
+        max_concurrency: int = 20
+    ):
         """
         Inicializa el gateway con credenciales.
         
         Args:
             access_token: Token de acceso de MercadoPago.
                          Si no se proporciona, se lee de settings.
+            redis_client: Cliente Redis para idempotencia de webhooks.
+                          Si no se proporciona, se crea desde settings.REDIS_URL.
+            max_concurrency: Máximo de llamadas simultáneas a la API (y de
+                             conexiones abiertas). Evita agotar descriptores
+                             y disparar el rate limit de MercadoPago ante
+                             picos de webhooks.
         """
-        # TODO: Importar SDK de MercadoPago
-        # import mercadopago
-        # 
-        # if access_token is None:
-        #     from app.config import settings
-        #     access_token = settings.MERCADOPAGO_ACCESS_TOKEN
-        # 
-        # self.sdk = mercadopago.SDK(access_token)
+        self.access_token = access_token or settings.MERCADOPAGO_ACCESS_TOKEN
+        self._client: Optional[httpx.AsyncClient] = None
+        self._redis = redis_client
         
-        self.access_token = access_token
+        # HMAC con la clave secreta ya cargada: en cada webhook se usa
+        # una copia (.copy()) en lugar de volver a procesar la clave.
+        # Sin clave no se arma: con una clave vacía cualquiera podría
+        # firmar webhooks, y verify_webhook los rechaza todos
+        webhook_secret = settings.MERCADOPAGO_WEBHOOK_SECRET
+        self._webhook_hmac = (
+            hmac.new(webhook_secret.encode(), digestmod=hashlib.sha256)
+            if webhook_secret
+            else None
+        )
+        if self._webhook_hmac is None:
+            logger.warning(
+                "MERCADOPAGO_WEBHOOK_SECRET no configurado: se rechazarán todos los webhooks"
+            )
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Cliente HTTP compartido (se crea en el primer uso)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.API_BASE_URL,
+                http2=True,  # requiere httpx[http2] (paquete h2)
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                ),
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                headers={"Authorization": f"Bearer {self.access_token}"}
+            )
+        return self._client
+    
+    def _get_redis(self) -> redis.Redis:
+        """Cliente Redis (se crea en el primer uso)."""
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                settings.REDIS_URL,
+                decode_responses=True
+            )
+        return self._redis
+    
+    async def close(self) -> None:
+        """Cierra los clientes HTTP y Redis (llamar en el shutdown de la aplicación)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+    
+    async def _request(self, method: str, url: str, **kwargs) -> dict:
+        """
+        Llamada a la API de MercadoPago.
+        
+        Las llamadas concurrentes se limitan con un semáforo para no
+        superar el rate limit de MercadoPago ni abrir conexiones de más.
+        
+        Raises:
+            PaymentError: Si la API responde con error o falla la conexión
+        """
+        async with self._semaphore:
+            try:
+                response = await self._get_client().request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                raise PaymentError(f"Error de conexión con MercadoPago: {e}") from e
+        
+        if response.status_code not in (200, 201):
+            raise PaymentError(
+                f"MercadoPago respondió {response.status_code}: {response.text}"
+            )
+        return response.json()
     
     async def create_payment(
         self,
         order_id: str,
-        amount: Decimal,
+        amount_cents: int,
         currency: str,
         description: str,
         customer_email: str,
@@ -230,27 +433,40 @@ class MercadoPagoGateway(PaymentGateway):
         items: list[dict] = None
     ) -> PaymentIntent:
         """
-        Crea una preferencia de pago en MercadoPago.
+        Crea una preferencia de pago en MercadoPago (Checkout Pro).
         
-        IMPLEMENTACIÓN:
-        1. Crear objeto de preferencia
-        2. Configurar items
-        3. Configurar URLs de redirección
-        4. Configurar datos del pagador
-        5. Enviar a MercadoPago
-        6. Retornar URL de checkout
+        POST /checkout/preferences
         
-        EJEMPLO DE IMPLEMENTACIÓN:
-        ```python
-        preference_data = {
-            "items": [
+        Sin items detallados se envía un único item con el monto total.
+        Los montos llegan en unidades menores (int): la única conversión
+        es una división por la escala de la moneda, sin Decimal.
+        """
+        scale = money_scale(currency)
+        if items:
+            # Items del carrito: todos los campos son obligatorios (KeyError
+            # si falta alguno, nunca un precio inventado)
+            preference_items = [
+                {
+                    "id": item["id"],
+                    "title": item["name"],
+                    "quantity": item["quantity"],
+                    "unit_price": item["price_cents"] / scale,
+                    "currency_id": currency
+                }
+                for item in items
+            ]
+        else:
+            preference_items = [
                 {
                     "title": description,
                     "quantity": 1,
-                    "unit_price": float(amount),
+                    "unit_price": amount_cents / scale,
                     "currency_id": currency
                 }
-            ],
+            ]
+        
+        preference_data = {
+            "items": preference_items,
             "payer": {
                 "email": customer_email
             },
@@ -261,157 +477,286 @@ class MercadoPagoGateway(PaymentGateway):
             },
             "auto_return": "approved",
             "external_reference": order_id,
-            "notification_url": "https://tu-dominio.com/payments/webhook"
+            "notification_url": settings.MERCADOPAGO_NOTIFICATION_URL
         }
         
-        # Si hay items detallados
-        if items:
-            preference_data["items"] = [
-                {
-                    "id": item["id"],
-                    "title": item["name"],
-                    "quantity": item["quantity"],
-                    "unit_price": float(item["price"]),
-                    "currency_id": currency
-                }
-                for item in items
-            ]
+        response = await self._request(
+            "POST", "/checkout/preferences", json=preference_data
+        )
         
-        result = self.sdk.preference().create(preference_data)
-        
-        if result["status"] == 201:
-            response = result["response"]
-            return PaymentIntent(
-                id=order_id,
-                external_id=response["id"],
-                status=PaymentStatus.PENDING,
-                checkout_url=response["init_point"],
-                qr_code=None,
-                expires_at=response.get("expiration_date_to")
-            )
-        else:
-            raise PaymentError(f"Error creando pago: {result}")
-        ```
-        """
-        # TODO: Implementar con SDK de MercadoPago
-        raise NotImplementedError("Método pendiente de implementar")
+        return PaymentIntent(
+            id=order_id,
+            external_id=response["id"],
+            status=PaymentStatus.PENDING,
+            checkout_url=response["init_point"],
+            qr_code=None,
+            expires_at=response.get("expiration_date_to")
+        )
     
     async def get_payment(self, payment_id: str) -> PaymentResult:
         """
-        Obtiene información de un pago.
+        Obtiene información de un pago (read-through cache en Redis).
         
-        EJEMPLO DE IMPLEMENTACIÓN:
-        ```python
-        result = self.sdk.payment().get(payment_id)
+        El frontend consulta el estado repetidamente durante el checkout;
+        dentro del TTL la respuesta sale de Redis sin llamar a MercadoPago.
+        """
+        cached = await self._get_redis().get(f"{self.PAYMENT_CACHE_PREFIX}{payment_id}")
+        if cached is not None:
+            return PaymentResult.from_json(cached)
+        return await self._fetch_payment(payment_id)
+    
+    async def _fetch_payment(self, payment_id: str) -> PaymentResult:
+        """
+        Consulta un pago en MercadoPago y actualiza el cache.
         
-        if result["status"] == 200:
-            data = result["response"]
-            
-            # Mapear estado de MercadoPago a nuestro enum
-            status_map = {
-                "approved": PaymentStatus.APPROVED,
-                "pending": PaymentStatus.PENDING,
-                "in_process": PaymentStatus.PROCESSING,
-                "rejected": PaymentStatus.REJECTED,
-                "cancelled": PaymentStatus.CANCELLED,
-                "refunded": PaymentStatus.REFUNDED,
-                "charged_back": PaymentStatus.CHARGED_BACK
-            }
-            
-            return PaymentResult(
-                id=data["external_reference"],
-                external_id=str(data["id"]),
-                status=status_map.get(data["status"], PaymentStatus.PENDING),
-                amount=Decimal(str(data["transaction_amount"])),
-                currency=data["currency_id"],
-                payment_method=data.get("payment_type_id"),
-                paid_at=data.get("date_approved"),
-                raw_data=data
-            )
-        ```
+        GET /v1/payments/{payment_id}
         """
-        # TODO: Implementar
-        raise NotImplementedError("Método pendiente de implementar")
+        data = await self._request("GET", f"/v1/payments/{payment_id}")
+        
+        result = PaymentResult(
+            id=data["external_reference"],
+            external_id=str(data["id"]),
+            status=_MP_STATUS_MAP.get(data["status"], _MP_STATUS_DEFAULT),
+            amount_cents=to_cents(data["transaction_amount"], data["currency_id"]),
+            currency=data["currency_id"],
+            payment_method=data.get("payment_type_id"),
+            paid_at=data.get("date_approved"),
+            raw_data=data
+        )
+        
+        ttl = (
+            self.PAYMENT_CACHE_TTL_FINAL
+            if result.status in self.PAYMENT_FINAL_STATUSES
+            else self.PAYMENT_CACHE_TTL
+        )
+        await self._get_redis().set(
+            f"{self.PAYMENT_CACHE_PREFIX}{payment_id}", result.to_json(), ex=ttl
+        )
+        return result
+    
+    async def get_merchant_order_payments(
+        self,
+        merchant_order_id: str
+    ) -> list[PaymentResult]:
+        """
+        Obtiene los pagos de una orden de MercadoPago (merchant_order).
+        
+        GET /merchant_orders/{merchant_order_id}
+        
+        Una merchant_order puede tener varios pagos (ej: pago rechazado y
+        reintento aprobado). Se consultan sin cache (se usa desde webhooks)
+        y en paralelo con
+        asyncio.gather sobre el pool de conexiones; la concurrencia queda
+        acotada por el semáforo de _request (max_concurrency).
+        """
+        data = await self._request("GET", f"/merchant_orders/{merchant_order_id}")
+        payment_ids = [p["id"] for p in data.get("payments") or ()]
+        return list(
+            await asyncio.gather(*(self._fetch_payment(pid) for pid in payment_ids))
+        )
     
-    async def verify_webhook(self, payload: dict, signature: str) -> bool:
+    async def verify_webhook(
+        self, 
+        payload: dict, 
+        signature: str, 
+        request_id: str = ""
+    ) -> bool:
         """
         Verifica la firma del webhook de MercadoPago.
         
         MercadoPago envía una firma HMAC-SHA256 en el header
-        x-signature que debe verificarse.
+        x-signature con el formato "ts=<timestamp>,v1=<firma>".
+        La firma se calcula sobre el manifest:
+            id:<data.id>;request-id:<x-request-id>;ts:<ts>;
+        
+        La comparación es de tiempo constante (hmac.compare_digest).
+        Sin MERCADOPAGO_WEBHOOK_SECRET configurado retorna siempre False.
+        
+        Ver: https://www.mercadopago.com.ar/developers/es/docs/your-integrations/notifications/webhooks
+        
+        Args:
+            payload: Datos del webhook
+            signature: Valor del header x-signature
+            request_id: Valor del header x-request-id
+        """
+        if self._webhook_hmac is None:
+            return False
+        
+        parts = {}
+        for part in signature.split(","):
+            key, _, value = part.partition("=")
+            parts[key.strip()] = value.strip()
+        
+        ts = parts.get("ts")
+        received = parts.get("v1")
+        data_id = (payload.get("data") or {}).get("id")
+        if not ts or not received or data_id is None:
+            return False
+        
+        manifest = f"id:{str(data_id).lower()};request-id:{request_id};ts:{ts};"
+        mac = self._webhook_hmac.copy()
+        mac.update(manifest.encode())
         
-        TODO: Implementar verificación de firma
+        return hmac.compare_digest(mac.hexdigest(), received)
+    
+    @staticmethod
+    def webhook_event_id(payload: dict) -> str:
+        """ID de idempotencia de un evento (id del evento, o tipo + id del recurso)."""
+        event_id = payload.get("id")
+        if event_id is None:
+            event_id = f"{payload.get('type')}:{payload['data']['id']}"
+        return str(event_id)
+    
+    def _webhook_key(self, payload: dict) -> str:
+        """Key de Redis de idempotencia de un evento."""
+        return f"{self.WEBHOOK_KEY_PREFIX}{self.webhook_event_id(payload)}"
+    
+    async def enqueue_webhook(self, body: bytes) -> str:
         """
-        # TODO: Implementar
-        # Ver: https://www.mercadopago.com.ar/developers/es/docs/your-integrations/notifications/webhooks
-        return True  # TEMPORAL: Siempre válido (CAMBIAR EN PRODUCCIÓN)
+        Encola un webhook para procesarlo en background (fast-ACK).
+        
+        El endpoint del webhook solo verifica la firma, llama a este
+        método (un XADD a Redis, ~1 ms) y responde 200. La consulta a
+        MercadoPago la hace el worker (process_webhook), fuera del request:
+        así MercadoPago recibe el ACK a tiempo y no reintenta por timeout.
+        
+        Se encola el body crudo tal como llegó: no se vuelve a serializar
+        el payload ya parseado.
+        
+        USO (endpoint):
+            body = await request.body()
+            payload = orjson.loads(body)
+            if not await gateway.verify_webhook(payload, signature, request_id):
+                raise HTTPException(status_code=401)
+            await gateway.enqueue_webhook(body)
+            return {"received": True}
+        
+        Args:
+            body: Body del request del webhook (JSON sin parsear)
+        
+        Returns:
+            ID de la entrada en el stream
+        """
+        return await self._get_redis().xadd(
+            self.WEBHOOK_STREAM,
+            {"payload": body},
+            maxlen=self.WEBHOOK_STREAM_MAXLEN,
+            approximate=True
+        )
     
     async def process_webhook(self, payload: dict) -> PaymentResult:
         """
-        Procesa un webhook de MercadoPago.
+        Procesa un webhook de MercadoPago de forma idempotente.
+        
+        MercadoPago puede entregar el mismo evento más de una vez. El primer
+        procesamiento toma la key del evento (SET NX) y guarda el resultado
+        por 24 horas; las entregas repetidas devuelven ese resultado sin
+        volver a consultar la API ni escribir en la BD.
+        
+        Raises:
+            PaymentError: Si el evento se está procesando en otra entrega
+                          (MercadoPago reintentará) o el tipo no está soportado
+        """
+        redis_client = self._get_redis()
+        event_key = self._webhook_key(payload)
+        result_key = f"{event_key}:result"
+        
+        acquired = await redis_client.set(
+            event_key, "processing", nx=True, ex=self.WEBHOOK_TTL
+        )
+        if not acquired:
+            cached = await redis_client.get(result_key)
+            if cached is not None:
+                return PaymentResult.from_json(cached)
+            raise PaymentError(f"Evento en proceso: {event_key}")
+        
+        try:
+            result = await self._handle_webhook(payload)
+        except Exception:
+            # Liberar la key para que el reintento de MercadoPago lo procese
+            await redis_client.delete(event_key)
+            raise
+        
+        await redis_client.set(result_key, result.to_json(), ex=self.WEBHOOK_TTL)
+        return result
+    
+    async def _handle_webhook(self, payload: dict) -> PaymentResult:
+        """
+        Procesa el contenido de un webhook según su tipo.
         
         Tipos de notificación:
         - payment: Notificación de pago
-        - merchant_order: Notificación de orden
+        - merchant_order: Notificación de orden. Se devuelve el pago
+          aprobado si existe; si no, el último pago de la orden.
         
-        EJEMPLO DE IMPLEMENTACIÓN:
-        ```python
+        Raises:
+            PaymentError: Si el tipo de notificación no está soportado
+                          o la merchant_order todavía no tiene pagos
+        """
         notification_type = payload.get("type")
         
         if notification_type == "payment":
+            # Sin cache: el webhook indica que el estado cambió
             payment_id = payload["data"]["id"]
-            return await self.get_payment(payment_id)
+            return await self._fetch_payment(payment_id)
         
-        elif notification_type == "merchant_order":
-            # Procesar orden
-            pass
-        ```
-        """
-        # TODO: Implementar
-        raise NotImplementedError("Método pendiente de implementar")
+        if notification_type == "merchant_order":
+            merchant_order_id = payload["data"]["id"]
+            results = await self.get_merchant_order_payments(merchant_order_id)
+            if not results:
+                raise PaymentError(f"merchant_order sin pagos: {merchant_order_id}")
+            for result in results:
+                if result.status == PaymentStatus.APPROVED:
+                    return result
+            return results[-1]
+        
+        raise PaymentError(f"Tipo de notificación no soportado: {notification_type}")
     
     async def refund(
         self,
         payment_id: str,
-        amount: Optional[Decimal] = None,
-        reason: Optional[str] = None
+        amount_cents: Optional[int] = None,
+        reason: Optional[str] = None,
+        currency: str = "ARS"
     ) -> RefundResult:
         """
         Procesa un reembolso en MercadoPago.
         
-        EJEMPLO DE IMPLEMENTACIÓN:
-        ```python
-        refund_data = {}
-        if amount is not None:
-            refund_data["amount"] = float(amount)
-        
-        result = self.sdk.refund().create(payment_id, refund_data)
-        
-        if result["status"] in [200, 201]:
-            data = result["response"]
-            return RefundResult(
-                id=str(data["id"]),
-                payment_id=payment_id,
-                status=PaymentStatus.REFUNDED,
-                amount=Decimal(str(data["amount"])),
-                reason=reason
-            )
-        ```
+        POST /v1/payments/{payment_id}/refunds
+        Sin amount_cents se reembolsa el total.
         """
-        # TODO: Implementar
-        raise NotImplementedError("Método pendiente de implementar")
+        refund_data = {}
+        if amount_cents is not None:
+            refund_data["amount"] = from_cents(amount_cents, currency)
+        
+        data = await self._request(
+            "POST", f"/v1/payments/{payment_id}/refunds", json=refund_data
+        )
+        
+        return RefundResult(
+            id=str(data["id"]),
+            payment_id=payment_id,
+            status=PaymentStatus.REFUNDED,
+            amount_cents=to_cents(data["amount"], currency),
+            reason=reason
+        )
 
 
 # ==============================================================================
 # FACTORY
 # ==============================================================================
 
+@lru_cache(maxsize=8)
 def get_payment_gateway(gateway_name: str = "mercadopago") -> PaymentGateway:
     """
     Factory para obtener la pasarela de pago.
     
     Permite cambiar de pasarela fácilmente.
     
+    Cacheada: una sola instancia por pasarela y por proceso, para que
+    todas las llamadas compartan el pool de conexiones HTTP. En el
+    shutdown: await get_payment_gateway().close()
+    
     Args:
         gateway_name: Nombre de la pasarela
         
@@ -421,6 +766,10 @@ def get_payment_gateway(gateway_name: str = "mercadopago") -> PaymentGateway:
     Ejemplo:
         gateway = get_payment_gateway("mercadopago")
         intent = await gateway.create_payment(...)
+    
+    Como dependencia de FastAPI usar payment_gateway_dep (sin argumentos):
+    con Depends(get_payment_gateway), gateway_name pasaría a ser un query
+    parameter que cualquier cliente podría cambiar.
     """
     gateways = {
         "mercadopago": MercadoPagoGateway,
@@ -435,3 +784,14 @@ def get_payment_gateway(gateway_name: str = "mercadopago") -> PaymentGateway:
     
     return gateway_class()
 
+
+def payment_gateway_dep() -> PaymentGateway:
+    """
+    Dependencia de FastAPI: la pasarela configurada (instancia cacheada).
+    
+    Uso:
+        @router.post("/payments/create")
+        async def create(gateway: PaymentGateway = Depends(payment_gateway_dep)):
+            ...
+    """
+    return get_payment_gateway("mercadopago")
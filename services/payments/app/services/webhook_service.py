@@ -0,0 +1,95 @@
+"""
+Servicio de idempotencia de webhooks en base de datos.
+
+Reclama cada evento con un único INSERT ... ON CONFLICT sobre la tabla
+webhook_events (ver app/models/webhook_event.py).
+"""
+
+from datetime import timedelta
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.webhook_event import WebhookEvent
+
+# Un evento en 'processing' por más tiempo se considera abandonado
+# (el worker cayó sin liberarlo) y puede volver a reclamarse
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+class WebhookEventService:
+    """
+    Servicio para reclamar y cerrar eventos de webhook.
+
+    USO (worker):
+        events = WebhookEventService(db)
+        if not await events.claim(event_id, event_type, payload):
+            return  # Ya procesado (o en proceso en otro worker)
+        await db.commit()
+        try:
+            ...
+        except Exception:
+            await events.release(event_id)
+            await db.commit()
+            raise
+        await events.complete(event_id)
+        await db.commit()
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Inicializa el servicio con una sesión de BD.
+
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+        """
+        self.db = db
+
+    async def claim(self, event_id: str, event_type: str, payload: dict) -> bool:
+        """
+        Reclama un evento para procesarlo.
+
+        INSERT ... ON CONFLICT (event_id): si el evento no existe se inserta
+        en 'processing'; si existe solo se reclama de nuevo cuando quedó
+        abandonado en 'processing' más de CLAIM_TIMEOUT. RETURNING indica
+        si esta llamada obtuvo el evento.
+
+        Returns:
+            True si el evento fue reclamado, False si ya estaba procesado
+            o lo está procesando otro worker
+        """
+        stmt = insert(WebhookEvent).values(
+            event_id=event_id,
+            event_type=event_type,
+            payload=payload,
+            status="processing"
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WebhookEvent.event_id],
+            set_={"claimed_at": func.now()},
+            where=(
+                (WebhookEvent.status == "processing")
+                & (WebhookEvent.claimed_at < func.now() - CLAIM_TIMEOUT)
+            )
+        ).returning(WebhookEvent.event_id)
+
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def complete(self, event_id: str) -> None:
+        """Marca un evento como procesado."""
+        await self.db.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.event_id == event_id)
+            .values(status="completed", completed_at=func.now())
+        )
+
+    async def release(self, event_id: str) -> None:
+        """Libera un evento cuyo procesamiento falló (el reintento lo reclama)."""
+        await self.db.execute(
+            delete(WebhookEvent).where(
+                WebhookEvent.event_id == event_id,
+                WebhookEvent.status == "processing"
+            )
+        )
@@ -0,0 +1,291 @@
+"""
+Worker de webhooks de pagos.
+
+Consume los webhooks encolados por MercadoPagoGateway.enqueue_webhook
+(Redis Stream) y los procesa con process_webhook, con un máximo de
+MAX_CONCURRENT_WEBHOOKS en paralelo.
+
+Usa un consumer group: si el worker cae, los mensajes no confirmados
+(XACK) quedan pendientes y se reprocesan al reiniciar. Los pendientes
+inactivos de cualquier consumer (otro worker caído, errores transitorios)
+se reclaman periódicamente con XAUTOCLAIM. Los mensajes que no se pueden
+procesar (payload ilegible, reintentos agotados) van a DEAD_LETTER_STREAM.
+
+Cada evento se reclama en la tabla webhook_events (INSERT ... ON CONFLICT)
+antes de procesarlo: las entregas repetidas se confirman sin consultar
+a MercadoPago.
+
+Corre sobre uvloop (event loop sobre libuv): el worker es todo I/O
+asíncrono (Redis, Postgres, MercadoPago).
+
+Ejecutar:
+    python -m app.worker
+"""
+
+import asyncio
+import logging
+import socket
+from typing import Optional
+
+import httpx
+import orjson
+import uvloop
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.services.payment_gateway import (
+    MercadoPagoGateway,
+    PaymentError,
+    get_payment_gateway,
+)
+from app.services.webhook_service import WebhookEventService
+
+logger = logging.getLogger(__name__)
+
+# Consumer group del stream de webhooks
+CONSUMER_GROUP = "payments-workers"
+
+# Mensajes que no se pueden procesar nunca (payload ilegible, sin ID de
+# evento, o agotaron los reintentos): se copian acá y se confirman
+DEAD_LETTER_STREAM = "mp:webhooks:dead"
+DEAD_LETTER_MAXLEN = 10_000
+
+# Webhooks procesados en paralelo por este worker
+MAX_CONCURRENT_WEBHOOKS = 50
+
+# Mensajes leídos por XREADGROUP / XAUTOCLAIM
+READ_COUNT = 100
+
+# Espera máxima de XREADGROUP cuando no hay mensajes (ms)
+BLOCK_MS = 5000
+
+# Pendientes sin confirmar hace más de esto (worker caído, error
+# transitorio) se reclaman con XAUTOCLAIM (ms)
+CLAIM_MIN_IDLE_MS = 60_000
+
+# Cada cuánto se buscan pendientes para reclamar (segundos)
+CLAIM_INTERVAL_SECONDS = 30
+
+# Entregas de un mismo mensaje antes de mandarlo al dead-letter
+MAX_DELIVERIES = 10
+
+# Espera tras un error de Redis en el loop principal (segundos)
+ERROR_BACKOFF_SECONDS = 1.0
+MAX_ERROR_BACKOFF_SECONDS = 30.0
+
+
+def _decode(gateway: MercadoPagoGateway, fields: dict) -> tuple[dict, str]:
+    """
+    Payload y ID de evento de un mensaje del stream.
+
+    Raises:
+        ValueError: Si el payload no es JSON válido o no trae ID de evento
+    """
+    try:
+        payload = orjson.loads(fields["payload"])
+        return payload, gateway.webhook_event_id(payload)
+    except (orjson.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Webhook inválido: {e!r}") from e
+
+
+async def _dead_letter(
+    redis_client,
+    message_id: str,
+    fields: Optional[dict],
+    reason: str
+) -> None:
+    """Copia el mensaje al dead-letter stream y lo confirma en el original."""
+    await redis_client.xadd(
+        DEAD_LETTER_STREAM,
+        {
+            "message_id": message_id,
+            "payload": (fields or {}).get("payload", ""),
+            "reason": reason,
+        },
+        maxlen=DEAD_LETTER_MAXLEN,
+        approximate=True
+    )
+    await redis_client.xack(MercadoPagoGateway.WEBHOOK_STREAM, CONSUMER_GROUP, message_id)
+
+
+async def _handle(
+    gateway: MercadoPagoGateway,
+    session_factory: async_sessionmaker[AsyncSession],
+    semaphore: asyncio.Semaphore,
+    message_id: str,
+    fields: Optional[dict]
+) -> None:
+    """
+    Procesa un webhook y lo confirma (XACK) si terminó.
+
+    - Payload ilegible o sin ID de evento: dead-letter y XACK (reintentarlo
+      no cambia nada)
+    - Error de la pasarela, la BD, Redis o la API (PaymentError,
+      SQLAlchemyError, RedisError, httpx.HTTPError...): se loguea y el
+      mensaje queda pendiente; run_worker lo reclama con XAUTOCLAIM
+    """
+    redis_client = gateway._get_redis()
+    try:
+        try:
+            payload, event_id = _decode(gateway, fields)
+        except ValueError as e:
+            logger.error("Webhook %s descartado: %s", message_id, e)
+            await _dead_letter(redis_client, message_id, fields, str(e))
+            return
+        
+        async with session_factory() as db:
+            events = WebhookEventService(db)
+            claimed = await events.claim(event_id, payload.get("type"), payload)
+            await db.commit()
+            
+            if not claimed:
+                logger.info("Webhook duplicado %s", event_id)
+            else:
+                try:
+                    result = await gateway.process_webhook(payload)
+                except Exception:
+                    await events.release(event_id)
+                    await db.commit()
+                    raise
+                await events.complete(event_id)
+                await db.commit()
+                logger.info(
+                    "Webhook procesado",
+                    extra={"payment_id": result.external_id, "status": result.status}
+                )
+        
+        await redis_client.xack(gateway.WEBHOOK_STREAM, CONSUMER_GROUP, message_id)
+    except PaymentError:
+        # Queda pendiente sin XACK: se reclama más tarde
+        logger.exception("Error procesando webhook %s", message_id)
+    except (SQLAlchemyError, RedisError, httpx.HTTPError):
+        logger.exception("Error transitorio procesando webhook %s", message_id)
+    except Exception:
+        # Sin este except la excepción moriría con la tarea sin loguearse
+        logger.exception("Error inesperado procesando webhook %s", message_id)
+    finally:
+        semaphore.release()
+
+
+async def _reclaim(
+    gateway: MercadoPagoGateway,
+    consumer: str,
+    start_id: str
+) -> tuple[str, list]:
+    """
+    Reclama (XAUTOCLAIM) pendientes inactivos de cualquier consumer.
+
+    Los que ya superaron MAX_DELIVERIES van al dead-letter.
+
+    Returns:
+        (ID desde donde seguir la próxima vez, mensajes a procesar)
+    """
+    redis_client = gateway._get_redis()
+    response = await redis_client.xautoclaim(
+        gateway.WEBHOOK_STREAM,
+        CONSUMER_GROUP,
+        consumer,
+        min_idle_time=CLAIM_MIN_IDLE_MS,
+        start_id=start_id,
+        count=READ_COUNT
+    )
+    next_id, claimed = response[0], response[1]
+    
+    messages = []
+    for message_id, fields in claimed:
+        if not fields:
+            # Borrado del stream (MAXLEN) mientras estaba pendiente
+            await redis_client.xack(gateway.WEBHOOK_STREAM, CONSUMER_GROUP, message_id)
+            continue
+        pending = await redis_client.xpending_range(
+            gateway.WEBHOOK_STREAM, CONSUMER_GROUP, message_id, message_id, 1
+        )
+        if pending and pending[0]["times_delivered"] > MAX_DELIVERIES:
+            logger.error("Webhook %s agotó los reintentos", message_id)
+            await _dead_letter(redis_client, message_id, fields, "max_deliveries")
+            continue
+        messages.append((message_id, fields))
+    return next_id, messages
+
+
+async def run_worker() -> None:
+    """Loop principal: lee del stream y procesa en paralelo (acotado)."""
+    gateway = get_payment_gateway("mercadopago")
+    redis_client = gateway._get_redis()
+    engine = create_async_engine(settings.DATABASE_URL)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    consumer = socket.gethostname()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_WEBHOOKS)
+    tasks: set[asyncio.Task] = set()
+    
+    try:
+        await redis_client.xgroup_create(
+            gateway.WEBHOOK_STREAM, CONSUMER_GROUP, id="0", mkstream=True
+        )
+    except ResponseError:
+        pass  # El grupo ya existe
+    
+    async def dispatch(messages: list) -> None:
+        for message_id, fields in messages:
+            await semaphore.acquire()
+            task = asyncio.create_task(
+                _handle(gateway, session_factory, semaphore, message_id, fields)
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    
+    # Primero los pendientes de una ejecución anterior (desde "0", avanzando
+    # por ID), luego solo mensajes nuevos (">")
+    stream_id = "0"
+    claim_id = "0-0"
+    next_claim = 0.0
+    backoff = ERROR_BACKOFF_SECONDS
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                if stream_id == ">" and loop.time() >= next_claim:
+                    claim_id, messages = await _reclaim(gateway, consumer, claim_id)
+                    await dispatch(messages)
+                    if claim_id == "0-0":
+                        # Se recorrió todo el PEL: esperar al próximo intervalo
+                        next_claim = loop.time() + CLAIM_INTERVAL_SECONDS
+                
+                response = await redis_client.xreadgroup(
+                    CONSUMER_GROUP,
+                    consumer,
+                    {gateway.WEBHOOK_STREAM: stream_id},
+                    count=READ_COUNT,
+                    block=BLOCK_MS
+                )
+                backoff = ERROR_BACKOFF_SECONDS
+            except RedisError:
+                logger.exception(
+                    "Error leyendo el stream de webhooks, reintento en %.0fs", backoff
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_ERROR_BACKOFF_SECONDS)
+                continue
+            
+            messages = response[0][1] if response else []
+            if stream_id != ">" and not messages:
+                stream_id = ">"
+                continue
+            
+            await dispatch(messages)
+            
+            if stream_id != ">":
+                # Siguiente página de pendientes
+                stream_id = messages[-1][0]
+    finally:
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await gateway.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    uvloop.run(run_worker())
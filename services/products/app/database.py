@@ -0,0 +1,145 @@
+"""
+Configuración de la base de datos.
+
+Este archivo configura la conexión a PostgreSQL usando SQLAlchemy 2.0
+con soporte asíncrono (asyncpg).
+
+POOL DE CONEXIONES:
+Un solo engine por worker de uvicorn (este módulo), con pool explícito:
+- DB_POOL_SIZE conexiones persistentes + DB_MAX_OVERFLOW bajo picos.
+  Dimensionar para que (pool_size + max_overflow) × workers × réplicas
+  del servicio quede por debajo de max_connections de PostgreSQL,
+  dejando margen para réplicas de lectura y conexiones de administración.
+- pool_timeout corto: si el pool está agotado el request falla rápido
+  en lugar de acumular espera.
+- pool_pre_ping: una conexión cerrada por el servidor se descarta antes
+  de usarla (sin errores "connection closed" en el request).
+- pool_recycle: las conexiones se renuevan antes de que el servidor o
+  un proxy intermedio las corte por inactividad.
+
+RÉPLICA DE LECTURA:
+Los GET del catálogo se envían a la réplica (DATABASE_REPLICA_URL); las
+escrituras y el resto de los métodos, al primario. Tras una escritura,
+el cliente lee del primario durante STICKY_PRIMARY_SECONDS para ver sus
+propios cambios aunque la réplica tenga retraso (read-your-writes).
+"""
+
+import time
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+# Cookie con el timestamp de la última escritura del cliente
+LAST_WRITE_COOKIE = "last_write_at"
+
+# Ventana en la que un cliente que escribió sigue leyendo del primario
+STICKY_PRIMARY_SECONDS = 1.0
+
+# ==============================================================================
+# CONFIGURACIÓN DEL ENGINE
+# ==============================================================================
+
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,            # 20 por defecto
+    max_overflow=settings.DB_MAX_OVERFLOW,      # 10 por defecto
+    pool_timeout=settings.DB_POOL_TIMEOUT,      # 5 segundos
+    pool_recycle=settings.DB_POOL_RECYCLE,      # 1800 segundos
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+)
+
+# Primario: escrituras y lecturas que necesitan datos al día
+engine = create_async_engine(settings.DATABASE_URL, **POOL_OPTIONS)
+
+# Réplica: lecturas del catálogo (sin réplica configurada = primario)
+engine_replica = (
+    create_async_engine(settings.DATABASE_REPLICA_URL, **POOL_OPTIONS)
+    if settings.DATABASE_REPLICA_URL
+    else engine
+)
+
+
+class RoutingSession(Session):
+    """
+    Sesión que elige el engine por operación.
+    
+    Con session.info["read_only"] = True las consultas van a la réplica;
+    un flush (INSERT/UPDATE/DELETE) siempre va al primario.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get("read_only") and not self._flushing:
+            return engine_replica.sync_engine
+        return engine.sync_engine
+
+
+# ==============================================================================
+# CONFIGURACIÓN DE SESIONES
+# ==============================================================================
+
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,  # Evita queries extra después del commit
+    autoflush=False,
+)
+
+
+# ==============================================================================
+# DEPENDENCY INJECTION PARA FASTAPI
+# ==============================================================================
+
+def _wrote_recently(request: Request) -> bool:
+    """Si el cliente escribió dentro de la ventana STICKY_PRIMARY_SECONDS."""
+    try:
+        last_write_at = float(request.cookies.get(LAST_WRITE_COOKIE, 0))
+    except ValueError:
+        return False
+    return time.time() - last_write_at < STICKY_PRIMARY_SECONDS
+
+
+async def get_db(request: Request, response: Response) -> AsyncSession:
+    """
+    Dependency que provee una sesión de base de datos.
+
+    Los GET usan la réplica, salvo que el cliente haya escrito hace menos
+    de STICKY_PRIMARY_SECONDS. Los demás métodos usan el primario y
+    registran el momento de la escritura en una cookie.
+
+    Uso en routers:
+        @router.get("/products")
+        async def list_products(db: AsyncSession = Depends(get_db)):
+            service = ProductService(db)
+            ...
+    """
+    read_only = request.method == "GET" and not _wrote_recently(request)
+    if request.method != "GET":
+        # Antes del yield: el código posterior corre con la respuesta enviada
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            str(time.time()),
+            max_age=int(STICKY_PRIMARY_SECONDS) + 1,
+            httponly=True
+        )
+    
+    async with AsyncSessionLocal(info={"read_only": read_only}) as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def close_db():
+    """
+    Cierra las conexiones a la base de datos.
+
+    Llamar al cerrar la aplicación para liberar recursos.
+    """
+    await engine.dispose()
+    if engine_replica is not engine:
+        await engine_replica.dispose()
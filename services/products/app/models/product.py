@@ -5,22 +5,31 @@ Este servicio maneja todo el catálogo del ecommerce.
 """
 
 import uuid
-from datetime import datetime
 from decimal import Decimal
 from enum import Enum as PyEnum
 
 from sqlalchemy import (
     Column, String, Boolean, DateTime, 
     ForeignKey, Enum, Text, Integer, Numeric,
-    Index
+    Computed, DDL, Index, and_, event, func, select, text
 )
-from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.dialects.postgresql import ARRAY, CITEXT, ExcludeConstraint, JSONB, UUID, TSVECTOR
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
+from app.config import settings
+
 # TODO: Importar Base desde database.py
 from sqlalchemy.orm import declarative_base
 Base = declarative_base()
 
+# Carga de relaciones de Product, ProductImage, ProductVariant y
+# ProductContent. Ninguna se carga sola: cada consulta pide lo que usa
+# (selectinload/joinedload, ver LISTING_LOADERS en product_service).
+# En DEBUG un acceso sin cargar lanza excepción en lugar de emitir una
+# consulta por objeto (N+1): el problema aparece en los tests.
+RELATIONSHIP_LAZY = "raise_on_sql" if settings.DEBUG else "select"
+
 
 # ==============================================================================
 # ENUMS
@@ -118,8 +127,10 @@ class Category(Base):
     )
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
     
     # Relaciones
     parent = relationship("Category", remote_side=[id], backref="children")
@@ -160,18 +171,19 @@ class Product(Base):
     )
     
     # SKU (Stock Keeping Unit) - código único del producto
-    # TODO: Generar automáticamente o validar unicidad
+    # TODO: Generar automáticamente
+    # Unicidad con índice hash (ver excl_products_sku en __table_args__)
     sku = Column(
         String(50), 
-        unique=True, 
-        index=True,
         nullable=False,
         comment="Código único del producto"
     )
     
     # Slug para URLs amigables
+    # CITEXT: la comparación ignora mayúsculas (WHERE slug = :s), así que
+    # el índice único sirve sin envolver la columna en lower()
     slug = Column(
-        String(200), 
+        CITEXT, 
         unique=True, 
         index=True,
         nullable=False,
@@ -197,12 +209,8 @@ class Product(Base):
         comment="Descripción corta para listados"
     )
     
-    # Descripción completa (HTML permitido)
-    description = Column(
-        Text, 
-        nullable=True,
-        comment="Descripción completa del producto"
-    )
+    # La descripción completa y los meta tags SEO están en ProductContent:
+    # son columnas anchas que los listados no usan
     
     # =========================================================================
     # Precios
@@ -230,6 +238,20 @@ class Product(Base):
         comment="Costo del producto (interno)"
     )
     
+    # Porcentaje de descuento (columna generada, la calcula PostgreSQL).
+    # Trunca igual que int() en Python. Permite ordenar por descuento en
+    # la BD (idx_products_discount) en lugar de calcularlo por fila
+    discount_pct = Column(
+        Integer,
+        Computed(
+            "CASE WHEN compare_price IS NOT NULL AND compare_price > price "
+            "THEN floor((compare_price - price) * 100 / compare_price)::int "
+            "ELSE 0 END",
+            persisted=True
+        ),
+        comment="Porcentaje de descuento (columna generada)"
+    )
+    
     # =========================================================================
     # Inventario
     # =========================================================================
@@ -255,6 +277,15 @@ class Product(Base):
         comment="Permitir vender sin stock"
     )
     
+    # Disponible para la venta (columna generada, la calcula PostgreSQL).
+    # Permite filtrar WHERE in_stock sobre el índice parcial
+    # idx_products_in_stock en lugar de evaluar stock/allow_backorder por fila
+    in_stock = Column(
+        Boolean,
+        Computed("stock > 0 OR allow_backorder", persisted=True),
+        comment="stock > 0 OR allow_backorder (columna generada)"
+    )
+    
     # =========================================================================
     # Tipo y características
     # =========================================================================
@@ -306,12 +337,15 @@ class Product(Base):
         comment="Categoría del producto"
     )
     
-    # Tags (almacenados como string separado por comas)
-    # TODO: Considerar tabla separada para tags
+    # Tags como array de PostgreSQL con índice GIN (idx_products_tags):
+    # "productos con el tag X" es Product.tags.contains(["x"]) (@>),
+    # sin LIKE '%x%' sobre un string separado por comas
     tags = Column(
-        String(500), 
-        nullable=True,
-        comment="Tags separados por coma"
+        ARRAY(String(50)), 
+        nullable=False,
+        default=list,
+        server_default=text("'{}'"),
+        comment="Tags del producto"
     )
     
     # =========================================================================
@@ -341,87 +375,310 @@ class Product(Base):
         comment="Orden en listados"
     )
     
-    # =========================================================================
-    # SEO
-    # =========================================================================
-    
-    meta_title = Column(
-        String(70), 
-        nullable=True,
-        comment="Título para SEO"
-    )
-    
-    meta_description = Column(
-        String(160), 
-        nullable=True,
-        comment="Descripción para SEO"
-    )
-    
     # =========================================================================
     # Búsqueda full-text (PostgreSQL)
     # =========================================================================
-    # TODO: Configurar trigger para actualizar automáticamente
-    
-    # search_vector = Column(
-    #     TSVECTOR,
-    #     comment="Vector de búsqueda full-text"
-    # )
+    # Columna generada (GENERATED ALWAYS AS ... STORED): PostgreSQL la
+    # recalcula solo al escribir la fila, sin trigger plpgsql por fila.
+    # Pesos: name (A), short_description y tags (B). La descripción
+    # completa tiene su propio vector en ProductContent (peso C).
+    # Configuración 'spanish' explícita: la de consulta debe ser la misma.
+    # Consultar con search_vector @@ plainto_tsquery('spanish', :q) para
+    # usar el índice GIN (ver ProductService.search).
+    
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('spanish', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('spanish', coalesce(short_description, '')), 'B') || "
+            "setweight(to_tsvector('spanish', products_tags_to_text(tags)), 'B')",
+            persisted=True
+        ),
+        comment="Vector de búsqueda full-text (columna generada)"
+    )
     
     # =========================================================================
     # Timestamps
     # =========================================================================
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    published_at = Column(DateTime, nullable=True, comment="Fecha de publicación")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    published_at = Column(DateTime(timezone=True), nullable=True, comment="Fecha de publicación")
     
     # =========================================================================
     # Relaciones
     # =========================================================================
     
-    category = relationship("Category", back_populates="products")
-    images = relationship("ProductImage", back_populates="product", cascade="all, delete-orphan")
-    variants = relationship("ProductVariant", back_populates="product", cascade="all, delete-orphan")
+    # passive_deletes: al borrar un producto no se cargan sus hijos, los
+    # borra la BD (ON DELETE CASCADE)
+    category = relationship(
+        "Category",
+        back_populates="products",
+        lazy=RELATIONSHIP_LAZY
+    )
+    images = relationship(
+        "ProductImage",
+        back_populates="product",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy=RELATIONSHIP_LAZY
+    )
+    variants = relationship(
+        "ProductVariant",
+        back_populates="product",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy=RELATIONSHIP_LAZY
+    )
+    # Solo la vista de detalle la carga (joinedload)
+    content = relationship(
+        "ProductContent",
+        uselist=False,
+        back_populates="product",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy=RELATIONSHIP_LAZY
+    )
     
     # =========================================================================
     # Índices
     # =========================================================================
     
     __table_args__ = (
-        Index('idx_product_category_status', 'category_id', 'status'),
-        Index('idx_product_featured', 'is_featured', 'status'),
+        # SKU: solo se busca por igualdad (WHERE sku = ?). Un índice hash es
+        # más chico que un btree para strings de 50 caracteres; como
+        # PostgreSQL no admite UNIQUE sobre hash, la unicidad se garantiza
+        # con una restricción EXCLUDE USING hash (sku WITH =).
+        ExcludeConstraint(
+            (sku, '='),
+            name='excl_products_sku',
+            using='hash'
+        ),
+        # Listado por categoría (ProductService.list_products): el orden del
+        # índice coincide con el ORDER BY (sin nodo Sort) e INCLUDE cubre las
+        # columnas de la tarjeta de producto (index-only scan).
+        # Parcial: solo productos activos (status se guarda por nombre)
+        Index(
+            'idx_product_cat_active_order',
+            category_id,
+            display_order,
+            published_at.desc(),
+            postgresql_include=['name', 'price', 'stock'],
+            postgresql_where=text("status = 'ACTIVE'")
+        ),
+        # Destacados activos, más recientes primero
+        Index(
+            'idx_product_featured_pub',
+            published_at.desc(),
+            postgresql_where=text("is_featured AND status = 'ACTIVE'")
+        ),
+        # Página "Ofertas": solo indexa los productos en oferta
+        # (mismo predicado que Product.is_on_sale)
+        Index(
+            'idx_products_on_sale',
+            category_id,
+            price,
+            postgresql_where=text(
+                "compare_price IS NOT NULL AND compare_price > price "
+                "AND status = 'ACTIVE'"
+            )
+        ),
+        # Búsqueda por tag (containment @>)
+        Index(
+            'idx_products_tags',
+            tags,
+            postgresql_using='gin'
+        ),
+        # "Mayores descuentos primero": solo productos con descuento
+        Index(
+            'idx_products_discount',
+            discount_pct.desc(),
+            postgresql_where=text("discount_pct > 0")
+        ),
+        # Listados "solo con stock" (Product.is_in_stock en SQL = in_stock)
+        Index(
+            'idx_products_in_stock',
+            category_id,
+            display_order,
+            postgresql_where=text("in_stock")
+        ),
+        # Alertas de stock bajo (mismo predicado que Product.is_low_stock)
+        Index(
+            'idx_products_low_stock',
+            stock,
+            postgresql_where=text("stock > 0 AND stock <= low_stock_threshold")
+        ),
+        # Reportes por rango de fechas (created_at BETWEEN ...): las filas
+        # se insertan en orden temporal, así que un BRIN (mín/máx por bloque
+        # de páginas) filtra casi igual que un btree ocupando unas pocas páginas
+        Index(
+            'idx_products_created_brin',
+            created_at,
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32}
+        ),
+        Index(
+            'idx_products_published_brin',
+            published_at,
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32}
+        ),
+        # Búsqueda full-text sin recorrer la tabla
+        Index(
+            'idx_products_search_vector',
+            search_vector,
+            postgresql_using='gin'
+        ),
+        # Trigramas (pg_trgm): LIKE/ILIKE '%texto%' y similitud usan índice.
+        # El de name es sobre lower(name): la consulta debe usar la misma
+        # expresión (ver ProductService.search_by_name)
+        Index(
+            'idx_products_name_trgm',
+            func.lower(name).label('name_lower'),
+            postgresql_using='gin',
+            postgresql_ops={'name_lower': 'gin_trgm_ops'}
+        ),
+        Index(
+            'idx_products_sku_trgm',
+            sku,
+            postgresql_using='gin',
+            postgresql_ops={'sku': 'gin_trgm_ops'}
+        ),
     )
     
     # =========================================================================
     # Propiedades
     # =========================================================================
+    # is_on_sale, is_in_stock e is_low_stock son hybrid_property: en una
+    # instancia se evalúan en Python; sobre la clase generan la condición
+    # SQL, para filtrar en la BD (ej: .where(Product.is_on_sale)) en lugar
+    # de traer todas las filas y filtrar en Python.
     
-    @property
+    @hybrid_property
     def is_on_sale(self) -> bool:
         """Verifica si el producto está en oferta."""
         return self.compare_price is not None and self.compare_price > self.price
     
-    @property
+    @is_on_sale.inplace.expression
+    @classmethod
+    def _is_on_sale_expression(cls):
+        return and_(cls.compare_price.isnot(None), cls.compare_price > cls.price)
+    
+    @hybrid_property
     def discount_percentage(self) -> int:
         """Calcula el porcentaje de descuento."""
         if not self.is_on_sale:
             return 0
         return int(((self.compare_price - self.price) / self.compare_price) * 100)
     
-    @property
+    @discount_percentage.inplace.expression
+    @classmethod
+    def _discount_percentage_expression(cls):
+        # La columna generada: usa idx_products_discount
+        return cls.discount_pct
+    
+    @hybrid_property
     def is_in_stock(self) -> bool:
         """Verifica si hay stock disponible."""
         return self.stock > 0 or self.allow_backorder
     
-    @property
+    @is_in_stock.inplace.expression
+    @classmethod
+    def _is_in_stock_expression(cls):
+        # La columna generada: usa idx_products_in_stock
+        return cls.in_stock
+    
+    @hybrid_property
     def is_low_stock(self) -> bool:
         """Verifica si el stock está bajo."""
         return 0 < self.stock <= self.low_stock_threshold
     
+    @is_low_stock.inplace.expression
+    @classmethod
+    def _is_low_stock_expression(cls):
+        return and_(cls.stock > 0, cls.stock <= cls.low_stock_threshold)
+    
+    @classmethod
+    def on_sale_q(cls):
+        """
+        Consulta de productos activos en oferta.
+        
+        Usa el índice parcial idx_products_on_sale.
+        """
+        return select(cls).where(cls.is_on_sale, cls.status == ProductStatus.ACTIVE)
+    
     def __repr__(self):
         return f"<Product {self.name}>"
 
 
+# ==============================================================================
+# MODELO: ProductContent
+# ==============================================================================
+
+class ProductContent(Base):
+    """
+    Contenido extenso de un producto (relación 1:1 con Product).
+    
+    Columnas "frías": solo las lee la vista de detalle. Separadas de
+    products, las filas de la tabla principal son angostas y los listados
+    leen más productos por página.
+    """
+    __tablename__ = "product_content"
+    
+    product_id = Column(
+        UUID(as_uuid=True), 
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    
+    # Descripción completa (HTML permitido)
+    description = Column(
+        Text, 
+        nullable=True,
+        comment="Descripción completa del producto"
+    )
+    
+    # SEO
+    meta_title = Column(
+        String(70), 
+        nullable=True,
+        comment="Título para SEO"
+    )
+    
+    meta_description = Column(
+        String(160), 
+        nullable=True,
+        comment="Descripción para SEO"
+    )
+    
+    # Búsqueda full-text sobre la descripción (peso C). Una columna generada
+    # no puede leer otra tabla, por eso no está en Product.search_vector
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('spanish', coalesce(description, '')), 'C')",
+            persisted=True
+        ),
+        comment="Vector de búsqueda de la descripción (columna generada)"
+    )
+    
+    # Relación
+    product = relationship("Product", back_populates="content", lazy=RELATIONSHIP_LAZY)
+    
+    __table_args__ = (
+        Index(
+            'idx_product_content_search_vector',
+            search_vector,
+            postgresql_using='gin'
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<ProductContent {self.product_id}>"
+
+
 # ==============================================================================
 # MODELO: ProductImage
 # ==============================================================================
@@ -471,10 +728,22 @@ class ProductImage(Base):
         comment="Si es la imagen principal"
     )
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relación
-    product = relationship("Product", back_populates="images")
+    product = relationship("Product", back_populates="images", lazy=RELATIONSHIP_LAZY)
+    
+    __table_args__ = (
+        # Una sola imagen principal por producto, garantizado por la BD.
+        # Para cambiarla, desmarcar la actual antes de marcar la nueva
+        # (ver ProductService.set_primary_image).
+        Index(
+            'uq_product_primary_image',
+            product_id,
+            unique=True,
+            postgresql_where=text("is_primary = true")
+        ),
+    )
     
     def __repr__(self):
         return f"<ProductImage {self.product_id}>"
@@ -505,10 +774,9 @@ class ProductVariant(Base):
         index=True
     )
     
-    # SKU de la variante
+    # SKU de la variante (único sin distinguir mayúsculas, ver excl_variants_sku)
     sku = Column(
-        String(50), 
-        unique=True,
+        CITEXT, 
         nullable=False,
         comment="SKU de la variante"
     )
@@ -521,13 +789,17 @@ class ProductVariant(Base):
     )
     
     # Opciones (ej: {"talla": "M", "color": "Rojo"})
-    # TODO: Usar JSONB para mayor flexibilidad
-    option1_name = Column(String(50), nullable=True, comment="Nombre opción 1 (ej: Talla)")
-    option1_value = Column(String(50), nullable=True, comment="Valor opción 1 (ej: M)")
-    option2_name = Column(String(50), nullable=True, comment="Nombre opción 2 (ej: Color)")
-    option2_value = Column(String(50), nullable=True, comment="Valor opción 2 (ej: Rojo)")
-    option3_name = Column(String(50), nullable=True)
-    option3_value = Column(String(50), nullable=True)
+    # Una columna JSONB en lugar de pares option1..3_name/value: la fila
+    # solo ocupa las opciones que tiene y no hay límite de tres.
+    # Filtrar con ProductVariant.options.contains({"color": "Rojo"})
+    # (containment @>, usa idx_variants_options)
+    options = Column(
+        JSONB,
+        nullable=False,
+        default=dict,
+        server_default=text("'{}'::jsonb"),
+        comment="Opciones de la variante (ej: {\"talla\": \"M\"})"
+    )
     
     # Precio (puede ser diferente al producto base)
     price = Column(
@@ -560,12 +832,58 @@ class ProductVariant(Base):
     # Estado
     is_active = Column(Boolean, default=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
     
     # Relación
-    product = relationship("Product", back_populates="variants")
+    product = relationship("Product", back_populates="variants", lazy=RELATIONSHIP_LAZY)
+    
+    __table_args__ = (
+        # Unicidad por índice hash, igual que Product.sku
+        ExcludeConstraint(
+            (sku, '='),
+            name='excl_variants_sku',
+            using='hash'
+        ),
+        # jsonb_path_ops: índice más chico, solo soporta @> (el único
+        # operador que se usa sobre options)
+        Index(
+            'idx_variants_options',
+            options,
+            postgresql_using='gin',
+            postgresql_ops={'options': 'jsonb_path_ops'}
+        ),
+    )
     
     def __repr__(self):
         return f"<ProductVariant {self.name}>"
 
+
+# ==============================================================================
+# EXTENSIONES Y FUNCIONES
+# ==============================================================================
+# pg_trgm debe existir antes de crear los índices gin_trgm_ops y citext
+# antes de crear las columnas CITEXT.
+#
+# products_tags_to_text: array_to_string es STABLE y una columna generada
+# solo admite funciones IMMUTABLE; para varchar[] el resultado no depende de
+# la configuración, por lo que el wrapper puede declararse IMMUTABLE.
+
+products_tags_to_text = DDL("""
+CREATE OR REPLACE FUNCTION products_tags_to_text(varchar[]) RETURNS text AS $$
+    SELECT coalesce(array_to_string($1, ' '), '')
+$$ LANGUAGE sql IMMUTABLE
+""")
+
+for ddl in (
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    DDL("CREATE EXTENSION IF NOT EXISTS citext"),
+    products_tags_to_text,
+):
+    event.listen(
+        Product.__table__,
+        "before_create",
+        ddl.execute_if(dialect="postgresql")
+    )
@@ -0,0 +1,123 @@
+"""
+Servicio de inventario.
+
+Descuento y reposición de stock al confirmar o cancelar órdenes.
+"""
+
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import Integer, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product import Product, ProductStatus
+from app.services.product_cache import invalidate_on_commit
+
+
+class InsufficientStockError(Exception):
+    """Uno o más productos no tienen stock suficiente."""
+
+    def __init__(self, product_ids: list[UUID]):
+        self.product_ids = product_ids
+        super().__init__(f"Stock insuficiente: {', '.join(map(str, product_ids))}")
+
+
+class InventoryService:
+    """
+    Servicio de stock de productos.
+
+    USO (al confirmar una orden):
+        service = InventoryService(db)
+        await service.decrement_stock({product_id: quantity, ...})
+        await db.commit()
+
+    USO (alertas de reposición):
+        products = await service.list_low_stock()
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Inicializa el servicio con una sesión de BD.
+
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+        """
+        self.db = db
+
+    async def decrement_stock(self, quantities: dict[UUID, int]) -> None:
+        """
+        Descuenta el stock de todos los productos de una orden.
+
+        Dos sentencias en total, sin importar la cantidad de líneas:
+        1. SELECT ... ORDER BY id FOR UPDATE: bloquea las filas siempre en
+           el mismo orden, así dos órdenes con los mismos productos no se
+           bloquean mutuamente (deadlock)
+        2. UPDATE products SET stock = stock - v.delta
+           FROM (VALUES (...), (...)) AS v(id, delta) WHERE products.id = v.id
+
+        El UPDATE solo descuenta si alcanza el stock (o se permite
+        backorder). Si algún producto no alcanza se lanza la excepción y
+        el llamador hace rollback: no queda ningún descuento parcial.
+
+        Args:
+            quantities: Cantidad a descontar por producto
+
+        Raises:
+            InsufficientStockError: Si algún producto no tiene stock suficiente
+        """
+        if not quantities:
+            return
+
+        await self.db.execute(
+            select(Product.id)
+            .where(Product.id.in_(quantities))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+
+        deltas = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("delta", Integer),
+            name="v"
+        ).data(list(quantities.items()))
+
+        stmt = (
+            update(Product)
+            .where(
+                Product.id == deltas.c.id,
+                (Product.stock >= deltas.c.delta) | Product.allow_backorder.is_(True)
+            )
+            .values(stock=Product.stock - deltas.c.delta)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        updated = set(result.scalars().all())
+
+        missing = [product_id for product_id in quantities if product_id not in updated]
+        if missing:
+            raise InsufficientStockError(missing)
+
+        # El UPDATE masivo no pasa por el flush: invalidar el cache a mano
+        invalidate_on_commit(self.db, quantities)
+
+    async def list_low_stock(self, limit: int = 100) -> Sequence[Product]:
+        """
+        Productos activos con stock bajo, los más críticos primero.
+
+        Product.is_low_stock es hybrid_property: el filtro se resuelve en
+        la BD sobre el índice parcial idx_products_low_stock, sin traer
+        todo el catálogo para filtrar en Python.
+
+        Args:
+            limit: Máximo de productos
+        """
+        stmt = (
+            select(Product)
+            .where(Product.is_low_stock, Product.status == ProductStatus.ACTIVE)
+            .order_by(Product.stock)
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
@@ -0,0 +1,254 @@
+"""
+Cache de detalle de productos en Redis (cache-aside).
+
+La vista de detalle carga producto + imágenes + variantes + categoría +
+contenido (varias consultas). Los productos populares se sirven desde
+Redis; la BD solo se consulta en un miss.
+
+- Lectura: ProductCache.get_detail (Redis; en miss, BD y se guarda).
+  El miss se lee siempre del primario: con la réplica atrasada, un miss
+  justo después de una escritura volvería a cachear el producto viejo
+  durante todo el TTL
+- Invalidación: al confirmar una transacción que modificó un producto
+  (o sus imágenes, variantes o contenido) se borra su entrada
+- Calentamiento: run_warmer precarga los más visitados cada
+  WARM_INTERVAL_SECONDS, para que no paguen el miss tras expirar
+"""
+
+import asyncio
+import logging
+from decimal import Decimal
+from functools import lru_cache
+from typing import Iterable, Optional
+from uuid import UUID
+
+import orjson
+import redis.asyncio as redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.product import Product, ProductContent, ProductImage, ProductVariant
+from app.services.product_service import ProductService
+
+logger = logging.getLogger(__name__)
+
+# Entrada de cache por producto: product:{id}
+PRODUCT_CACHE_PREFIX = "product:"
+PRODUCT_CACHE_TTL = 300  # 5 minutos
+
+# Sorted set de visitas por producto (frecuencia de acceso)
+PRODUCT_VIEWS_KEY = "product:views"
+
+# Productos que precarga el warmer y cada cuánto
+WARM_TOP_N = 1000
+WARM_INTERVAL_SECONDS = 300
+
+# Clave en session.info con los productos a invalidar al confirmar
+_PENDING_KEY = "product_cache_invalidate"
+
+
+@lru_cache()
+def get_redis() -> redis.Redis:
+    """Cliente Redis compartido (uno por proceso)."""
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def _default(value):
+    """Tipos que orjson no serializa de forma nativa."""
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def _columns(obj) -> dict:
+    """Columnas de una instancia ORM como dict (sin el vector de búsqueda)."""
+    return {
+        column.key: getattr(obj, column.key)
+        for column in obj.__table__.columns
+        if column.key != "search_vector"
+    }
+
+
+def serialize_product(product: Product) -> bytes:
+    """Serializa el detalle de un producto (lo que devuelve la API)."""
+    data = _columns(product)
+    data["category"] = _columns(product.category) if product.category else None
+    data["content"] = _columns(product.content) if product.content else None
+    data["images"] = [_columns(image) for image in product.images]
+    data["variants"] = [_columns(variant) for variant in product.variants]
+    return orjson.dumps(data, default=_default)
+
+
+class ProductCache:
+    """
+    Cache de detalle de productos.
+
+    USO:
+        cache = ProductCache()
+        data = await cache.get_detail(product_id)  # bytes JSON o None
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker[AsyncSession]] = None,
+        redis_client: Optional[redis.Redis] = None
+    ):
+        """
+        Args:
+            session_factory: Fábrica de sesiones para los miss (por
+                             defecto, AsyncSessionLocal). Las lecturas se
+                             hacen sobre el primario, no la réplica.
+            redis_client: Cliente Redis (por defecto, get_redis())
+        """
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.redis = redis_client or get_redis()
+
+    @staticmethod
+    def key(product_id) -> str:
+        """Key de Redis del detalle de un producto."""
+        return f"{PRODUCT_CACHE_PREFIX}{product_id}"
+
+    async def get_detail(self, product_id: UUID) -> Optional[bytes]:
+        """
+        Detalle del producto ya serializado (JSON).
+
+        Cuenta la visita en PRODUCT_VIEWS_KEY (lo usa el warmer).
+
+        Returns:
+            JSON del producto, o None si no existe
+        """
+        key = self.key(product_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.zincrby(PRODUCT_VIEWS_KEY, 1, str(product_id))
+            cached, _ = await pipe.execute()
+        if cached is not None:
+            return cached
+
+        return await self.load(product_id)
+
+    async def load(self, product_id: UUID) -> Optional[bytes]:
+        """Lee el producto del primario y lo guarda en cache."""
+        async with self.session_factory(info={"read_only": False}) as db:
+            product = await ProductService(db).get_by_id(product_id)
+            if product is None:
+                return None
+            data = serialize_product(product)
+        await self.redis.set(self.key(product_id), data, ex=PRODUCT_CACHE_TTL)
+        return data
+
+    async def warm(self, top_n: int = WARM_TOP_N) -> int:
+        """
+        Precarga los top_n productos más visitados que no estén en cache.
+
+        Returns:
+            Cantidad de productos cargados
+        """
+        product_ids = await self.redis.zrevrange(PRODUCT_VIEWS_KEY, 0, top_n - 1)
+        if not product_ids:
+            return 0
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for product_id in product_ids:
+                pipe.exists(self.key(product_id.decode()))
+            exists = await pipe.execute()
+
+        loaded = 0
+        for product_id, cached in zip(product_ids, exists):
+            if not cached and await self.load(UUID(product_id.decode())):
+                loaded += 1
+
+        # El ranking no crece sin límite: se conservan los 10 × top_n primeros
+        await self.redis.zremrangebyrank(PRODUCT_VIEWS_KEY, 0, -(top_n * 10) - 1)
+        return loaded
+
+
+async def invalidate(product_ids: Iterable) -> None:
+    """Borra del cache el detalle de los productos indicados."""
+    keys = [ProductCache.key(product_id) for product_id in product_ids]
+    if keys:
+        await get_redis().delete(*keys)
+
+
+# ==============================================================================
+# INVALIDACIÓN AL CONFIRMAR
+# ==============================================================================
+
+def _collect_changed(session: Session, flush_context) -> None:
+    """after_flush: registra los productos modificados en esta transacción."""
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Product):
+            pending.add(obj.id)
+        elif isinstance(obj, (ProductImage, ProductVariant, ProductContent)):
+            pending.add(obj.product_id)
+
+
+def invalidate_on_commit(db: AsyncSession, product_ids: Iterable) -> None:
+    """
+    Programa la invalidación de productos al confirmar la transacción.
+
+    Para UPDATE masivos (update(Product)...), que no pasan por el flush.
+    Invalidar recién en el commit evita que otro request vuelva a cachear
+    el valor viejo mientras la transacción sigue abierta.
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update(product_ids)
+
+
+def _invalidate_committed(session: Session) -> None:
+    """after_commit: borra las entradas (en background, sin bloquear el commit)."""
+    product_ids = session.info.pop(_PENDING_KEY, None)
+    if product_ids:
+        task = asyncio.get_running_loop().create_task(invalidate(product_ids))
+        task.add_done_callback(_log_failure)
+
+
+def _discard_pending(session: Session) -> None:
+    """after_rollback: los cambios no se confirmaron, no hay que invalidar."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Error invalidando cache de productos", exc_info=task.exception())
+
+
+def install_invalidation_hooks(session_class: type[Session]) -> None:
+    """
+    Registra la invalidación automática en una clase de sesión.
+
+    Llamar una vez al iniciar la aplicación:
+        install_invalidation_hooks(RoutingSession)
+
+    Los UPDATE masivos (update(Product)...) no pasan por el flush: quien
+    los ejecute debe llamar a invalidate_on_commit() con los IDs afectados.
+    """
+    event.listen(session_class, "after_flush", _collect_changed)
+    event.listen(session_class, "after_commit", _invalidate_committed)
+    event.listen(session_class, "after_rollback", _discard_pending)
+
+
+# ==============================================================================
+# WARMER
+# ==============================================================================
+
+async def run_warmer(session_factory: async_sessionmaker[AsyncSession]) -> None:
+    """
+    Precarga periódica de los productos más visitados.
+
+    Iniciar como tarea de background en el lifespan de la aplicación:
+        asyncio.create_task(run_warmer(AsyncSessionLocal))
+
+    Como los miss, lee del primario (ver ProductCache.load).
+    """
+    while True:
+        try:
+            loaded = await ProductCache(session_factory).warm()
+            if loaded:
+                logger.info("Cache de productos: %d precargados", loaded)
+        except Exception:
+            logger.exception("Error precargando cache de productos")
+        await asyncio.sleep(WARM_INTERVAL_SECONDS)
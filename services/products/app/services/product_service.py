@@ -0,0 +1,392 @@
+"""
+Servicio de catálogo de productos.
+
+Consultas de listado y búsqueda sobre el catálogo.
+"""
+
+from typing import Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import func, select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.product import (
+    Product, ProductContent, ProductImage, ProductStatus, ProductVariant
+)
+
+
+# Configuración de búsqueda full-text (debe coincidir con la de search_vector)
+SEARCH_CONFIG = "spanish"
+
+# Carga de relaciones para listados de la tienda:
+# - images y variants con selectinload: una consulta IN (...) extra por
+#   relación, sin importar cuántos productos tenga la página (evita N+1)
+# - category con joinedload: es una sola fila por producto, el JOIN no
+#   multiplica filas
+# Listado de 50 productos = 3 consultas en lugar de 101.
+LISTING_LOADERS = (
+    selectinload(Product.images),
+    selectinload(Product.variants),
+    joinedload(Product.category),
+)
+
+
+class ProductService:
+    """
+    Servicio para consultas del catálogo.
+
+    USO:
+        service = ProductService(db)
+        products = await service.list_products(category_id=category_id)
+        products = await service.search("zapatillas running")
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Inicializa el servicio con una sesión de BD.
+
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+        """
+        self.db = db
+
+    # =========================================================================
+    # LISTADOS
+    # =========================================================================
+
+    async def list_products(
+        self,
+        category_id: Optional[UUID] = None,
+        status: ProductStatus = ProductStatus.ACTIVE,
+        limit: int = 50,
+        offset: int = 0,
+        in_stock_only: bool = False,
+        with_details: bool = True
+    ) -> Sequence[Product]:
+        """
+        Listado de productos de la tienda.
+
+        Args:
+            category_id: Filtrar por categoría (None = todas)
+            status: Estado de los productos a listar
+            limit: Productos por página
+            offset: Desplazamiento de la página
+            in_stock_only: Excluir productos sin stock (columna in_stock)
+            with_details: Cargar imágenes, variantes y categoría
+                          (LISTING_LOADERS). Los listados del admin que
+                          no las muestran usan False para no traerlas.
+
+        Returns:
+            Productos de la página
+        """
+        stmt = (
+            select(Product)
+            .where(Product.status == status)
+            .order_by(Product.display_order, Product.published_at.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        if category_id is not None:
+            stmt = stmt.where(Product.category_id == category_id)
+        if in_stock_only:
+            stmt = stmt.where(Product.is_in_stock)
+        if with_details:
+            stmt = stmt.options(*LISTING_LOADERS)
+
+        result = await self.db.execute(stmt)
+        return result.unique().scalars().all()
+
+    async def list_on_sale(
+        self,
+        category_id: Optional[UUID] = None,
+        limit: int = 50
+    ) -> Sequence[Product]:
+        """
+        Productos activos en oferta, más baratos primero.
+
+        El filtro se resuelve en la BD (Product.on_sale_q) sobre el índice
+        parcial idx_products_on_sale.
+
+        Args:
+            category_id: Filtrar por categoría (None = todas)
+            limit: Máximo de productos
+        """
+        stmt = Product.on_sale_q().order_by(Product.price).limit(limit)
+        if category_id is not None:
+            stmt = stmt.where(Product.category_id == category_id)
+        stmt = stmt.options(*LISTING_LOADERS)
+
+        result = await self.db.execute(stmt)
+        return result.unique().scalars().all()
+
+    async def list_biggest_discounts(self, limit: int = 50) -> Sequence[Product]:
+        """
+        Productos activos con mayor descuento primero.
+
+        Ordena por la columna generada discount_pct (índice
+        idx_products_discount): sin ordenar todo el catálogo en memoria.
+
+        Args:
+            limit: Máximo de productos
+        """
+        stmt = (
+            select(Product)
+            .where(
+                Product.discount_pct > 0,
+                Product.status == ProductStatus.ACTIVE
+            )
+            .order_by(Product.discount_pct.desc())
+            .limit(limit)
+            .options(*LISTING_LOADERS)
+        )
+        result = await self.db.execute(stmt)
+        return result.unique().scalars().all()
+
+    async def list_by_tag(self, tag: str, limit: int = 50) -> Sequence[Product]:
+        """
+        Productos activos con un tag (tags @> ARRAY[tag], índice GIN).
+
+        Args:
+            tag: Tag a buscar
+            limit: Máximo de productos
+        """
+        stmt = (
+            select(Product)
+            .where(
+                Product.tags.contains([tag]),
+                Product.status == ProductStatus.ACTIVE
+            )
+            .order_by(Product.display_order, Product.published_at.desc())
+            .limit(limit)
+            .options(*LISTING_LOADERS)
+        )
+        result = await self.db.execute(stmt)
+        return result.unique().scalars().all()
+
+    async def list_featured(self, limit: int = 12) -> Sequence[Product]:
+        """
+        Productos destacados activos (índice idx_product_featured_pub).
+
+        Args:
+            limit: Máximo de productos
+        """
+        stmt = (
+            select(Product)
+            .where(
+                Product.is_featured.is_(True),
+                Product.status == ProductStatus.ACTIVE
+            )
+            .order_by(Product.published_at.desc())
+            .limit(limit)
+            .options(*LISTING_LOADERS)
+        )
+        result = await self.db.execute(stmt)
+        return result.unique().scalars().all()
+
+    # =========================================================================
+    # DETALLE
+    # =========================================================================
+
+    async def get_by_slug(self, slug: str) -> Optional[Product]:
+        """
+        Producto completo para la vista de detalle.
+
+        Las vistas de detalle son las únicas consultas que cargan
+        ProductContent (descripción y SEO).
+
+        Args:
+            slug: Slug del producto
+        """
+        return await self._get_detail(Product.slug == slug)
+
+    async def get_by_id(self, product_id: UUID) -> Optional[Product]:
+        """
+        Producto completo por ID (ver ProductCache para la versión cacheada).
+
+        Args:
+            product_id: ID del producto
+        """
+        return await self._get_detail(Product.id == product_id)
+
+    async def _get_detail(self, condition) -> Optional[Product]:
+        """Producto con imágenes, variantes, categoría y contenido."""
+        stmt = (
+            select(Product)
+            .where(condition)
+            .options(*LISTING_LOADERS, joinedload(Product.content))
+        )
+        result = await self.db.execute(stmt)
+        return result.unique().scalar_one_or_none()
+
+    # =========================================================================
+    # IMÁGENES
+    # =========================================================================
+
+    async def get_primary_image(self, product_id: UUID) -> Optional[ProductImage]:
+        """
+        Imagen principal de un producto.
+
+        El índice único parcial uq_product_primary_image garantiza a lo
+        sumo una fila: lectura directa del índice, sin recorrer ni
+        desambiguar todas las imágenes del producto.
+
+        Args:
+            product_id: ID del producto
+        """
+        return await self.db.scalar(
+            select(ProductImage).where(
+                ProductImage.product_id == product_id,
+                ProductImage.is_primary.is_(True)
+            )
+        )
+
+    async def set_primary_image(self, product_id: UUID, image_id: UUID) -> None:
+        """
+        Marca una imagen como principal y desmarca la anterior.
+
+        La anterior se desmarca en un flush previo: si ambos cambios van
+        en el mismo UPDATE por lotes, el índice único puede rechazar el
+        estado intermedio con dos imágenes principales.
+
+        Args:
+            product_id: ID del producto
+            image_id: ID de la nueva imagen principal
+
+        Raises:
+            ValueError: Si la imagen no pertenece al producto
+        """
+        image = await self.db.get(ProductImage, image_id)
+        if image is None or image.product_id != product_id:
+            raise ValueError("La imagen no pertenece al producto")
+
+        current = await self.get_primary_image(product_id)
+        if current is image:
+            return
+        if current is not None:
+            current.is_primary = False
+            await self.db.flush()
+
+        image.is_primary = True
+        await self.db.flush()
+
+    # =========================================================================
+    # VARIANTES
+    # =========================================================================
+
+    async def find_variants(
+        self,
+        product_id: UUID,
+        options: dict[str, str]
+    ) -> Sequence[ProductVariant]:
+        """
+        Variantes activas de un producto con las opciones indicadas.
+
+        options @> {...} usa el índice GIN idx_variants_options.
+
+        Args:
+            product_id: ID del producto
+            options: Opciones requeridas (ej: {"talla": "M"})
+        """
+        stmt = select(ProductVariant).where(
+            ProductVariant.product_id == product_id,
+            ProductVariant.options.contains(options),
+            ProductVariant.is_active.is_(True)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    # =========================================================================
+    # BÚSQUEDA
+    # =========================================================================
+
+    async def search(self, q: str, limit: int = 20) -> Sequence[Product]:
+        """
+        Búsqueda full-text de productos activos.
+
+        Usa search_vector @@ plainto_tsquery (índice GIN) en lugar de
+        ILIKE '%...%' sobre cada columna de texto, que recorre la tabla
+        completa. Se busca en el vector del producto (nombre, descripción
+        corta, tags) y en el de ProductContent (descripción completa).
+
+        Un OR entre columnas de las dos tablas del outer join no puede
+        usar ningún índice (el planner termina en un seq scan del JOIN).
+        Los IDs se juntan con un UNION de dos búsquedas, cada una servida
+        por su índice GIN, y recién después se hace el JOIN para ordenar.
+        Los resultados se ordenan por relevancia (ts_rank_cd, respeta los
+        pesos de cada columna).
+
+        Args:
+            q: Texto ingresado por el usuario
+            limit: Máximo de resultados
+
+        Returns:
+            Productos ordenados por relevancia
+        """
+        query = func.plainto_tsquery(SEARCH_CONFIG, q)
+        matches = union(
+            select(Product.id.label("id"))
+            .where(Product.search_vector.op("@@")(query)),
+            select(ProductContent.product_id)
+            .where(ProductContent.search_vector.op("@@")(query))
+        ).subquery("matches")
+        rank = (
+            func.ts_rank_cd(Product.search_vector, query)
+            + func.coalesce(func.ts_rank_cd(ProductContent.search_vector, query), 0)
+        )
+        stmt = (
+            select(Product)
+            .join(matches, matches.c.id == Product.id)
+            .outerjoin(Product.content)
+            .where(Product.status == ProductStatus.ACTIVE)
+            .order_by(rank.desc())
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def search_by_name(self, q: str, limit: int = 10) -> Sequence[Product]:
+        """
+        Autocompletado: productos activos cuyo nombre contiene q.
+
+        lower(name) LIKE '%q%' coincide con la expresión del índice
+        idx_products_name_trgm, por lo que no recorre la tabla.
+
+        Args:
+            q: Texto ingresado por el usuario
+            limit: Máximo de resultados
+        """
+        stmt = (
+            select(Product)
+            .where(
+                func.lower(Product.name).like(_contains(q.lower()), escape="\\"),
+                Product.status == ProductStatus.ACTIVE
+            )
+            .order_by(Product.name)
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def search_by_sku(self, q: str, limit: int = 10) -> Sequence[Product]:
+        """
+        Productos cuyo SKU contiene q (índice idx_products_sku_trgm).
+
+        Args:
+            q: Fragmento de SKU
+            limit: Máximo de resultados
+        """
+        stmt = (
+            select(Product)
+            .where(Product.sku.ilike(_contains(q), escape="\\"))
+            .order_by(Product.sku)
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+
+def _contains(text: str) -> str:
+    """Patrón LIKE '%text%' escapando los comodines del texto del usuario."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
@@ -0,0 +1,98 @@
+"""
+Configuración de la base de datos.
+
+Este archivo configura la conexión a PostgreSQL usando SQLAlchemy 2.0
+con soporte asíncrono (asyncpg).
+
+PREPARED STATEMENTS:
+El dialecto asyncpg prepara cada sentencia en el servidor y guarda el
+statement preparado en un cache por conexión (hasta
+DB_PREPARED_STATEMENT_CACHE_SIZE sentencias). Las consultas frecuentes
+(ej: dirección por ID) pagan parse/plan una vez por conexión; las
+siguientes ejecuciones solo envían los parámetros. Requiere que el texto
+SQL sea siempre el mismo: sentencias armadas una vez a nivel de módulo
+(ver app/services/address_service.py).
+
+Detrás de PgBouncer en modo transaction (1.21+ con max_prepared_statements
+> 0) activar DB_BEHIND_PGBOUNCER: cada statement recibe un nombre único,
+porque la misma conexión del servidor la comparten varios clientes.
+"""
+
+from uuid import uuid4
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.config import settings
+
+# ==============================================================================
+# CONFIGURACIÓN DEL ENGINE
+# ==============================================================================
+
+
+def _prepared_statement_name() -> str:
+    """Nombre único por statement (PgBouncer en modo transaction)."""
+    return f"__asyncpg_{uuid4()}__"
+
+
+DATABASE_URL = make_url(settings.DATABASE_URL).update_query_dict({
+    "prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE),
+})
+
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+    connect_args=(
+        {"prepared_statement_name_func": _prepared_statement_name}
+        if settings.DB_BEHIND_PGBOUNCER
+        else {}
+    ),
+)
+
+# ==============================================================================
+# CONFIGURACIÓN DE SESIONES
+# ==============================================================================
+
+AsyncSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    expire_on_commit=False,  # Evita queries extra después del commit
+    autoflush=False,
+)
+
+
+# ==============================================================================
+# DEPENDENCY INJECTION PARA FASTAPI
+# ==============================================================================
+
+async def get_db() -> AsyncSession:
+    """
+    Dependency que provee una sesión de base de datos.
+
+    Uso en routers:
+        @router.get("/users/me/addresses")
+        async def list_addresses(db: AsyncSession = Depends(get_db)):
+            service = AddressService(db)
+            ...
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def close_db():
+    """
+    Cierra las conexiones a la base de datos.
+
+    Llamar al cerrar la aplicación para liberar recursos.
+    """
+    await engine.dispose()
@@ -5,16 +5,20 @@ Este servicio extiende la información básica del usuario
 que se maneja en el servicio Auth.
 """
 
+import re
 import uuid
-from datetime import datetime, date
+from functools import cached_property
 from enum import Enum as PyEnum
+from typing import Optional
 
 from sqlalchemy import (
     Column, String, Boolean, DateTime, Date,
-    ForeignKey, Enum, Text, Integer
+    ForeignKey, Enum, Text, Integer, SmallInteger,
+    Computed, DDL, FetchedValue, Index, event, func, select, text
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import CHAR, CITEXT, ENUM as PgEnum, ExcludeConstraint, UUID
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.orm import deferred, relationship, selectinload, validates
 
 # TODO: Importar Base desde database.py
 # from app.database import Base
@@ -149,29 +153,77 @@ class UserProfile(Base):
         comment="Si el usuario acepta emails promocionales"
     )
     
+    # =========================================================================
+    # Direcciones por defecto (desnormalizado)
+    # =========================================================================
+    # Las mantiene Address.is_default (ver AddressState._validate_is_default):
+    # el perfil ya trae la dirección por defecto sin filtrar por is_default.
+    # use_alter: FK circular con addresses.user_id, se crea con ALTER TABLE
+    
+    default_shipping_address_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("addresses.id", ondelete="SET NULL", use_alter=True),
+        nullable=True,
+        comment="Dirección de envío por defecto"
+    )
+    
+    default_billing_address_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("addresses.id", ondelete="SET NULL", use_alter=True),
+        nullable=True,
+        comment="Dirección de facturación por defecto"
+    )
+    
     # =========================================================================
     # Timestamps
     # =========================================================================
     
     created_at = Column(
-        DateTime, 
-        default=datetime.utcnow
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
     )
     
+    # Lo actualiza el trigger touch_updated_at, solo si la fila cambió
     updated_at = Column(
-        DateTime, 
-        default=datetime.utcnow, 
-        onupdate=datetime.utcnow
+        DateTime(timezone=True),
+        server_default=func.now(),
+        server_onupdate=FetchedValue(),
+        nullable=False
     )
     
     # =========================================================================
     # Relaciones
     # =========================================================================
     
+    # selectin: al cargar N perfiles, las direcciones de todos llegan en
+    # una sola consulta WHERE user_id IN (...), en lugar de una por perfil.
+    # Solo las activas: las dadas de baja (deleted_at) no se cargan ni las
+    # ve el validador de is_default. Al borrar el perfil, las bajas se
+    # eliminan por el ON DELETE CASCADE de la FK.
     addresses = relationship(
         "Address", 
         back_populates="user_profile",
-        cascade="all, delete-orphan"
+        primaryjoin="and_(UserProfile.user_id == Address.user_id, "
+                    "Address.deleted_at.is_(None))",
+        foreign_keys="Address.user_id",
+        cascade="all, delete-orphan",
+        lazy="selectin"
+    )
+    
+    # Como addresses ya está cargado, estas se resuelven por PK desde la
+    # sesión (identity map), sin consulta extra. post_update: se escriben
+    # en un UPDATE posterior al INSERT de la dirección (FK circular).
+    default_shipping_address = relationship(
+        "Address",
+        foreign_keys=[default_shipping_address_id],
+        post_update=True
+    )
+    
+    default_billing_address = relationship(
+        "Address",
+        foreign_keys=[default_billing_address_id],
+        post_update=True
     )
     
     # =========================================================================
@@ -188,14 +240,115 @@ class UserProfile(Base):
             parts.append(self.last_name)
         return " ".join(parts) if parts else ""
     
+    @classmethod
+    def with_addresses_q(cls):
+        """
+        Consulta de perfiles con sus direcciones cargadas explícitamente.
+        
+        Para listados (admin): 2 consultas en total, sin importar
+        cuántos perfiles devuelva.
+        """
+        return select(cls).options(selectinload(cls.addresses))
+    
     def __repr__(self):
         return f"<UserProfile {self.user_id}>"
 
 
+# ==============================================================================
+# MODELO: Country
+# ==============================================================================
+
+# País por defecto de las direcciones
+DEFAULT_COUNTRY_ISO2 = "AR"
+
+
+class Country(Base):
+    """
+    Países (tabla de referencia).
+    
+    Las direcciones guardan el ID (SMALLINT) en lugar del nombre.
+    """
+    __tablename__ = "countries"
+    
+    id = Column(SmallInteger, primary_key=True)
+    
+    iso2 = Column(
+        CHAR(2),
+        nullable=False,
+        unique=True,
+        comment="Código ISO 3166-1 alfa-2"
+    )
+    
+    name = Column(
+        CITEXT,
+        nullable=False,
+        unique=True,
+        comment="Nombre del país"
+    )
+    
+    def __repr__(self):
+        return f"<Country {self.iso2}>"
+
+
 # ==============================================================================
 # MODELO: Address
 # ==============================================================================
 
+# Normalización de campos de texto libre (ver Address, Validaciones).
+# Compiladas una sola vez al importar el módulo.
+_NON_DIGITS_RE = re.compile(r"\D")
+_NON_ALNUM_RE = re.compile(r"[^0-9A-Za-z]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_recipient_name(value: Optional[str]) -> Optional[str]:
+    """"  Juan   Pérez " -> "Juan Pérez"."""
+    if value is None:
+        return None
+    return _WHITESPACE_RE.sub(" ", value).strip()
+
+
+def normalize_phone(value: Optional[str]) -> Optional[str]:
+    """"+54 9 (11) 1234-5678" -> "+5491112345678"."""
+    if value is None:
+        return None
+    digits = _NON_DIGITS_RE.sub("", value)
+    return f"+{digits}" if value.lstrip().startswith("+") else digits
+
+
+def normalize_postal_code(value: Optional[str]) -> Optional[str]:
+    """"c1425 abc" -> "C1425ABC"."""
+    if value is None:
+        return None
+    return _NON_ALNUM_RE.sub("", value).upper()
+
+
+def normalize_tax_id(value: Optional[str]) -> Optional[str]:
+    """"20-12345678-9" -> "20123456789"."""
+    if value is None:
+        return None
+    return _NON_DIGITS_RE.sub("", value)
+
+
+# Columna -> normalizador. Los usan los @validates de Address y los
+# INSERT por lotes (AddressService.bulk_create), que no pasan por el ORM
+ADDRESS_NORMALIZERS = {
+    "recipient_name": normalize_recipient_name,
+    "phone": normalize_phone,
+    "postal_code": normalize_postal_code,
+    "tax_id": normalize_tax_id,
+}
+
+
+def normalize_address_row(row: dict) -> dict:
+    """Copia de row con los campos de ADDRESS_NORMALIZERS normalizados."""
+    normalized = dict(row)
+    for key, normalize in ADDRESS_NORMALIZERS.items():
+        if key in normalized:
+            normalized[key] = normalize(normalized[key])
+    return normalized
+
+
 class Address(Base):
     """
     Dirección del usuario.
@@ -237,9 +390,18 @@ class Address(Base):
     )
     
     # Tipo de dirección
+    # ENUM nativo de PostgreSQL con los valores ("shipping", ...) y no los
+    # nombres del enum de Python
     address_type = Column(
-        Enum(AddressType), 
+        PgEnum(
+            AddressType,
+            name="address_type_enum",
+            values_callable=lambda e: [member.value for member in e],
+            native_enum=True
+        ),
+        nullable=False,
         default=AddressType.BOTH,
+        server_default=AddressType.BOTH.value,
         comment="Si es de envío, facturación o ambas"
     )
     
@@ -256,8 +418,9 @@ class Address(Base):
     )
     
     # Teléfono de contacto
+    # Normalizado por normalize_phone: E.164, "+" y hasta 15 dígitos
     phone = Column(
-        String(20), 
+        String(16), 
         nullable=True,
         comment="Teléfono de contacto para el envío"
     )
@@ -287,75 +450,118 @@ class Address(Base):
         comment="Piso, departamento, oficina, etc."
     )
     
-    # Referencias adicionales
-    reference = Column(
-        String(200), 
-        nullable=True,
-        comment="Referencias para encontrar la dirección"
+    # Referencias adicionales (diferida: solo la usan envíos, no listados)
+    reference = deferred(
+        Column(
+            String(200), 
+            nullable=True,
+            comment="Referencias para encontrar la dirección"
+        ),
+        raiseload=True
     )
     
     # Ciudad
+    # CITEXT: WHERE city = ... sin distinguir mayúsculas ni índice funcional
     city = Column(
-        String(100), 
+        CITEXT, 
         nullable=False,
         comment="Ciudad"
     )
     
     # Provincia/Estado
     state = Column(
-        String(100), 
+        CITEXT, 
         nullable=False,
         comment="Provincia o estado"
     )
     
-    # Código postal
+    # Código postal, normalizado por normalize_postal_code (el CPA
+    # argentino es alfanumérico: C1425ABC)
     postal_code = Column(
-        String(20), 
+        String(10), 
         nullable=False,
         comment="Código postal"
     )
     
-    # País
-    country = Column(
-        String(100), 
-        default="Argentina",
+    # País: FK a la tabla countries (2 bytes por fila en lugar del nombre).
+    # Por defecto, DEFAULT_COUNTRY_ISO2 (ver countries_default_id).
+    country_id = Column(
+        SmallInteger,
+        ForeignKey("countries.id"),
+        nullable=False,
+        server_default=text("countries_default_id()"),
         comment="País"
     )
     
+    # Dirección completa formateada: la calcula la BD al escribir (columna
+    # generada), no Python en cada lectura. Solo operadores IMMUTABLE
+    # (|| y coalesce); los campos opcionales no anulan el resultado.
+    # Sin el país: una columna generada no puede leer otra tabla.
+    full_address = Column(
+        Text,
+        Computed(
+            "street || ' ' || number"
+            " || coalesce(', ' || apartment, '')"
+            " || ', ' || city || ', ' || state"
+            " || ', CP ' || postal_code",
+            persisted=True
+        ),
+        comment="Dirección completa formateada (columna generada)"
+    )
+    
     # =========================================================================
     # Datos fiscales (para facturación)
     # =========================================================================
+    # Grupo diferido "fiscal": no se cargan en los SELECT de direcciones;
+    # las pantallas de facturación usan .options(undefer_group("fiscal")).
+    # raiseload: acceder sin haberlas cargado lanza un error en lugar de
+    # una consulta implícita (que con sesión async falla de todos modos).
     
     # CUIT/CUIL/DNI para facturación
-    tax_id = Column(
-        String(20), 
-        nullable=True,
-        comment="CUIT/CUIL/DNI para facturación"
+    # Solo dígitos (ver normalize_tax_id): CUIT/CUIL tienen 11
+    tax_id = deferred(
+        Column(
+            String(13), 
+            nullable=True,
+            comment="CUIT/CUIL/DNI para facturación"
+        ),
+        group="fiscal",
+        raiseload=True
     )
     
     # Razón social (para empresas)
-    company_name = Column(
-        String(200), 
-        nullable=True,
-        comment="Razón social (si es empresa)"
+    company_name = deferred(
+        Column(
+            String(200), 
+            nullable=True,
+            comment="Razón social (si es empresa)"
+        ),
+        group="fiscal",
+        raiseload=True
     )
     
     # =========================================================================
     # Estado
     # =========================================================================
     
-    # Si es la dirección por defecto
-    is_default = Column(
-        Boolean, 
-        default=False,
-        comment="Si es la dirección por defecto del usuario"
+    # Si es la dirección por defecto: en AddressState (tabla aparte), ver
+    # Address.is_default
+    
+    # Borrado lógico: fecha de baja (NULL = activa). Los índices de las
+    # consultas del usuario son parciales WHERE deleted_at IS NULL: las
+    # direcciones dadas de baja no ocupan lugar en ellos.
+    deleted_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Fecha de baja (soft delete)"
     )
     
-    # Si está activa (soft delete)
+    # Compatibilidad: derivada de deleted_at (solo lectura). Para filtrar
+    # usar deleted_at IS NULL, que coincide con el predicado de los índices.
     is_active = Column(
-        Boolean, 
-        default=True,
-        comment="Si la dirección está activa"
+        Boolean,
+        Computed("deleted_at IS NULL", persisted=True),
+        comment="Si la dirección está activa (columna generada)"
     )
     
     # =========================================================================
@@ -363,37 +569,347 @@ class Address(Base):
     # =========================================================================
     
     created_at = Column(
-        DateTime, 
-        default=datetime.utcnow
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
     )
     
+    # Lo actualiza el trigger touch_updated_at, solo si la fila cambió
     updated_at = Column(
-        DateTime, 
-        default=datetime.utcnow, 
-        onupdate=datetime.utcnow
+        DateTime(timezone=True),
+        server_default=func.now(),
+        server_onupdate=FetchedValue(),
+        nullable=False
     )
     
     # =========================================================================
     # Relaciones
     # =========================================================================
     
-    user_profile = relationship("UserProfile", back_populates="addresses")
+    user_profile = relationship(
+        "UserProfile",
+        back_populates="addresses",
+        foreign_keys=[user_id],
+        lazy="selectin"
+    )
+    
+    # countries es una tabla chica: JOIN en la misma consulta
+    country_ref = relationship("Country", lazy="joined")
+    
+    # Nombre del país (solo lectura; para cambiarlo asignar country_id)
+    country = association_proxy("country_ref", "name")
+    
+    # Estado mutable (is_default), una fila por dirección. No se llama
+    # "state": ese nombre es la columna de la provincia
+    state_row = relationship(
+        "AddressState",
+        back_populates="address",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="joined"
+    )
+    
+    def __init__(self, is_default: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.state_row = AddressState()
+        self.is_default = is_default
+    
+    # =========================================================================
+    # Índices
+    # =========================================================================
+    
+    __table_args__ = (
+        # Direcciones activas del usuario por tipo (checkout)
+        Index(
+            'ix_addresses_user_active',
+            'user_id',
+            'address_type',
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+        # Listados de direcciones (AddressService.list_summaries): el índice
+        # incluye todas las columnas del listado, se resuelve con un
+        # index-only scan sin leer la tabla
+        Index(
+            'ix_addresses_list_cov',
+            'user_id',
+            postgresql_include=[
+                'id', 'label', 'address_type',
+                'street', 'number', 'city', 'postal_code',
+            ],
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+        # Autocompletado de direcciones (ILIKE '%...%' / similarity)
+        Index(
+            'ix_addresses_full_address_trgm',
+            'full_address',
+            postgresql_using='gin',
+            postgresql_ops={'full_address': 'gin_trgm_ops'},
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+    )
     
     # =========================================================================
     # Propiedades
     # =========================================================================
     
     @property
-    def full_address(self) -> str:
-        """Retorna la dirección completa formateada."""
-        parts = [f"{self.street} {self.number}"]
-        if self.apartment:
-            parts.append(self.apartment)
-        parts.append(f"{self.city}, {self.state}")
-        parts.append(f"CP {self.postal_code}")
-        parts.append(self.country)
-        return ", ".join(parts)
+    def is_default(self) -> bool:
+        """Si es la dirección por defecto del usuario (AddressState)."""
+        return self.state_row is not None and self.state_row.is_default
+    
+    @is_default.setter
+    def is_default(self, value: bool) -> None:
+        if self.state_row is None:
+            self.state_row = AddressState()
+        self.state_row.is_default = value
+    
+    @cached_property
+    def display_address(self) -> str:
+        """
+        Dirección completa con el país, para mostrar (carrito, emails).
+        
+        full_address (columna generada) no incluye el país. Se arma una
+        vez por instancia; se descarta al expirar o refrescar la instancia
+        (ver _clear_display_address).
+        """
+        return ", ".join(filter(None, [self.full_address, self.country]))
+    
+    # =========================================================================
+    # Validaciones
+    # =========================================================================
+    # Los valores se normalizan antes de guardarse: entran en las columnas
+    # angostas y las búsquedas comparan siempre el mismo formato.
+    
+    @validates("recipient_name", "phone", "postal_code", "tax_id")
+    def _normalize_fields(self, key, value):
+        """Normaliza con el normalizador del campo (ADDRESS_NORMALIZERS)."""
+        return ADDRESS_NORMALIZERS[key](value)
     
     def __repr__(self):
         return f"<Address {self.label or self.street}>"
 
+
+@event.listens_for(Address, "expire")
+@event.listens_for(Address, "refresh")
+def _clear_display_address(target, *args):
+    """Descarta el display_address cacheado cuando cambian los datos."""
+    target.__dict__.pop("display_address", None)
+
+
+# Los index-only scans (ix_addresses_list_cov) solo evitan la tabla en las
+# páginas marcadas como visibles: autovacuum más frecuente que el default
+# (20% de filas modificadas) mantiene el visibility map al día.
+event.listen(
+    Address.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE addresses SET (autovacuum_vacuum_scale_factor = 0.02)"
+    ).execute_if(dialect="postgresql")
+)
+
+
+# ==============================================================================
+# MODELO: AddressState
+# ==============================================================================
+
+class AddressState(Base):
+    """
+    Estado mutable de una dirección.
+    
+    Marcar la dirección por defecto es la escritura más frecuente sobre
+    direcciones. En una tabla angosta aparte, cada cambio reescribe esta
+    fila (unos pocos bytes) y no la fila completa de addresses con sus
+    índices: menos WAL y menos páginas escritas.
+    
+    Se crea junto con la dirección (Address.__init__ y
+    AddressService.bulk_create).
+    """
+    __tablename__ = "address_state"
+    
+    address_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("addresses.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    
+    # Copia de addresses.user_id (no cambia): la necesita el constraint
+    # de una dirección por defecto por usuario
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("user_profiles.user_id", ondelete="CASCADE"),
+        nullable=False,
+        comment="Usuario dueño de la dirección"
+    )
+    
+    is_default = Column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default=text("false"),
+        comment="Si es la dirección por defecto del usuario"
+    )
+    
+    # Lo actualiza el trigger touch_updated_at, solo si la fila cambió
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        server_onupdate=FetchedValue(),
+        nullable=False
+    )
+    
+    address = relationship("Address", back_populates="state_row")
+    
+    __table_args__ = (
+        # Una sola dirección por defecto por usuario, garantizado por la BD.
+        # EXCLUDE en lugar de un índice único parcial: puede ser DEFERRABLE,
+        # así un UPDATE que mueve el default de una fila a otra se valida
+        # al final de la transacción y no fila por fila. El índice btree
+        # del constraint (una fila por usuario) también resuelve la consulta
+        # de la dirección por defecto.
+        ExcludeConstraint(
+            ('user_id', '='),
+            name='uq_address_state_one_default_per_user',
+            using='btree',
+            where=text("is_default"),
+            deferrable=True,
+            initially='DEFERRED'
+        ),
+    )
+    
+    @validates("is_default")
+    def _validate_is_default(self, key, value):
+        """
+        Mantiene las direcciones por defecto del perfil.
+        
+        Al marcar una dirección como default se desmarcan las demás y se
+        actualizan default_shipping/billing_address del perfil, todo en el
+        mismo flush. La dirección debe estar asociada al perfil antes de
+        marcarla (profile.addresses.append(address)).
+        """
+        address = self.address
+        profile = address.user_profile if address is not None else None
+        if profile is None:
+            return value
+        
+        if value:
+            # address_type sin asignar: el default de la columna es BOTH
+            address_type = address.address_type or AddressType.BOTH
+            for sibling in profile.addresses:
+                # deleted_at: dada de baja en esta sesión (sigue en la
+                # colección hasta recargarla)
+                if (
+                    sibling is not address
+                    and sibling.deleted_at is None
+                    and sibling.is_default
+                ):
+                    sibling.is_default = False
+            if address_type in (AddressType.SHIPPING, AddressType.BOTH):
+                profile.default_shipping_address = address
+            if address_type in (AddressType.BILLING, AddressType.BOTH):
+                profile.default_billing_address = address
+        else:
+            if profile.default_shipping_address is address:
+                profile.default_shipping_address = None
+            if profile.default_billing_address is address:
+                profile.default_billing_address = None
+        return value
+    
+    def __repr__(self):
+        return f"<AddressState {self.address_id}>"
+
+
+@event.listens_for(AddressState, "before_insert")
+def _copy_address_user_id(mapper, connection, target):
+    """Completa user_id desde la dirección (ya insertada en este flush)."""
+    if target.user_id is None and target.address is not None:
+        target.user_id = target.address.user_id
+
+
+# ==============================================================================
+# PAÍSES: DATOS INICIALES Y DEFAULT
+# ==============================================================================
+# DEFAULT no admite subconsultas: el ID del país por defecto lo resuelve
+# countries_default_id() (se crea después de countries y antes de
+# addresses, que la usa como server_default).
+
+countries_seed = DDL("""
+INSERT INTO countries (id, iso2, name) VALUES
+    (1, 'AR', 'Argentina'),
+    (2, 'BR', 'Brasil'),
+    (3, 'CL', 'Chile'),
+    (4, 'CO', 'Colombia'),
+    (5, 'MX', 'México'),
+    (6, 'PE', 'Perú'),
+    (7, 'UY', 'Uruguay'),
+    (8, 'US', 'Estados Unidos')
+ON CONFLICT DO NOTHING
+""")
+
+countries_default_id = DDL(f"""
+CREATE OR REPLACE FUNCTION countries_default_id() RETURNS smallint AS $$
+    SELECT id FROM countries WHERE iso2 = '{DEFAULT_COUNTRY_ISO2}'
+$$ LANGUAGE sql STABLE
+""")
+
+for ddl in (countries_seed, countries_default_id):
+    event.listen(
+        Country.__table__,
+        "after_create",
+        ddl.execute_if(dialect="postgresql")
+    )
+
+
+# ==============================================================================
+# EXTENSIONES
+# ==============================================================================
+# pg_trgm debe existir antes de crear ix_addresses_full_address_trgm y
+# citext antes de crear las columnas CITEXT (countries se crea primero).
+
+for ddl in (
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    DDL("CREATE EXTENSION IF NOT EXISTS citext"),
+):
+    event.listen(
+        Country.__table__,
+        "before_create",
+        ddl.execute_if(dialect="postgresql")
+    )
+
+
+# ==============================================================================
+# TRIGGER: updated_at
+# ==============================================================================
+# updated_at se actualiza en la BD y solo si la fila realmente cambió: un
+# UPDATE que reescribe los mismos valores no lo toca. Los argumentos del
+# trigger son columnas a ignorar en la comparación (las generadas todavía
+# no están calculadas en un trigger BEFORE).
+
+touch_updated_at = DDL("""
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+DECLARE
+    ignored text[] := coalesce(TG_ARGV, '{}') || '{updated_at}';
+BEGIN
+    IF (to_jsonb(NEW) - ignored) IS DISTINCT FROM (to_jsonb(OLD) - ignored) THEN
+        NEW.updated_at = now();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+""")
+
+event.listen(Base.metadata, "before_create", touch_updated_at.execute_if(dialect="postgresql"))
+
+for table, ignored in (
+    (UserProfile.__table__, ""),
+    (Address.__table__, "'full_address', 'is_active'"),
+    (AddressState.__table__, ""),
+):
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER trg_{table.name}_touch BEFORE UPDATE ON {table.name} "
+            f"FOR EACH ROW EXECUTE FUNCTION touch_updated_at({ignored})"
+        ).execute_if(dialect="postgresql")
+    )
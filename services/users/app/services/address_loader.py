@@ -0,0 +1,123 @@
+"""
+Carga por lotes de direcciones (patrón DataLoader).
+
+Un serializer o resolver que pide las direcciones usuario por usuario
+genera una consulta por usuario. AddressLoader junta los user_id pedidos
+en la misma vuelta del event loop y los resuelve con una sola consulta
+WHERE user_id IN (...).
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, raiseload
+
+from app.models.user_profile import Address, AddressState
+
+
+# Direcciones activas de varios usuarios (misma forma que list_for_user,
+# sin el SELECT extra de Address.user_profile)
+_STMT_ADDRESSES_BY_USERS = (
+    select(Address)
+    .join(Address.state_row)
+    .options(contains_eager(Address.state_row), raiseload(Address.user_profile))
+    .where(
+        Address.user_id.in_(bindparam("user_ids", expanding=True)),
+        Address.deleted_at.is_(None)
+    )
+    .order_by(AddressState.is_default.desc(), Address.created_at)
+)
+
+
+class AddressLoader:
+    """
+    Loader de direcciones por usuario, uno por request.
+
+    USO:
+        loader = AddressLoader(db)   # en el contexto del request
+        ...
+        addresses = await loader.load(user.user_id)
+
+    Varios load() concurrentes (asyncio.gather, resolvers de GraphQL)
+    se resuelven con una única consulta. Los resultados quedan cacheados
+    en el loader: pedir dos veces el mismo usuario no vuelve a consultar.
+    Los lotes se consultan de a uno (un AsyncSession no admite
+    operaciones concurrentes): un load() que llega mientras otro lote
+    está en curso queda en el lote siguiente. Fuera del loader, no
+    ejecutar otras consultas sobre la misma sesión en paralelo.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+        """
+        self.db = db
+        self._results: dict[UUID, asyncio.Future] = {}
+        self._batch: dict[UUID, asyncio.Future] = {}
+        # Un lote por vez sobre la sesión
+        self._lock = asyncio.Lock()
+        # Referencias fuertes a los despachos en curso: una tarea sin
+        # referencias puede ser recolectada y dejar los futures colgados
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, user_id: UUID) -> Sequence[Address]:
+        """Direcciones activas del usuario, la de por defecto primero."""
+        future = self._results.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[user_id] = future
+            if not self._batch:
+                # Primer pedido de esta vuelta: el lote se despacha cuando
+                # los demás load() pendientes ya se registraron
+                loop.call_soon(self._schedule_dispatch)
+            self._batch[user_id] = future
+        return await future
+
+    async def load_many(self, user_ids: Sequence[UUID]) -> list[Sequence[Address]]:
+        """Direcciones de varios usuarios, en el mismo orden que user_ids."""
+        return list(await asyncio.gather(*(self.load(user_id) for user_id in user_ids)))
+
+    def _schedule_dispatch(self) -> None:
+        batch, self._batch = self._batch, {}
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: dict[UUID, asyncio.Future]) -> None:
+        """Resuelve un lote de user_id con una sola consulta."""
+        try:
+            async with self._lock:
+                result = await self.db.execute(
+                    _STMT_ADDRESSES_BY_USERS, {"user_ids": list(batch)}
+                )
+                grouped: dict[UUID, list[Address]] = defaultdict(list)
+                for address in result.scalars():
+                    grouped[address.user_id].append(address)
+        except asyncio.CancelledError:
+            self._fail(batch, None)
+            raise
+        except Exception as exc:
+            self._fail(batch, exc)
+            return
+
+        for user_id, future in batch.items():
+            if not future.done():
+                future.set_result(grouped[user_id])
+
+    def _fail(self, batch: dict[UUID, asyncio.Future], exc: Exception | None) -> None:
+        """Propaga el error (o la cancelación) a los load() del lote."""
+        for user_id, future in batch.items():
+            # Sin cachear el error: un load() posterior reintenta
+            self._results.pop(user_id, None)
+            if future.done():
+                continue
+            if exc is None:
+                future.cancel()
+            else:
+                future.set_exception(exc)
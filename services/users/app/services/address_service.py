@@ -0,0 +1,307 @@
+"""
+Servicio de direcciones de usuario.
+"""
+
+from typing import Iterable, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, bindparam, case, exists, func, insert, not_, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, raiseload, undefer_group
+
+from app.models.user_profile import (
+    Address,
+    AddressState,
+    AddressType,
+    UserProfile,
+    normalize_address_row,
+)
+
+
+# Consultas frecuentes armadas una sola vez: SQLAlchemy cachea la versión
+# compilada por la estructura de la sentencia, y al reutilizar el mismo
+# objeto tampoco se reconstruye el árbol de la consulta en cada request.
+# Los valores se pasan como parámetros (bindparam).
+# Address.user_profile es selectin: sin raiseload cada consulta dispararía
+# un SELECT extra del perfil, que quien lista direcciones ya conoce. Son
+# instancias para lectura: acceder a user_profile (o cambiar is_default,
+# cuyo validador lo usa) lanza InvalidRequestError en lugar de devolver
+# None en silencio. Para cambiar is_default usar set_default().
+_NO_PROFILE = raiseload(Address.user_profile)
+
+# El estado (is_default) viene en el mismo JOIN que se usa para ordenar
+_STMT_ADDRESSES_BY_USER = (
+    select(Address)
+    .join(Address.state_row)
+    .options(contains_eager(Address.state_row), _NO_PROFILE)
+    .where(Address.user_id == bindparam("user_id"), Address.deleted_at.is_(None))
+    .order_by(AddressState.is_default.desc(), Address.created_at)
+)
+
+# Igual, con los datos fiscales (tax_id, company_name): checkout y facturación
+_STMT_ADDRESSES_BY_USER_FISCAL = _STMT_ADDRESSES_BY_USER.options(undefer_group("fiscal"))
+
+# Una dirección del usuario por ID: el mismo texto SQL en cada request,
+# asyncpg reutiliza el statement preparado de la conexión
+_STMT_ADDRESS_BY_ID = (
+    select(Address)
+    .options(_NO_PROFILE)
+    .where(
+        Address.id == bindparam("address_id"),
+        Address.user_id == bindparam("user_id"),
+        Address.deleted_at.is_(None)
+    )
+)
+
+# Listados grandes (admin, exportaciones): solo las columnas que se
+# muestran, como filas (Row, tipo tupla) y no instancias ORM. Sin estado
+# de instancia ni identity map: mucha menos memoria por dirección.
+# Las columnas de addresses son exactamente las de ix_addresses_list_cov
+# (index-only scan): agregar una columna acá implica agregarla al índice.
+# is_default sale de address_state por su PK.
+_STMT_ADDRESS_SUMMARIES = (
+    select(
+        Address.id,
+        Address.user_id,
+        Address.label,
+        Address.address_type,
+        Address.street,
+        Address.number,
+        Address.city,
+        Address.postal_code,
+        AddressState.is_default,
+    )
+    .join(AddressState, AddressState.address_id == Address.id)
+    .where(
+        Address.user_id.in_(bindparam("user_ids", expanding=True)),
+        Address.deleted_at.is_(None)
+    )
+    .order_by(Address.user_id, AddressState.is_default.desc())
+)
+
+
+class AddressService:
+    """
+    Servicio de direcciones del usuario.
+
+    USO:
+        service = AddressService(db)
+        addresses = await service.list_for_user(user_id)
+        await service.set_default(user_id, address_id)
+        await db.commit()
+
+    USO (importación de libreta de direcciones):
+        ids = await service.bulk_create(rows)
+        await db.commit()
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Inicializa el servicio con una sesión de BD.
+
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+        """
+        self.db = db
+
+    async def get(self, user_id: UUID, address_id: UUID) -> Optional[Address]:
+        """
+        Dirección activa del usuario por ID.
+
+        Args:
+            user_id: ID del usuario (la dirección debe ser suya)
+            address_id: ID de la dirección
+        """
+        result = await self.db.execute(
+            _STMT_ADDRESS_BY_ID, {"address_id": address_id, "user_id": user_id}
+        )
+        return result.scalar_one_or_none()
+
+    async def list_for_user(
+        self,
+        user_id: UUID,
+        with_fiscal: bool = False
+    ) -> Sequence[Address]:
+        """
+        Direcciones activas del usuario, la de por defecto primero.
+
+        Args:
+            user_id: ID del usuario
+            with_fiscal: Cargar también tax_id y company_name (grupo
+                         diferido "fiscal"), para facturación
+        """
+        stmt = _STMT_ADDRESSES_BY_USER_FISCAL if with_fiscal else _STMT_ADDRESSES_BY_USER
+        result = await self.db.execute(stmt, {"user_id": user_id})
+        return result.scalars().all()
+
+    async def list_summaries(self, user_ids: Sequence[UUID]) -> Sequence[Row]:
+        """
+        Resumen de las direcciones activas de varios usuarios.
+
+        Para listados de miles de direcciones que solo se serializan.
+        Cada fila expone id, user_id, label, address_type, street, number,
+        city, postal_code e is_default como atributos (row.street).
+
+        Args:
+            user_ids: IDs de los usuarios
+        """
+        if not user_ids:
+            return []
+        result = await self.db.execute(
+            _STMT_ADDRESS_SUMMARIES, {"user_ids": list(user_ids)}
+        )
+        return result.all()
+
+    async def soft_delete(self, user_id: UUID, address_id: UUID) -> bool:
+        """
+        Da de baja una dirección (borrado lógico).
+
+        Si era la dirección por defecto deja de serlo (Address.is_default
+        actualiza también las referencias del perfil).
+
+        Args:
+            user_id: ID del usuario
+            address_id: ID de la dirección
+
+        Returns:
+            False si la dirección no existe, no es del usuario o ya estaba dada de baja
+        """
+        address = await self.db.get(Address, address_id)
+        if address is None or address.user_id != user_id or address.deleted_at is not None:
+            return False
+
+        address.is_default = False
+        address.deleted_at = func.now()
+        await self.db.flush()
+        return True
+
+    async def bulk_create(
+        self,
+        rows: Iterable[dict],
+        synchronous_commit: bool = True
+    ) -> list[UUID]:
+        """
+        Inserta muchas direcciones en lote.
+
+        Un solo INSERT ... VALUES (...), (...) RETURNING id por lote
+        (insertmanyvalues de SQLAlchemy 2.0) en lugar de un INSERT por
+        session.add(): parse/plan una vez y un round trip por lote. Los
+        default de Python (id, address_type, ...) se completan por fila.
+
+        El INSERT no pasa por los @validates de Address: las filas se
+        normalizan antes con normalize_address_row (mismos normalizadores).
+
+        Cada dirección se crea con su AddressState (Address.state_row,
+        is_default = false), en un segundo INSERT por lotes. La dirección
+        por defecto se elige después con set_default().
+
+        Args:
+            rows: Direcciones (claves = columnas de Address, con user_id;
+                  "state" es la provincia, no el AddressState)
+            synchronous_commit: False para cargas masivas: el COMMIT no
+                                espera el flush del WAL a disco (ante una
+                                caída del servidor se pueden perder las
+                                últimas transacciones, nunca corromperlas).
+                                Aplica solo a esta transacción.
+
+        Returns:
+            IDs de las direcciones creadas, en el orden de rows
+        """
+        rows = [normalize_address_row(row) for row in rows]
+        if not rows:
+            return []
+
+        if not synchronous_commit:
+            await self.db.execute(text("SET LOCAL synchronous_commit = off"))
+
+        stmt = insert(Address).returning(
+            Address.id, Address.user_id, sort_by_parameter_order=True
+        )
+        created = (await self.db.execute(stmt, rows)).all()
+        await self.db.execute(
+            insert(AddressState),
+            [{"address_id": row.id, "user_id": row.user_id} for row in created]
+        )
+        return [row.id for row in created]
+
+    async def set_default(self, user_id: UUID, address_id: UUID) -> bool:
+        """
+        Marca una dirección como la dirección por defecto del usuario.
+
+        Un solo round trip, sin leer antes las direcciones del usuario:
+        1. flip (CTE): UPDATE address_state SET is_default =
+           (address_id = :address_id) sobre el default actual y la nueva
+           dirección (filas angostas: no se reescribe addresses)
+        2. UPDATE user_profiles: default_shipping/billing_address_id según
+           el tipo de la nueva dirección (y en NULL si apuntaban a la
+           dirección que dejó de ser default)
+
+        uq_address_state_one_default_per_user es DEFERRABLE: el estado
+        intermedio con dos defaults no falla dentro del UPDATE.
+
+        Las instancias ya cargadas en la sesión no se actualizan
+        (UPDATE masivo): recargarlas si se siguen usando.
+
+        Args:
+            user_id: ID del usuario
+            address_id: ID de la nueva dirección por defecto
+
+        Returns:
+            False si la dirección no existe, no es del usuario o no está activa
+        """
+        owned = exists().where(
+            Address.id == address_id,
+            Address.user_id == user_id,
+            Address.deleted_at.is_(None)
+        )
+        flip = (
+            update(AddressState)
+            .where(
+                AddressState.user_id == user_id,
+                or_(
+                    AddressState.is_default.is_(True),
+                    AddressState.address_id == address_id
+                ),
+                owned
+            )
+            .values(is_default=AddressState.address_id == address_id)
+            .returning(AddressState.address_id, AddressState.is_default)
+            .cte("flip")
+        )
+
+        new_type = (
+            select(Address.address_type)
+            .join(flip, flip.c.address_id == Address.id)
+            .where(flip.c.is_default.is_(True))
+            .scalar_subquery()
+        )
+        cleared = select(flip.c.address_id).where(not_(flip.c.is_default))
+
+        def default_for(column, types):
+            return case(
+                (new_type.in_(types), address_id),
+                (column.in_(cleared), None),
+                else_=column
+            )
+
+        stmt = (
+            update(UserProfile)
+            .where(
+                UserProfile.user_id == user_id,
+                select(flip.c.address_id).where(flip.c.address_id == address_id).exists()
+            )
+            .values(
+                default_shipping_address_id=default_for(
+                    UserProfile.default_shipping_address_id,
+                    (AddressType.SHIPPING, AddressType.BOTH)
+                ),
+                default_billing_address_id=default_for(
+                    UserProfile.default_billing_address_id,
+                    (AddressType.BILLING, AddressType.BOTH)
+                )
+            )
+            .returning(UserProfile.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none() is not None
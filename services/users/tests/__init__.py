@@ -0,0 +1,6 @@
+"""
+Tests del servicio de usuarios.
+
+Estructura:
+- test_addresses.py: Tests de direcciones (normalización, carga por lotes)
+"""
@@ -0,0 +1,159 @@
+"""
+Tests de direcciones.
+
+Verifican que la normalización sea la misma por el ORM (@validates) y
+por los INSERT por lotes (AddressService.bulk_create).
+"""
+
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.user_profile import (
+    Address,
+    normalize_address_row,
+    normalize_phone,
+    normalize_postal_code,
+    normalize_recipient_name,
+    normalize_tax_id,
+)
+from app.services.address_service import AddressService
+
+
+RAW_ADDRESS = {
+    "recipient_name": "  Juan   Pérez ",
+    "phone": "+54 9 (11) 1234-5678",
+    "postal_code": "c1425 abc",
+    "tax_id": "20-12345678-9",
+}
+
+NORMALIZED_ADDRESS = {
+    "recipient_name": "Juan Pérez",
+    "phone": "+5491112345678",
+    "postal_code": "C1425ABC",
+    "tax_id": "20123456789",
+}
+
+
+# ==============================================================================
+# TESTS DE NORMALIZADORES
+# ==============================================================================
+
+class TestNormalizers:
+    """Tests para los normalizadores de campos de Address"""
+    
+    def test_normalize_recipient_name(self):
+        """Test: Colapsa espacios y recorta los extremos."""
+        assert normalize_recipient_name("  Juan   Pérez ") == "Juan Pérez"
+    
+    def test_normalize_phone_keeps_plus(self):
+        """Test: Solo dígitos, conservando el "+" inicial."""
+        assert normalize_phone(" +54 9 (11) 1234-5678") == "+5491112345678"
+        assert normalize_phone("011 4321-0000") == "01143210000"
+    
+    def test_normalize_postal_code(self):
+        """Test: Alfanumérico y en mayúsculas."""
+        assert normalize_postal_code("c1425 abc") == "C1425ABC"
+    
+    def test_normalize_tax_id(self):
+        """Test: Solo dígitos."""
+        assert normalize_tax_id("20-12345678-9") == "20123456789"
+    
+    def test_none_passes_through(self):
+        """Test: None se mantiene (columnas opcionales)."""
+        for normalize in (
+            normalize_recipient_name,
+            normalize_phone,
+            normalize_postal_code,
+            normalize_tax_id,
+        ):
+            assert normalize(None) is None
+    
+    def test_validates_uses_same_normalizers(self):
+        """Test: Asignar por el ORM da el mismo resultado que normalize_address_row."""
+        address = Address(**RAW_ADDRESS)
+        
+        for key, value in NORMALIZED_ADDRESS.items():
+            assert getattr(address, key) == value
+        assert normalize_address_row(RAW_ADDRESS) == NORMALIZED_ADDRESS
+    
+    def test_normalize_address_row_does_not_mutate(self):
+        """Test: Devuelve una copia y deja las demás claves intactas."""
+        row = {**RAW_ADDRESS, "street": "  Av.  Corrientes "}
+        
+        normalized = normalize_address_row(row)
+        
+        assert row["phone"] == RAW_ADDRESS["phone"]
+        assert normalized["street"] == "  Av.  Corrientes "
+
+
+# ==============================================================================
+# TESTS DE BULK_CREATE
+# ==============================================================================
+
+class TestBulkCreate:
+    """Tests para AddressService.bulk_create"""
+    
+    @pytest.mark.asyncio
+    async def test_bulk_create_normalizes_rows(self):
+        """
+        Test: Las filas se normalizan antes del INSERT por lotes.
+        
+        El INSERT no pasa por los @validates: sin normalizar, una
+        importación guardaría teléfonos y códigos postales crudos.
+        """
+        user_id = uuid.uuid4()
+        address_id = uuid.uuid4()
+        
+        insert_result = MagicMock()
+        insert_result.all.return_value = [MagicMock(id=address_id, user_id=user_id)]
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[insert_result, MagicMock()])
+        
+        ids = await AddressService(db).bulk_create([{**RAW_ADDRESS, "user_id": user_id}])
+        
+        assert ids == [address_id]
+        inserted_rows = db.execute.await_args_list[0].args[1]
+        assert inserted_rows == [{**NORMALIZED_ADDRESS, "user_id": user_id}]
+    
+    @pytest.mark.asyncio
+    async def test_bulk_create_empty(self):
+        """Test: Sin filas no se ejecuta ninguna sentencia."""
+        db = MagicMock()
+        db.execute = AsyncMock()
+        
+        assert await AddressService(db).bulk_create([]) == []
+        db.execute.assert_not_awaited()
+
+
+# ==============================================================================
+# TESTS DEL MODELO
+# ==============================================================================
+
+class TestAddressModel:
+    """Tests para columnas y relaciones de Address"""
+    
+    def test_state_is_province_column(self):
+        """
+        Test: state es la columna de la provincia.
+        
+        La relación con AddressState es state_row: con el mismo nombre
+        la relación reemplazaba la columna.
+        """
+        address = Address(city="La Plata", state="Buenos Aires", is_default=True)
+        
+        assert address.state == "Buenos Aires"
+        assert address.state_row is not None
+        assert address.is_default is True
+        assert "state" in Address.__table__.c
+    
+    def test_addresses_ddl_compiles(self):
+        """Test: El CREATE TABLE de addresses incluye state y full_address lo usa."""
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.schema import CreateTable
+        
+        ddl = str(CreateTable(Address.__table__).compile(dialect=postgresql.dialect()))
+        
+        assert "state CITEXT NOT NULL" in ddl
+        assert "|| ', ' || state" in ddl